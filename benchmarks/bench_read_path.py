@@ -0,0 +1,126 @@
+"""
+Benchmark do caminho de leitura das listagens de leilões.
+
+Compara o caminho legado (entidades ORM LeilaoAnaliticoModel no identity map,
+copiadas campo a campo para Auction) com o caminho Core usado pelo repositório
+(select() projetando só AUCTION_COLUMNS e construindo Auction direto das tuplas).
+
+Uso:
+    python -m benchmarks.bench_read_path --rows 100000
+    python -m benchmarks.bench_read_path --rows 200000 --url postgresql+psycopg2://...
+
+Sem --url usa SQLite em memória (só a tabela leiloes_analiticos é criada).
+Com --url o benchmark insere linhas em leiloes_analiticos: use um banco
+descartável, ou --no-seed para medir sobre os dados já existentes.
+"""
+import argparse
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, select, insert
+from sqlalchemy.orm import sessionmaker
+
+from src.domain.models import Auction
+from src.infra.database.models_sql import LeilaoAnaliticoModel
+from src.infra.repositories.postgres_repo import AUCTION_COLUMNS, _row_to_auction
+
+
+def _seed(engine, rows: int) -> None:
+    LeilaoAnaliticoModel.__table__.create(engine, checkfirst=True)
+    base = datetime(2026, 1, 1)
+    ufs = ["SP", "RJ", "MG", "PR", "RS", "BA"]
+    batch = []
+    with engine.begin() as conn:
+        for i in range(1, rows + 1):
+            batch.append({
+                "id_registro_bruto": i,
+                "site": f"site_{i % 40}",
+                "id_leilao": str(100000 + i),
+                "titulo": f"Apartamento {i} - Centro",
+                "uf": ufs[i % len(ufs)],
+                "cidade": f"Cidade {i % 300}",
+                "tipo_leilao": "Judicial",
+                "tipo_bem": "Apartamento" if i % 3 else "Casa",
+                "valor_1_praca": 100000.0 + i,
+                "valor_2_praca": 50000.0 + i,
+                "link_detalhe": f"https://leiloeiro.example/{i}",
+                "imagem_capa": f"https://leiloeiro.example/{i}.jpg",
+                "data_1_praca": base + timedelta(days=i % 90),
+                "data_2_praca": base + timedelta(days=i % 90 + 15),
+                "status_imovel": "Ocupado" if i % 2 else None,
+            })
+            if len(batch) == 10000:
+                conn.execute(insert(LeilaoAnaliticoModel), batch)
+                batch = []
+        if batch:
+            conn.execute(insert(LeilaoAnaliticoModel), batch)
+
+
+def read_orm(session):
+    """Caminho legado: entidades ORM + cópia campo a campo."""
+    results = session.query(LeilaoAnaliticoModel).order_by(LeilaoAnaliticoModel.id_registro_bruto.desc()).all()
+    return [
+        Auction(
+            site=r.site,
+            id_leilao=r.id_leilao,
+            titulo=r.titulo,
+            uf=r.uf,
+            cidade=r.cidade,
+            tipo_leilao=r.tipo_leilao,
+            tipo_bem=r.tipo_bem,
+            valor_1_praca=float(r.valor_1_praca) if r.valor_1_praca else 0.0,
+            valor_2_praca=float(r.valor_2_praca) if r.valor_2_praca else 0.0,
+            link_detalhe=r.link_detalhe,
+            imagem_capa=r.imagem_capa,
+            data_1_praca=r.data_1_praca,
+            data_2_praca=r.data_2_praca,
+            status_imovel=r.status_imovel,
+            id_registro_bruto=r.id_registro_bruto
+        )
+        for r in results
+    ]
+
+
+def read_core(session):
+    """Caminho atual do repositório: select() de colunas + Auction a partir da tupla."""
+    stmt = select(*AUCTION_COLUMNS).order_by(LeilaoAnaliticoModel.id_registro_bruto.desc())
+    return [_row_to_auction(*row) for row in session.execute(stmt)]
+
+
+def _time(Session, reader, repeat: int):
+    best, count = float("inf"), 0
+    for _ in range(repeat):
+        session = Session()  # sessão nova: identity map vazio a cada rodada
+        try:
+            start = time.perf_counter()
+            count = len(reader(session))
+            best = min(best, time.perf_counter() - start)
+        finally:
+            session.close()
+    return best, count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--url", default="sqlite://")
+    parser.add_argument("--no-seed", action="store_true", help="Usa os dados já existentes no banco.")
+    args = parser.parse_args()
+
+    engine = create_engine(args.url)
+    if not args.no_seed:
+        _seed(engine, args.rows)
+    Session = sessionmaker(bind=engine)
+
+    results = {}
+    for name, reader in (("orm", read_orm), ("core", read_core)):
+        elapsed, count = _time(Session, reader, args.repeat)
+        results[name] = count / elapsed
+        print(f"{name:>5}: {count} linhas em {elapsed:.3f}s -> {count / elapsed:,.0f} linhas/s")
+
+    print(f"ganho: {results['core'] / results['orm']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+"""
+Benchmark dos métodos do PostgresAuctionRepository sobre uma base sintética.
+
+Para cada tamanho de base (--sizes) o benchmark recria o esquema pelas migrações,
+carrega a base sintética de src.infra.database.synthetic (leilões, avaliações de
+vários usuários, análises detalhadas e execuções de scraper) e cronometra os caminhos
+quentes das telas: fila de triagem, facetas, gravação de decisões em lote, carteira
+(listagem completa, página filtrada, contagem por aba e indicadores dos finalizados),
+auditoria e monitoramento.
+
+O resultado é um relatório JSON (--output) comparável entre execuções: com
+--baseline o benchmark compara a mediana de cada cenário com a do relatório
+anterior e termina com código 1 se algum ficar mais lento que a tolerância.
+
+Uso:
+    python -m benchmarks.bench_repository --url postgresql+psycopg2://... --sizes 10000,100000
+    python -m benchmarks.bench_repository --url ... --output atual.json --baseline main.json
+
+ATENÇÃO: as tabelas da aplicação no banco de --url são APAGADAS e recriadas.
+Use um banco descartável.
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from src.domain.models import (
+    AuctionFilter, DetailedAnalysis, Evaluation, EvaluationStatus, NoBidReason, PortfolioQuery, PortfolioSort,
+    ScraperRunFilter, SearchScope, StatusTransition
+)
+from src.infra.database.synthetic import LOADERS, SCRAPER_SOURCES, SyntheticConfig, load
+from src.infra.repositories.postgres_repo import PostgresAuctionRepository
+
+@dataclass
+class Dataset:
+    """Base gerada para um tamanho (usada para montar os cenários)."""
+    config: SyntheticConfig
+    tables: Dict[str, dict] = field(default_factory=dict)
+    seed_seconds: float = 0.0
+    fold_seconds: float = 0.0
+    queue_seconds: float = 0.0
+
+    @property
+    def rows(self) -> int:
+        return self.config.auctions
+
+    @property
+    def users(self) -> List[str]:
+        return self.config.user_ids
+
+    def key(self, raw_id: int):
+        """(site, id_leilao) do registro bruto gerado com este id."""
+        return self.config.auction_key(raw_id)
+
+
+@dataclass
+class Scenario:
+    """
+    Um caminho medido. `setup` roda fora do cronômetro e seu retorno é passado para `run`
+    (ex: carregar a análise que será salva). Ambos recebem (repo, iteração).
+    """
+    name: str
+    run: Callable[..., Any]
+    setup: Optional[Callable[..., Any]] = None
+
+
+@dataclass
+class Timing:
+    samples_ms: List[float] = field(default_factory=list)
+
+    def summary(self) -> Dict[str, float]:
+        ordered = sorted(self.samples_ms)
+        p95 = ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+        return {
+            "runs": len(ordered),
+            "min_ms": round(ordered[0], 3),
+            "median_ms": round(statistics.median(ordered), 3),
+            "mean_ms": round(statistics.fmean(ordered), 3),
+            "p95_ms": round(p95, 3),
+        }
+
+
+# --- BASE SINTÉTICA ---
+
+def seed(engine, config: SyntheticConfig, method: str) -> Dataset:
+    """Recria o esquema e carrega a base sintética (src.infra.database.synthetic)."""
+    dataset = Dataset(config=config)
+    started = time.perf_counter()
+    dataset.tables = load(engine, config, method=method, reset=True)
+    dataset.seed_seconds = time.perf_counter() - started
+
+    # Primeira incorporação do histórico ao rollup (custo único, medido à parte)
+    Session = sessionmaker(bind=engine)
+    with Session() as session:
+        started = time.perf_counter()
+        PostgresAuctionRepository(session).fold_scraper_runs()
+        dataset.fold_seconds = time.perf_counter() - started
+
+        # Inscrição dos usuários na fila de triagem (carga inicial única, como no primeiro login)
+        started = time.perf_counter()
+        for user in dataset.users:
+            PostgresAuctionRepository(session).ensure_pending_queue(user)
+        dataset.queue_seconds = time.perf_counter() - started
+    return dataset
+
+
+# --- CENÁRIOS ---
+
+def scenarios(dataset: Dataset) -> List[Scenario]:
+    user, writer = dataset.users[0], "bench_writer"
+    hoje = date.today()
+
+    def keys(scenario_offset: int, iteration: int, size: int):
+        start = (scenario_offset + iteration * size) % max(dataset.rows - size, 1)
+        return [dataset.key(raw_id) for raw_id in range(start + 1, start + size + 1)]
+
+    def new_analysis(repo, i):
+        site, id_leilao = dataset.key(dataset.rows - i)
+        return DetailedAnalysis(site=site, id_leilao=id_leilao, usuario_id=writer, fin_lance=100_000.0)
+
+    def loaded_analysis(repo, i):
+        site, id_leilao = dataset.key(dataset.rows - i)
+        analysis = repo.get_detailed_analysis(site, id_leilao, writer)
+        if analysis is None:
+            analysis = new_analysis(repo, i)
+            repo.save_detailed_analysis(analysis)
+        return analysis
+
+    def change_and_save(repo, analysis):
+        analysis.fin_itbi = analysis.fin_itbi + 1
+        repo.save_detailed_analysis(analysis)
+
+    return [
+        # Triagem
+        Scenario("pending_queue_enroll", lambda repo, i: repo.ensure_pending_queue(f"bench_cold_{i}")),
+        Scenario("pending_first_page", lambda repo, i: repo.get_pending_auctions(user, AuctionFilter())),
+        Scenario("pending_first_page_frame", lambda repo, i: repo.get_pending_auctions_frame(user, AuctionFilter())),
+        Scenario("pending_filtered_page", lambda repo, i: repo.get_pending_auctions(
+            user, AuctionFilter(uf=["SP"], tipo_bem=["Apartamento"]))),
+        Scenario("pending_deep_page", lambda repo, i: repo.get_pending_auctions(
+            user, AuctionFilter(), cursor=dataset.rows // 2)),
+        Scenario("pending_count", lambda repo, i: repo.count_pending_auctions(user, AuctionFilter())),
+        Scenario("filter_facets", lambda repo, i: repo.get_filter_facets(user, AuctionFilter())),
+        Scenario("filter_facets_filtered", lambda repo, i: repo.get_filter_facets(user, AuctionFilter(uf=["SP"]))),
+        Scenario("save_evaluations_15", lambda repo, i: repo.save_evaluations([
+            Evaluation(writer, site, id_leilao, EvaluationStatus.DESCARTAR) for site, id_leilao in keys(0, i, 15)])),
+        Scenario("save_evaluations_100", lambda repo, i: repo.save_evaluations([
+            Evaluation(writer, site, id_leilao, EvaluationStatus.ANALISAR)
+            for site, id_leilao in keys(dataset.rows // 3, i, 100)])),
+        Scenario("search_triagem", lambda repo, i: repo.search_auctions(
+            user, "apartamento sao paulo", scope=SearchScope.TRIAGEM)),
+        Scenario("search_id", lambda repo, i: repo.search_auctions(user, dataset.key(dataset.rows // 2 + i)[1])),
+        Scenario("stats_30_days", lambda repo, i: repo.get_stats(user, hoje - timedelta(days=30), hoje)),
+        # Carteira e auditoria
+        Scenario("portfolio_page", lambda repo, i: repo.get_portfolio_page(
+            user, PortfolioQuery(statuses=[EvaluationStatus.ANALISAR.value]))),
+        Scenario("portfolio_page_filtered", lambda repo, i: repo.get_portfolio_page(user, PortfolioQuery(
+            statuses=[EvaluationStatus.NO_BID.value], no_bid_reasons=[NoBidReason.OUTRO.value],
+            min_valor=100_000.0, sort=PortfolioSort.MAIOR_VALOR))),
+        Scenario("portfolio_summary", lambda repo, i: repo.get_portfolio_summary(user)),
+        Scenario("finalizados_indicators", lambda repo, i: repo.get_finalizados_indicators(user)),
+        Scenario("search_carteira", lambda repo, i: repo.search_auctions(user, "casa", scope=SearchScope.CARTEIRA)),
+        Scenario("transition_statuses_50", lambda repo, i: repo.transition_statuses(writer, [
+            StatusTransition(site, id_leilao, EvaluationStatus.PARTICIPAR)
+            for site, id_leilao in keys(2 * dataset.rows // 3, i, 50)])),
+        Scenario("detailed_analysis_insert", lambda repo, analysis: repo.save_detailed_analysis(analysis),
+                 setup=new_analysis),
+        Scenario("detailed_analysis_update_one_field", change_and_save, setup=loaded_analysis),
+        Scenario("auditoria_snapshot", lambda repo, i: repo.get_auditoria_snapshot(*dataset.key(dataset.rows - i), writer)),
+        # Monitoramento
+        Scenario("scraper_runs_page_100", lambda repo, i: repo.get_scraper_runs(
+            ScraperRunFilter(start_date=hoje - timedelta(days=30), end_date=hoje), limit=100)),
+        Scenario("scraper_runs_frame_100", lambda repo, i: repo.get_scraper_runs_frame(
+            ScraperRunFilter(start_date=hoje - timedelta(days=30), end_date=hoje), limit=100)),
+        Scenario("scraper_run_stats_30_days", lambda repo, i: repo.get_scraper_run_stats(
+            ScraperRunFilter(start_date=hoje - timedelta(days=30), end_date=hoje))),
+        Scenario("scraper_fold_incremental", lambda repo, i: repo.fold_scraper_runs()),
+        Scenario("scraper_latency_history_90_days", lambda repo, i: repo.get_scraper_latency_history(
+            None, datetime.combine(hoje - timedelta(days=90), datetime.min.time()), datetime.now(), "day")),
+        Scenario("scraper_sources", lambda repo, i: repo.get_scraper_sources()),
+    ]
+
+
+def measure(Session, scenario: Scenario, repeat: int, warmup: int) -> Timing:
+    """Executa o cenário `warmup + repeat` vezes, cada uma com sessão nova, e guarda só as medidas."""
+    timing = Timing()
+    for i in range(warmup + repeat):
+        with Session() as session:
+            repo = PostgresAuctionRepository(session)
+            arg = scenario.setup(repo, i) if scenario.setup else i
+            started = time.perf_counter()
+            scenario.run(repo, arg)
+            elapsed = (time.perf_counter() - started) * 1000
+        if i >= warmup:
+            timing.samples_ms.append(elapsed)
+    return timing
+
+
+# --- RELATÓRIO ---
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report: dict, baseline: dict, tolerance: float, min_delta_ms: float = 0.0) -> List[str]:
+    """
+    Compara as medianas com o relatório base. Retorna as regressões
+    ("tamanho/cenário: base -> atual") acima da tolerância (0.25 = 25% mais lento)
+    e de pelo menos `min_delta_ms` (ignora o ruído dos cenários de poucos ms).
+    """
+    regressions = []
+    for size, results in report["results"].items():
+        base_results = baseline.get("results", {}).get(size, {})
+        for name, summary in results.items():
+            base = base_results.get(name)
+            if not base or not base.get("median_ms"):
+                continue
+            ratio = summary["median_ms"] / base["median_ms"]
+            regressed = ratio > 1 + tolerance and summary["median_ms"] - base["median_ms"] >= min_delta_ms
+            marker = "REGRESSÃO" if regressed else "ok"
+            print(f"{size:>9} {name:<36} {base['median_ms']:>10.2f} -> {summary['median_ms']:>10.2f} ms "
+                  f"({ratio:5.2f}x) {marker}", file=sys.stderr)
+            if regressed:
+                regressions.append(f"{size}/{name}: {base['median_ms']:.2f} -> {summary['median_ms']:.2f} ms")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", required=True, help="Banco Postgres DESCARTÁVEL (as tabelas são recriadas).")
+    parser.add_argument("--sizes", default="10000,100000", help="Tamanhos de leiloes_analiticos, separados por vírgula.")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--evaluated-ratio", type=float, default=0.2, help="Fração da base avaliada por usuário.")
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--scraper-runs-ratio", type=float, default=0.05,
+                        help="Execuções de scraper geradas por leilão (distribuídas em 90 dias).")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--method", choices=sorted(LOADERS), default="copy", help="Carga da base sintética.")
+    parser.add_argument("--only", help="Roda apenas os cenários cujo nome contém este texto.")
+    parser.add_argument("--output", help="Arquivo do relatório JSON (padrão: stdout).")
+    parser.add_argument("--baseline", help="Relatório JSON anterior para comparação.")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--min-delta-ms", type=float, default=2.0,
+                        help="Diferença mínima (ms) da mediana para contar como regressão.")
+    args = parser.parse_args(argv)
+
+    engine = create_engine(args.url)
+    Session = sessionmaker(bind=engine)
+    with engine.connect() as conn:
+        server_version = conn.execute(text("SHOW server_version")).scalar()
+
+    report = {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "postgres": server_version,
+        "params": {key: value for key, value in vars(args).items() if key not in ("url", "output", "baseline")},
+        "datasets": {},
+        "results": {},
+    }
+
+    for rows in (int(size) for size in args.sizes.split(",")):
+        print(f"# base com {rows} leilões: gerando...", file=sys.stderr)
+        config = SyntheticConfig(
+            auctions=rows, users=args.users, evaluated_ratio=args.evaluated_ratio, seed=args.seed, scraper_days=90,
+            runs_per_day=max(1, round(rows * args.scraper_runs_ratio / 90 / sum(p for _, p in SCRAPER_SOURCES.values())))
+        )
+        dataset = seed(engine, config, args.method)
+        report["datasets"][str(rows)] = {
+            "tables": {table: info["rows"] for table, info in dataset.tables.items()},
+            "seed_seconds": round(dataset.seed_seconds, 2),
+            "initial_fold_seconds": round(dataset.fold_seconds, 3),
+            "queue_enroll_seconds": round(dataset.queue_seconds, 3),
+        }
+        results = report["results"][str(rows)] = {}
+        for scenario in scenarios(dataset):
+            if args.only and args.only not in scenario.name:
+                continue
+            summary = measure(Session, scenario, args.repeat, args.warmup).summary()
+            results[scenario.name] = summary
+            print(f"{rows:>9} {scenario.name:<36} mediana {summary['median_ms']:>10.2f} ms "
+                  f"p95 {summary['p95_ms']:>10.2f} ms", file=sys.stderr)
+
+    payload = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(payload + "\n")
+    else:
+        print(payload)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.tolerance, args.min_delta_ms)
+        if regressions:
+            print(f"{len(regressions)} regressão(ões) acima de {args.tolerance:.0%}:", file=sys.stderr)
+            for line in regressions:
+                print(f"  {line}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,10 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional
-from src.domain.models import Auction, AuctionFilter, Evaluation, DetailedAnalysis, EvaluationStatus, ScraperRun, ScraperRunFilter
+from datetime import date, datetime
+from typing import TYPE_CHECKING, List, Dict, Optional
+from src.domain.models import Auction, AuctionFilter, AuctionSearchPage, AuditoriaSnapshot, AuctionFramePage, AuctionPage, BatchWriteResult, Evaluation, DetailedAnalysis, FilterFacets, EvaluationStatus, FinalizadosIndicators, PortfolioPage, PortfolioQuery, PortfolioSummary, ScraperLatencyBucket, ScraperRun, ScraperRunFilter, ScraperRunStats, SearchScope, StatusTransition
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 class AuctionRepository(ABC):
@@ -10,29 +14,127 @@ class AuctionRepository(ABC):
     """
 
     @abstractmethod
-    def get_pending_auctions(self, user_id: str, filters: AuctionFilter) -> List[Auction]:
+    def ensure_pending_queue(self, user_id: str) -> int:
+        """
+        Inscreve o usuário na fila de triagem, com a carga inicial dos leilões que ele ainda
+        não avaliou (idempotente: só a primeira chamada carrega). As leituras da fila não escrevem.
+        Retorna quantos leilões entraram na fila.
+        """
+        pass
+
+    @abstractmethod
+    def get_pending_auctions(self, user_id: str, filters: AuctionFilter,
+                             cursor: Optional[int] = None, page_size: int = 15) -> AuctionPage:
         """
-        Retorna leilões que correspondem aos filtros E que ainda não foram
+        Retorna uma página de leilões que correspondem aos filtros E que ainda não foram
         avaliados pelo usuário específico.
+        A paginação é por cursor (keyset) sobre id_registro_bruto em ordem decrescente:
+        `cursor` é o `next_cursor` da página anterior (None para a primeira página).
+        """
+        pass
+
+    @abstractmethod
+    def get_pending_auctions_frame(self, user_id: str, filters: AuctionFilter,
+                                   cursor: Optional[int] = None, page_size: int = 15) -> AuctionFramePage:
+        """
+        Mesma página de get_pending_auctions, já como DataFrame (colunar, tipado),
+        sem materializar um Auction por linha. Usada pelas telas que exibem a fila como tabela/cards.
+        """
+        pass
+
+    @abstractmethod
+    def count_pending_auctions(self, user_id: str, filters: AuctionFilter) -> int:
+        """Retorna apenas o total de leilões pendentes para os filtros (sem carregar as linhas)."""
+        pass
+
+    @abstractmethod
+    def get_filter_facets(self, user_id: str, filters: AuctionFilter) -> FilterFacets:
+        """
+        Retorna as opções de cada filtro da triagem com contagens, restritas pelos
+        filtros já selecionados, além do total e do volume da seleção completa.
         """
         pass
 
     @abstractmethod
-    def save_evaluations(self, evaluations: List[Evaluation]) -> int:
+    def search_auctions(self, user_id: str, query: str, scope: SearchScope = SearchScope.TODOS,
+                        filters: Optional[AuctionFilter] = None, statuses: Optional[List[str]] = None,
+                        offset: int = 0, page_size: int = 20, min_valor: Optional[float] = None,
+                        max_valor: Optional[float] = None,
+                        no_bid_reasons: Optional[List[str]] = None) -> AuctionSearchPage:
+        """
+        Busca textual por título (sem acentos, com stemming e tolerância a erros de digitação)
+        ou ID do leilão, em ordem de relevância, paginada por offset.
+        `scope` restringe à fila de triagem ou à carteira do usuário; `filters` aplica os
+        filtros da triagem. Na carteira, `statuses`, `min_valor`/`max_valor` (2ª praça) e
+        `no_bid_reasons` são os mesmos filtros de get_portfolio_page.
+        """
+        pass
+
+    @abstractmethod
+    def save_evaluations(self, evaluations: List[Evaluation]) -> BatchWriteResult:
         """
         Persiste uma lista de avaliações (Batch update).
-        Retorna o número de registros salvos.
+        Retorna quantos registros foram salvos e quais itens foram ignorados
+        por não existirem na base analítica.
         """
         pass
         
     @abstractmethod
-    def get_stats(self) -> Dict[str, int]:
-        """Retorna dados agregados para o dashboard."""
+    def get_stats(self, user_id: str, start_date: Optional[date] = None,
+                  end_date: Optional[date] = None) -> Dict[str, int]:
+        """
+        Retorna a produtividade do usuário no período [start_date, end_date]
+        (padrão: somente hoje): quantas decisões de cada status ele tomou por dia.
+        Conta eventos (mudanças de status), não o estado atual: triar como ANALISAR e depois
+        mover para PARTICIPAR conta uma decisão de cada; regravar o mesmo status não conta.
+        """
+        pass
+
+    @abstractmethod
+    def get_portfolio_page(self, user_id: str, query: PortfolioQuery) -> PortfolioPage:
+        """
+        Retorna uma página da Carteira com filtros (status, faixa de valor, motivo do No Bid)
+        e ordenação aplicados no banco.
+        A paginação é por cursor (keyset) sobre (chave de ordenação, id_registro_bruto):
+        `query.cursor` é o `next_cursor` da página anterior.
+        """
+        pass
+
+    @abstractmethod
+    def get_portfolio_summary(self, user_id: str, query: Optional[PortfolioQuery] = None) -> PortfolioSummary:
+        """
+        Contagem dos itens da Carteira por status (e maior valor da 2ª praça), sem carregar as linhas.
+        Com `query`, conta somente os itens que passam nos filtros dela (cursor e ordenação são ignorados).
+        """
+        pass
+
+    @abstractmethod
+    def get_finalizados_indicators(self, user_id: str) -> FinalizadosIndicators:
+        """
+        Indicadores dos leilões finalizados do usuário (NO_BID e OUTBID): totais, capital evitado
+        e distribuições por motivo do No Bid, UF e mês, calculados sem carregar os leilões.
+        """
+        pass
+
+    @abstractmethod
+    def get_auction(self, site: str, id_leilao: str) -> Optional[Auction]:
+        """Retorna os dados básicos do leilão (cabeçalho), ou None se não estiver na base analítica."""
         pass
-    
+
     @abstractmethod
-    def get_stats(self, user_id: str) -> dict:
-        """Corrigido: agora aceita user_id para estatísticas segmentadas."""
+    def update_auction_core_data(self, site: str, id_leilao: str, data: dict) -> None:
+        """
+        Corrige dados básicos do leilão (titulo, valores, datas das praças, link_detalhe).
+        Lança ValueError se o leilão não existir.
+        """
+        pass
+
+    @abstractmethod
+    def save_detailed_analysis(self, analysis: DetailedAnalysis) -> None:
+        """
+        Persiste a análise detalhada (upsert), gravando apenas os campos alterados
+        desde o último load/save (ver DetailedAnalysis.dirty_fields).
+        """
         pass
 
     @abstractmethod
@@ -45,6 +147,11 @@ class AuctionRepository(ABC):
         """Recupera a análise completa mapeada para o domínio."""
         pass
 
+    @abstractmethod
+    def get_auditoria_snapshot(self, site: str, id_leilao: str, user_id: str) -> AuditoriaSnapshot:
+        """Recupera o cabeçalho do leilão e a análise do usuário juntos (tela de auditoria)."""
+        pass
+
     @abstractmethod
     def update_status(self, user_id: str, site: str, id_leilao: str, new_status: EvaluationStatus) -> None:
         """
@@ -53,8 +160,42 @@ class AuctionRepository(ABC):
         pass
 
     @abstractmethod
-    def get_scraper_runs(self, filters: ScraperRunFilter) -> List[ScraperRun]:
-        """Recupera os registros de execução dos scrapers."""
+    def transition_statuses(self, user_id: str, transitions: List[StatusTransition]) -> BatchWriteResult:
+        """
+        Aplica várias mudanças de status de avaliação do usuário de uma só vez.
+        Retorna quantas foram gravadas e quais (site, id_leilao) não existem na base analítica.
+        """
+        pass
+
+    @abstractmethod
+    def get_scraper_runs(self, filters: ScraperRunFilter, limit: Optional[int] = None,
+                         offset: int = 0) -> List[ScraperRun]:
+        """Recupera os registros de execução dos scrapers (mais recentes primeiro), opcionalmente paginados."""
+        pass
+
+    @abstractmethod
+    def get_scraper_runs_frame(self, filters: ScraperRunFilter, limit: Optional[int] = None,
+                               offset: int = 0) -> "pd.DataFrame":
+        """Mesmas execuções de get_scraper_runs como DataFrame colunar (sem parameters_used)."""
+        pass
+
+    @abstractmethod
+    def get_scraper_run_stats(self, filters: ScraperRunFilter) -> ScraperRunStats:
+        """Agrega as execuções dos scrapers (KPIs, execuções por dia/status e itens por fonte) no banco."""
+        pass
+
+    @abstractmethod
+    def fold_scraper_runs(self, batch_size: int = 5000) -> int:
+        """
+        Incorpora ao rollup por hora/dia as execuções concluídas ainda não somadas
+        (escrita; roda em job, não nas leituras). Retorna quantas execuções foram incorporadas.
+        """
+        pass
+
+    @abstractmethod
+    def get_scraper_latency_history(self, sources: Optional[List[str]], start: datetime, end: datetime,
+                                    granularity: str = "day") -> List[ScraperLatencyBucket]:
+        """Série histórica (rollup) de volume e latência por fonte no intervalo [start, end)."""
         pass
 
     @abstractmethod
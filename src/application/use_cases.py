@@ -1,32 +1,87 @@
+from datetime import date, datetime, time, timedelta
 from typing import List, Dict, Optional
-from src.domain.models import Auction, AuctionFilter, Evaluation, EvaluationStatus, DetailedAnalysis, ScraperRunFilter
+from src.domain.models import Auction, AuctionFilter, AuctionSearchPage, AuditoriaSnapshot, AuctionFramePage, AuctionPage, BatchWriteResult, FilterFacets, Evaluation, EvaluationStatus, DetailedAnalysis, FinalizadosIndicators, PortfolioPage, PortfolioQuery, PortfolioSummary, ScraperLatencyBucket, ScraperRunFilter, ScraperRunStats, SearchScope, StatusTransition
 from src.application.interfaces import AuctionRepository
 from src.domain.isj_calculator import IsjCalculator
 
+class PrepareTriageQueueUseCase:
+    """Caso de uso: Inscrever o usuário na fila de triagem (carga inicial única, fora das leituras)."""
+    def __init__(self, repository: AuctionRepository):
+        self.repository = repository
+
+    def execute(self, user_id: str) -> int:
+        return self.repository.ensure_pending_queue(user_id)
+
 class GetPendingAuctionsUseCase:
     """Caso de uso: Recuperar fila de triagem para o usuário."""
     def __init__(self, repository: AuctionRepository):
         self.repository = repository
 
     def execute(self, user_id: str, uf: List[str] = None, cidade: List[str] = None, 
-                tipo_bem: List[str] = None, site: List[str] = None, status_imovel: List[str] = None) -> List[Auction]:
+                tipo_bem: List[str] = None, site: List[str] = None, status_imovel: List[str] = None,
+                cursor: Optional[int] = None, page_size: int = 15) -> AuctionPage:
+        filters = AuctionFilter(uf=uf, cidade=cidade, tipo_bem=tipo_bem, site=site, status_imovel=status_imovel)
+        return self.repository.get_pending_auctions(user_id, filters, cursor=cursor, page_size=page_size)
+
+class GetPendingAuctionsFrameUseCase:
+    """Caso de uso: Fila de triagem já em DataFrame (leitura colunar, para as telas em tabela/cards)."""
+    def __init__(self, repository: AuctionRepository):
+        self.repository = repository
+
+    def execute(self, user_id: str, uf: List[str] = None, cidade: List[str] = None,
+                tipo_bem: List[str] = None, site: List[str] = None, status_imovel: List[str] = None,
+                cursor: Optional[int] = None, page_size: int = 15) -> AuctionFramePage:
         filters = AuctionFilter(uf=uf, cidade=cidade, tipo_bem=tipo_bem, site=site, status_imovel=status_imovel)
-        return self.repository.get_pending_auctions(user_id, filters)
+        return self.repository.get_pending_auctions_frame(user_id, filters, cursor=cursor, page_size=page_size)
 
-class GetPortfolioAuctionsUseCase:
+class SearchAuctionsUseCase:
+    """Caso de uso: Busca por título ou ID (triagem, carteira ou toda a base), em ordem de relevância."""
+    def __init__(self, repository: AuctionRepository):
+        self.repository = repository
+
+    def execute(self, user_id: str, query: str, scope: SearchScope = SearchScope.TODOS,
+                uf: List[str] = None, cidade: List[str] = None, tipo_bem: List[str] = None,
+                site: List[str] = None, status_imovel: List[str] = None, statuses: List[str] = None,
+                offset: int = 0, page_size: int = 20, min_valor: Optional[float] = None,
+                max_valor: Optional[float] = None, no_bid_reasons: List[str] = None) -> AuctionSearchPage:
+        """`min_valor`, `max_valor` e `no_bid_reasons`: filtros da carteira (scope=CARTEIRA)."""
+        if not query or not query.strip():
+            return AuctionSearchPage(offset=offset, page_size=page_size)
+        filters = AuctionFilter(uf=uf, cidade=cidade, tipo_bem=tipo_bem, site=site, status_imovel=status_imovel)
+        return self.repository.search_auctions(
+            user_id, query.strip(), scope=scope, filters=filters, statuses=statuses, offset=offset, page_size=page_size,
+            min_valor=min_valor, max_valor=max_valor, no_bid_reasons=no_bid_reasons
+        )
+
+class GetPortfolioPageUseCase:
     """
-    Caso de uso: Recuperar itens aprovados ('Analisar', 'Participar', 'No Bid') para a Carteira.
-    NOTA: Renomeado de GetPortfolioUseCase para evitar erros de importação.
+    Caso de uso: Página de uma aba da Carteira com filtros, ordenação e paginação executados
+    no repositório (não carrega a carteira inteira).
     """
     def __init__(self, repository: AuctionRepository):
         self.repository = repository
-    
-    def execute(self, user_id: str) -> List[Auction]:
-        # Busca os leilões do repositório
-        auctions = self.repository.get_portfolio_auctions(user_id)
-        
-        # Ordena: os que vencem mais cedo (menor data_ordenacao) no topo
-        return sorted(auctions, key=lambda x: x.data_ordenacao)
+
+    def execute(self, user_id: str, query: PortfolioQuery) -> PortfolioPage:
+        return self.repository.get_portfolio_page(user_id, query)
+
+class GetPortfolioSummaryUseCase:
+    """Caso de uso: Contagens por status da Carteira (badges das abas) e escala do filtro de valor."""
+    def __init__(self, repository: AuctionRepository):
+        self.repository = repository
+
+    def execute(self, user_id: str, query: Optional[PortfolioQuery] = None) -> PortfolioSummary:
+        return self.repository.get_portfolio_summary(user_id, query)
+
+class GetFinalizadosIndicatorsUseCase:
+    """
+    Caso de uso: Painel de desempenho da aba Finalizados (totais, taxas, capital evitado,
+    motivos do No Bid, UF e série mensal), agregado no repositório.
+    """
+    def __init__(self, repository: AuctionRepository):
+        self.repository = repository
+
+    def execute(self, user_id: str) -> FinalizadosIndicators:
+        return self.repository.get_finalizados_indicators(user_id)
 
 class GetDetailedAnalysisUseCase:
     """Caso de uso: Recuperar os dados da análise profunda (Jurídico/Financeiro)."""
@@ -49,7 +104,7 @@ class SubmitBatchEvaluationUseCase:
     def __init__(self, repository: AuctionRepository):
         self.repository = repository
 
-    def execute(self, user_id: str, items: List[dict], decision: EvaluationStatus) -> int:
+    def execute(self, user_id: str, items: List[dict], decision: EvaluationStatus) -> BatchWriteResult:
         evaluations_to_save = []
         for item in items:
             evaluation = Evaluation(
@@ -62,18 +117,38 @@ class SubmitBatchEvaluationUseCase:
         return self.repository.save_evaluations(evaluations_to_save)
     
 class GetFilterOptionsUseCase:
+    """Caso de uso: Facetas da triagem (opções de filtro com contagens, em cascata)."""
     def __init__(self, repository: AuctionRepository):
         self.repository = repository
 
-    def execute(self):
-        return self.repository.get_filter_options()
+    def execute(self, user_id: str, uf: List[str] = None, cidade: List[str] = None,
+                tipo_bem: List[str] = None, site: List[str] = None, status_imovel: List[str] = None) -> FilterFacets:
+        filters = AuctionFilter(uf=uf, cidade=cidade, tipo_bem=tipo_bem, site=site, status_imovel=status_imovel)
+        return self.repository.get_filter_facets(user_id, filters)
 
 class GetUserStatsUseCase:
     def __init__(self, repository: AuctionRepository):
         self.repository = repository
 
-    def execute(self, user_id: str) -> Dict[str, int]:
-        return self.repository.get_stats(user_id)
+    def execute(self, user_id: str, start_date: Optional[date] = None,
+                end_date: Optional[date] = None) -> Dict[str, int]:
+        """Produtividade do usuário no período (padrão: hoje)."""
+        return self.repository.get_stats(user_id, start_date=start_date, end_date=end_date)
+
+class GetAuditoriaSnapshotUseCase:
+    """
+    Caso de Uso: Abrir Auditoria.
+    Carrega cabeçalho do leilão e análise do usuário; se a análise ainda não existe,
+    devolve uma nova em branco para o formulário.
+    """
+    def __init__(self, repository: AuctionRepository):
+        self.repository = repository
+
+    def execute(self, user_id: str, site: str, id_leilao: str) -> AuditoriaSnapshot:
+        snapshot = self.repository.get_auditoria_snapshot(site, id_leilao, user_id)
+        if snapshot.analysis is None:
+            snapshot.analysis = DetailedAnalysis(site=site, id_leilao=id_leilao, usuario_id=user_id)
+        return snapshot
 
 class SaveAuditoriaRascunhoUseCase:
     """
@@ -117,12 +192,7 @@ class FinalizarAuditoriaUseCase:
         self.repository.save_auditoria_rascunho(analysis)
         
         # 2. Atualiza o status do leilão na tabela de avaliações (tabela core)
-        self.repository.update_status(
-            user_id=user_id,
-            site=analysis.site,
-            id_leilao=analysis.id_leilao,
-            new_status=novo_status
-        )
+        _transition_analysis(self.repository, user_id, analysis, novo_status)
         
         return novo_status.value
     
@@ -148,11 +218,33 @@ class DescartarAuditoriaUseCase:
         
         # 2. Atualiza o status do leilão para NO_BID (fim da linha na Aba 3)
         # O Enum DESCARTAR é exclusivo da Triagem (Aba 1). Na auditoria_v2 usamos NO_BID.
-        self.repository.update_status(
-            user_id=user_id,
-            site=analysis.site,
-            id_leilao=analysis.id_leilao,
-            new_status=EvaluationStatus.NO_BID
+        _transition_analysis(self.repository, user_id, analysis, EvaluationStatus.NO_BID)
+
+class TransitionStatusesUseCase:
+    """
+    Caso de uso: Mover vários leilões da carteira para um novo status de uma só vez
+    (ex: marcar selecionados como disputa perdida).
+    """
+    def __init__(self, repository: AuctionRepository):
+        self.repository = repository
+
+    def execute(self, user_id: str, keys: List[tuple], new_status: EvaluationStatus) -> BatchWriteResult:
+        """
+        :param keys: Pares (site, id_leilao) dos leilões selecionados.
+        :return: Quantos foram movidos e quais não existem mais na base analítica.
+        """
+        transitions = [StatusTransition(site, id_leilao, new_status) for site, id_leilao in keys]
+        return self.repository.transition_statuses(user_id, transitions)
+
+def _transition_analysis(repository: AuctionRepository, user_id: str,
+                         analysis: DetailedAnalysis, new_status: EvaluationStatus) -> None:
+    """Aplica a transição de status do leilão auditado (falha se ele sumiu da base analítica)."""
+    result = repository.transition_statuses(
+        user_id, [StatusTransition(analysis.site, analysis.id_leilao, new_status)]
+    )
+    if result.skipped:
+        raise RuntimeError(
+            f"Falha de integridade: Leilão {analysis.id_leilao} no site {analysis.site} não encontrado na base analítica."
         )
 
 class GetScraperRunsUseCase:
@@ -161,9 +253,71 @@ class GetScraperRunsUseCase:
         self.repository = repository
 
     def execute(self, start_date: Optional[str] = None, end_date: Optional[str] = None,
-                sources: Optional[List[str]] = None, statuses: Optional[List[str]] = None) -> List[Dict]:
+                sources: Optional[List[str]] = None, statuses: Optional[List[str]] = None,
+                limit: Optional[int] = None, offset: int = 0) -> List[Dict]:
         filters = ScraperRunFilter(start_date=start_date, end_date=end_date, sources=sources, statuses=statuses)
-        return self.repository.get_scraper_runs(filters)
+        return self.repository.get_scraper_runs(filters, limit=limit, offset=offset)
+
+class GetScraperRunsFrameUseCase:
+    """Caso de uso: Execuções dos scrapers já em DataFrame (tabela de dados brutos do monitoramento)."""
+    def __init__(self, repository: AuctionRepository):
+        self.repository = repository
+
+    def execute(self, start_date: Optional[str] = None, end_date: Optional[str] = None,
+                sources: Optional[List[str]] = None, statuses: Optional[List[str]] = None,
+                limit: Optional[int] = None, offset: int = 0):
+        filters = ScraperRunFilter(start_date=start_date, end_date=end_date, sources=sources, statuses=statuses)
+        return self.repository.get_scraper_runs_frame(filters, limit=limit, offset=offset)
+
+class GetScraperRunStatsUseCase:
+    """Caso de uso: Indicadores agregados das execuções dos scrapers (calculados no banco)."""
+    def __init__(self, repository: AuctionRepository):
+        self.repository = repository
+
+    def execute(self, start_date: Optional[date] = None, end_date: Optional[date] = None,
+                sources: Optional[List[str]] = None, statuses: Optional[List[str]] = None) -> ScraperRunStats:
+        filters = ScraperRunFilter(start_date=start_date, end_date=end_date, sources=sources, statuses=statuses)
+        return self.repository.get_scraper_run_stats(filters)
+
+class FoldScraperRunsUseCase:
+    """
+    Caso de uso: Atualizar o rollup de execuções dos scrapers.
+    Roda no job `python -m src.infra.database.jobs fold-scraper-runs` (agendado ou ao fim
+    da execução dos scrapers), nunca numa leitura do monitoramento.
+    """
+    def __init__(self, repository: AuctionRepository):
+        self.repository = repository
+
+    def execute(self) -> int:
+        return self.repository.fold_scraper_runs()
+
+class GetScraperLatencyHistoryUseCase:
+    """
+    Caso de uso: Histórico de latência e volume dos scrapers a partir do rollup.
+    Somente leitura: o rollup é atualizado pelo FoldScraperRunsUseCase, fora das telas.
+    """
+    def __init__(self, repository: AuctionRepository):
+        self.repository = repository
+
+    def execute(self, start_date: date, end_date: date, sources: Optional[List[str]] = None,
+                granularity: str = "day", combine_sources: bool = False) -> List[ScraperLatencyBucket]:
+        """
+        :param granularity: 'hour' ou 'day'.
+        :param combine_sources: Se True, soma as fontes em uma única série ("Todas").
+        """
+        start = datetime.combine(start_date, time.min)
+        end = datetime.combine(end_date + timedelta(days=1), time.min)
+        buckets = self.repository.get_scraper_latency_history(sources, start, end, granularity)
+        if not combine_sources:
+            return buckets
+
+        por_inicio: Dict[datetime, List[ScraperLatencyBucket]] = {}
+        for bucket in buckets:
+            por_inicio.setdefault(bucket.bucket_start, []).append(bucket)
+        return [
+            ScraperLatencyBucket.combine(grupo, "Todas", inicio)
+            for inicio, grupo in sorted(por_inicio.items())
+        ]
 
 class GetScraperSourcesUseCase:
     """Caso de uso: Obter a lista de nomes de fontes de scraper."""
@@ -1,6 +1,6 @@
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 from datetime import datetime, date
-from typing import Optional, List
+from typing import Any, Dict, Optional, List, Tuple, Set, Iterable
 from enum import Enum
 
 # --- ENUMS DE APOIO ---
@@ -113,6 +113,7 @@ class Auction:
     :param data_1_praca: Data da primeira praca do leilão (opcional).
     :param data_2_praca: Data da segunda praca do leilão (opcional).
     :param status_carteira: Status da carteira do leilão (opcional).
+    :param id_registro_bruto: Chave do registro bruto, usada como cursor de paginação (opcional).
     """
     site: str
     id_leilao: str
@@ -130,6 +131,7 @@ class Auction:
     status_carteira: Optional[str] = None
     no_bid_reason: Optional[str] = None
     status_imovel: Optional[str] = None
+    id_registro_bruto: Optional[int] = None
 
     @property
     def unique_id(self) -> str:
@@ -170,6 +172,238 @@ class AuctionFilter:
     tipo_leilao: Optional[List[str]] = None
     status_imovel: Optional[List[str]] = None
 
+@dataclass
+class FacetValue:
+    """
+    Um valor de faceta com suas contagens.
+
+    :param value: Valor da faceta (ex: 'SP').
+    :param count: Leilões pendentes com este valor, considerando os filtros das DEMAIS facetas
+                  (é o número exibido como opção do filtro).
+    :param count_filtered: Leilões pendentes com este valor dentro da seleção completa
+                           (usado nos gráficos do dashboard).
+    """
+    value: str
+    count: int
+    count_filtered: int = 0
+
+@dataclass
+class FilterFacets:
+    """
+    Índice facetado da fila de triagem: opções de cada filtro com contagens,
+    já restritas pelos filtros selecionados (ex: as cidades acompanham a UF escolhida).
+
+    :param total: Total de pendentes dentro da seleção completa.
+    :param volume_1_praca: Soma de valor_1_praca dentro da seleção completa.
+    """
+    uf: List[FacetValue] = field(default_factory=list)
+    cidade: List[FacetValue] = field(default_factory=list)
+    tipo_bem: List[FacetValue] = field(default_factory=list)
+    site: List[FacetValue] = field(default_factory=list)
+    status_imovel: List[FacetValue] = field(default_factory=list)
+    total: int = 0
+    volume_1_praca: float = 0.0
+
+    # Nomes das facetas, na mesma ordem dos campos de AuctionFilter
+    FIELDS = ("uf", "cidade", "tipo_bem", "site", "status_imovel")
+
+    def options(self, facet: str) -> List[str]:
+        """Valores disponíveis para uma faceta (somente os que ainda retornam resultados)."""
+        return [f.value for f in getattr(self, facet) if f.count > 0]
+
+@dataclass
+class AuctionPage:
+    """
+    Página da fila de triagem (paginação por cursor/keyset).
+
+    :param items: Leilões da página atual.
+    :param next_cursor: Token da próxima página (id_registro_bruto do último item), ou None se for a última.
+    :param page_size: Tamanho de página solicitado.
+    """
+    items: List[Auction] = field(default_factory=list)
+    next_cursor: Optional[int] = None
+    page_size: int = 15
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+@dataclass
+class AuctionFramePage:
+    """
+    Página da fila de triagem em formato colunar (mesma paginação por cursor de AuctionPage).
+
+    :param frame: pandas.DataFrame com uma linha por leilão e as colunas da fila
+        (texto repetido como `category`, valores float64, datas datetime64).
+    :param next_cursor: Token da próxima página (id_registro_bruto do último item), ou None se for a última.
+    :param page_size: Tamanho de página solicitado.
+    """
+    frame: Any
+    next_cursor: Optional[int] = None
+    page_size: int = 15
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+class SearchScope(str, Enum):
+    """
+    Conjunto pesquisado pela busca textual.
+
+    - TRIAGEM: fila de triagem do usuário (leilões ainda não avaliados).
+    - CARTEIRA: itens da carteira do usuário (Analisar, Participar, No Bid, Outbid).
+    - TODOS: toda a base analítica.
+    """
+    TRIAGEM = "triagem"
+    CARTEIRA = "carteira"
+    TODOS = "todos"
+
+@dataclass
+class AuctionSearchPage:
+    """
+    Página da busca textual, em ordem de relevância (paginação por offset).
+
+    :param items: Leilões da página (na CARTEIRA, com status_carteira e no_bid_reason).
+    :param total: Total de leilões encontrados.
+    :param offset: Posição do primeiro item da página.
+    :param page_size: Tamanho de página solicitado.
+    """
+    items: List[Auction] = field(default_factory=list)
+    total: int = 0
+    offset: int = 0
+    page_size: int = 20
+
+    @property
+    def has_next(self) -> bool:
+        return self.offset + len(self.items) < self.total
+
+    @property
+    def next_cursor(self) -> Optional[int]:
+        """Offset da próxima página (mesma interface de AuctionPage para a navegação das telas)."""
+        return self.offset + len(self.items) if self.has_next else None
+
+class PortfolioSort(str, Enum):
+    """
+    Ordenações da listagem da Carteira.
+
+    - DATA_ORDENACAO: maior data entre as praças (Auction.data_ordenacao), mais próxima primeiro.
+    - DATA_2_PRACA: data da 2ª praça, mais próxima primeiro.
+    - MAIOR_VALOR: valor da 2ª praça, maior primeiro.
+    Leilões sem a data (ou valor) ficam por último.
+    """
+    DATA_ORDENACAO = "data_ordenacao"
+    DATA_2_PRACA = "data_2_praca"
+    MAIOR_VALOR = "maior_valor"
+
+@dataclass
+class PortfolioQuery:
+    """
+    Filtros, ordenação e página da listagem da Carteira (executados no banco).
+
+    :param statuses: Status da carteira (aba); None para todos (Analisar, Participar, No Bid, Outbid).
+    :param min_valor: Valor mínimo da 2ª praça (None = sem limite).
+    :param max_valor: Valor máximo da 2ª praça (None = sem limite).
+    :param no_bid_reasons: Motivos de No Bid (valores de NoBidReason) gravados na análise.
+    :param sort: Ordenação da listagem.
+    :param cursor: `next_cursor` da página anterior (None para a primeira página).
+    :param page_size: Tamanho de página.
+    """
+    statuses: Optional[List[str]] = None
+    min_valor: Optional[float] = None
+    max_valor: Optional[float] = None
+    no_bid_reasons: Optional[List[str]] = None
+    sort: PortfolioSort = PortfolioSort.DATA_ORDENACAO
+    cursor: Optional[Tuple[Any, int]] = None
+    page_size: int = 20
+
+@dataclass
+class PortfolioPage:
+    """
+    Página da Carteira (paginação por cursor/keyset na ordenação escolhida).
+
+    :param items: Leilões da página, com status_carteira e no_bid_reason.
+    :param next_cursor: Token da próxima página ((chave de ordenação, id_registro_bruto) do último item),
+                        ou None se for a última.
+    :param page_size: Tamanho de página solicitado.
+    """
+    items: List[Auction] = field(default_factory=list)
+    next_cursor: Optional[Tuple[Any, int]] = None
+    page_size: int = 20
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+@dataclass
+class PortfolioSummary:
+    """
+    Contagens da Carteira por status (badges das abas) e maior valor da 2ª praça (escala do filtro de valor).
+
+    :param counts: Itens por status de avaliação (somente status presentes).
+    :param max_valor_2_praca: Maior valor da 2ª praça entre os itens contados.
+    """
+    counts: Dict[str, int] = field(default_factory=dict)
+    max_valor_2_praca: float = 0.0
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+    def count(self, statuses: Iterable[str]) -> int:
+        return sum(self.counts.get(status, 0) for status in statuses)
+
+@dataclass
+class FinalizadosReasonCount:
+    """Leilões NO_BID de um motivo (None = motivo não informado na análise)."""
+    reason: Optional[str]
+    total: int
+    valor_2_praca: float = 0.0
+
+@dataclass
+class FinalizadosUfBucket:
+    """Leilões finalizados de uma UF em um status (NO_BID ou OUTBID)."""
+    uf: Optional[str]
+    status: str
+    total: int
+
+@dataclass
+class FinalizadosMonthlyBucket:
+    """Leilões finalizados em um mês (data da última mudança de status) em um status."""
+    mes: date
+    status: str
+    total: int
+
+@dataclass
+class FinalizadosIndicators:
+    """
+    Indicadores da aba Finalizados da Carteira (painel de desempenho).
+
+    :param no_bid: Leilões descartados na análise detalhada (NO_BID).
+    :param outbid: Leilões com disputa perdida (OUTBID).
+    :param capital_evitado: Soma do valor da 2ª praça dos leilões NO_BID.
+    :param by_reason: Leilões NO_BID por motivo, do mais frequente para o menos.
+    :param by_uf: Finalizados por UF e status.
+    :param monthly: Finalizados por mês e status, em ordem cronológica.
+    """
+    no_bid: int = 0
+    outbid: int = 0
+    capital_evitado: float = 0.0
+    by_reason: List[FinalizadosReasonCount] = field(default_factory=list)
+    by_uf: List[FinalizadosUfBucket] = field(default_factory=list)
+    monthly: List[FinalizadosMonthlyBucket] = field(default_factory=list)
+
+    @property
+    def total(self) -> int:
+        return self.no_bid + self.outbid
+
+    @property
+    def taxa_no_bid(self) -> float:
+        return (self.no_bid / self.total * 100) if self.total else 0.0
+
+    @property
+    def taxa_outbid(self) -> float:
+        return (self.outbid / self.total * 100) if self.total else 0.0
+
 @dataclass
 class Evaluation:
     """
@@ -187,6 +421,30 @@ class Evaluation:
     avaliacao: EvaluationStatus
     data_analise: datetime = field(default_factory=datetime.now)
 
+@dataclass
+class BatchWriteResult:
+    """
+    Resultado de uma escrita em lote.
+
+    :param saved: Número de registros gravados.
+    :param skipped: Pares (site, id_leilao) ignorados por não existirem na base analítica.
+    """
+    saved: int = 0
+    skipped: List[Tuple[str, str]] = field(default_factory=list)
+
+@dataclass
+class StatusTransition:
+    """
+    Mudança de status de avaliação de um leilão (usada nas transições em lote).
+
+    :param site: Site de origem do leilão.
+    :param id_leilao: Identificador do leilão no site.
+    :param new_status: Novo status de avaliação.
+    """
+    site: str
+    id_leilao: str
+    new_status: EvaluationStatus
+
 # --- ENTIDADE DE AUDITORIA DETALHADA (V2.0) ---
 
 @dataclass
@@ -274,6 +532,39 @@ class DetailedAnalysis:
     no_bid_reason: Optional[NoBidReason] = None
     no_bid_observation: Optional[str] = None
 
+    # --- Controle de alterações (não persistido) ---
+    # Estado do último load/save; None = ainda não sincronizado com o banco.
+    _clean_state: Optional[dict] = field(default=None, init=False, repr=False, compare=False)
+
+    # Campos fora do diff: o próprio controle e o carimbo de data gerado no save
+    _UNTRACKED_FIELDS = ("_clean_state", "data_atualizacao")
+
+    def _snapshot(self) -> dict:
+        return {
+            f.name: list(value) if isinstance(value, list) else value
+            for f in fields(self) if f.name not in self._UNTRACKED_FIELDS
+            for value in (getattr(self, f.name),)
+        }
+
+    def mark_clean(self) -> None:
+        """Registra o estado atual como o último carregado/salvo no banco."""
+        self._clean_state = self._snapshot()
+
+    def dirty_fields(self) -> Set[str]:
+        """
+        Campos alterados desde o último load/save.
+        Se a análise nunca foi sincronizada com o banco, todos os campos são considerados alterados.
+        """
+        current = self._snapshot()
+        if self._clean_state is None:
+            return set(current)
+        return {name for name, value in current.items() if self._clean_state.get(name) != value}
+
+    @property
+    def is_persisted(self) -> bool:
+        """Indica se a análise foi carregada do banco ou já salva nesta sessão."""
+        return self._clean_state is not None
+
     # --- Propriedades de Compatibilidade (Getters) ---
     @property
     def reu_citado(self) -> bool:
@@ -307,6 +598,17 @@ class DetailedAnalysis:
             return 0.0
         return (self.proc_debito_atualizado / self.vlr_avaliacao) * 100
 
+@dataclass
+class AuditoriaSnapshot:
+    """
+    Dados da tela de auditoria carregados de uma vez: cabeçalho do leilão e análise do usuário.
+
+    :param auction: Dados básicos do leilão (None se não estiver na base analítica).
+    :param analysis: Análise detalhada do usuário (None se ainda não foi iniciada).
+    """
+    auction: Optional[Auction] = None
+    analysis: Optional[DetailedAnalysis] = None
+
 # --- ENTIDADES DE MONITORAMENTO DE SCRAPER ---
 
 @dataclass
@@ -326,6 +628,10 @@ class ScraperRun:
     raw_items_collected: Optional[int]
     mapped_items_count: Optional[int]
     error_details: Optional[str]
+    avg_latency_ms: Optional[int] = None
+    p95_latency_ms: Optional[int] = None
+    max_pages_scraped: Optional[int] = None
+    parameters_used: Optional[dict] = None
 
 @dataclass
 class ScraperRunFilter:
@@ -333,4 +639,133 @@ class ScraperRunFilter:
     start_date: Optional[date] = None
     end_date: Optional[date] = None
     sources: Optional[List[str]] = None
-    statuses: Optional[List[str]] = None
\ No newline at end of file
+    statuses: Optional[List[str]] = None
+
+@dataclass
+class ScraperDailyBucket:
+    """Quantidade de execuções de um dia em um status."""
+    dia: date
+    run_status: str
+    total: int
+
+@dataclass
+class ScraperSourceTotals:
+    """Itens coletados e mapeados por uma fonte no período."""
+    source_name: str
+    raw_items_collected: int = 0
+    mapped_items_count: int = 0
+
+@dataclass
+class ScraperRunStats:
+    """
+    Agregados das execuções de scraper para os filtros do monitoramento.
+
+    :param avg_duration_success: Duração média (s) das execuções com SUCCESS (None se não houver).
+    :param daily: Execuções por dia e status.
+    :param by_source: Totais de itens por fonte.
+    """
+    total_runs: int = 0
+    success_runs: int = 0
+    total_collected: int = 0
+    total_mapped: int = 0
+    avg_duration_success: Optional[float] = None
+    daily: List[ScraperDailyBucket] = field(default_factory=list)
+    by_source: List[ScraperSourceTotals] = field(default_factory=list)
+
+    @property
+    def success_rate(self) -> float:
+        return (self.success_runs / self.total_runs * 100) if self.total_runs else 0.0
+
+@dataclass
+class ScraperLatencyBucket:
+    """
+    Bucket (hora ou dia) do rollup de execuções de uma fonte.
+    Guarda apenas componentes combináveis: médias e taxas são derivadas nas propriedades
+    e `merge` soma buckets (várias fontes no mesmo horário, dias em um mês etc.).
+    """
+    # Limites superiores (ms) do histograma do p95 por execução; o último bucket é "acima de 5000"
+    P95_BOUNDS_MS = (250, 500, 1000, 2000, 5000)
+
+    source_name: str
+    bucket_start: datetime
+    runs_total: int = 0
+    runs_success: int = 0
+    runs_failed: int = 0
+    total_requests: int = 0
+    successful_requests: int = 0
+    failed_requests: int = 0
+    raw_items_collected: int = 0
+    mapped_items_count: int = 0
+    max_pages_scraped: Optional[int] = None
+    latency_weighted_sum_ms: int = 0
+    latency_weight: int = 0
+    latency_min_ms: Optional[int] = None
+    latency_max_ms: Optional[int] = None
+    p95_max_ms: Optional[int] = None
+    p95_histogram: List[int] = field(default_factory=lambda: [0] * 6)
+
+    @property
+    def avg_latency_ms(self) -> Optional[float]:
+        """Latência média ponderada pelo número de requisições de cada execução."""
+        return self.latency_weighted_sum_ms / self.latency_weight if self.latency_weight else None
+
+    @property
+    def failure_ratio(self) -> float:
+        return self.failed_requests / self.total_requests if self.total_requests else 0.0
+
+    def p95_percentile_ms(self, q: float = 0.95) -> Optional[int]:
+        """
+        Estimativa (limite superior do bucket do histograma) do percentil q do p95 das execuções.
+        Acima do último limite usa o máximo observado.
+        """
+        total = sum(self.p95_histogram)
+        if not total:
+            return None
+        acumulado = 0
+        for i, quantidade in enumerate(self.p95_histogram):
+            acumulado += quantidade
+            if acumulado >= q * total:
+                return self.P95_BOUNDS_MS[i] if i < len(self.P95_BOUNDS_MS) else self.p95_max_ms
+        return self.p95_max_ms
+
+    def merge(self, other: "ScraperLatencyBucket", source_name: Optional[str] = None,
+              bucket_start: Optional[datetime] = None) -> "ScraperLatencyBucket":
+        """Combina dois buckets (somas somam, mínimos/máximos se comparam)."""
+        def _min(a, b):
+            return b if a is None else a if b is None else min(a, b)
+
+        def _max(a, b):
+            return b if a is None else a if b is None else max(a, b)
+
+        return ScraperLatencyBucket(
+            source_name=source_name or self.source_name,
+            bucket_start=bucket_start or min(self.bucket_start, other.bucket_start),
+            runs_total=self.runs_total + other.runs_total,
+            runs_success=self.runs_success + other.runs_success,
+            runs_failed=self.runs_failed + other.runs_failed,
+            total_requests=self.total_requests + other.total_requests,
+            successful_requests=self.successful_requests + other.successful_requests,
+            failed_requests=self.failed_requests + other.failed_requests,
+            raw_items_collected=self.raw_items_collected + other.raw_items_collected,
+            mapped_items_count=self.mapped_items_count + other.mapped_items_count,
+            max_pages_scraped=_max(self.max_pages_scraped, other.max_pages_scraped),
+            latency_weighted_sum_ms=self.latency_weighted_sum_ms + other.latency_weighted_sum_ms,
+            latency_weight=self.latency_weight + other.latency_weight,
+            latency_min_ms=_min(self.latency_min_ms, other.latency_min_ms),
+            latency_max_ms=_max(self.latency_max_ms, other.latency_max_ms),
+            p95_max_ms=_max(self.p95_max_ms, other.p95_max_ms),
+            p95_histogram=[a + b for a, b in zip(self.p95_histogram, other.p95_histogram)]
+        )
+
+    @staticmethod
+    def combine(buckets: Iterable["ScraperLatencyBucket"], source_name: str,
+                bucket_start: Optional[datetime] = None) -> Optional["ScraperLatencyBucket"]:
+        """Combina vários buckets em um só (None se a lista for vazia)."""
+        buckets = list(buckets)
+        if not buckets:
+            return None
+        start = bucket_start or min(b.bucket_start for b in buckets)
+        result = ScraperLatencyBucket(source_name=source_name, bucket_start=start)
+        for bucket in buckets:
+            result = result.merge(bucket, source_name, start)
+        return result
@@ -0,0 +1,248 @@
+import os
+import re
+import statistics
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+@dataclass
+class StatementRecord:
+    """Um statement executado dentro de um caso de uso (SQL normalizado, sem valores)."""
+    sql: str
+    duration_ms: float
+    rows: int
+    executemany: bool = False
+    failed: bool = False  # terminou em erro (ex: statement_timeout, erro de SQL)
+
+
+@dataclass
+class UseCaseTrace:
+    """Statements emitidos por uma execução de caso de uso."""
+    use_case: str
+    started_at: datetime
+    duration_ms: float = 0.0
+    statements: List[StatementRecord] = field(default_factory=list)
+
+    @property
+    def query_count(self) -> int:
+        return len(self.statements)
+
+    @property
+    def sql_ms(self) -> float:
+        return sum(s.duration_ms for s in self.statements)
+
+    @property
+    def rows(self) -> int:
+        return sum(s.rows for s in self.statements)
+
+    def slow_statements(self, slow_ms: float) -> List[StatementRecord]:
+        return [s for s in self.statements if s.duration_ms >= slow_ms]
+
+    def failed_statements(self) -> List[StatementRecord]:
+        return [s for s in self.statements if s.failed]
+
+    def repeated_statements(self, threshold: int) -> List[Tuple[str, int]]:
+        """
+        Padrão N+1: o mesmo SQL (só mudam os parâmetros) executado `threshold` vezes ou mais
+        na mesma execução, em vez de uma consulta em lote. executemany não conta (já é lote).
+        """
+        counts = Counter(s.sql for s in self.statements if not s.executemany)
+        return [(sql, n) for sql, n in counts.most_common() if n >= threshold]
+
+
+@dataclass
+class UseCaseAggregate:
+    """Consolidado das execuções recentes (buffer) de um caso de uso, para o painel de diagnóstico."""
+    use_case: str
+    calls: int
+    avg_queries: float
+    max_queries: int
+    avg_sql_ms: float
+    p95_ms: float
+    rows: int
+    slow_statements: int
+    n_plus_one_calls: int
+    failed_statements: int = 0
+
+
+# Parâmetros do psycopg2 (pyformat) e listas expandidas de IN/VALUES
+_PARAM = re.compile(r"%\(\w+\)s|%s")
+_PARAM_LIST = re.compile(r"\?(?:\s*,\s*\?)+")
+_ROW_LIST = re.compile(r"\(\?\)(?:\s*,\s*\(\?\))+")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_sql(statement: str) -> str:
+    """SQL sem parâmetros e com listas colapsadas: a mesma consulta com valores diferentes vira a mesma chave."""
+    sql = _PARAM.sub("?", statement)
+    sql = _PARAM_LIST.sub("?", sql)
+    sql = _ROW_LIST.sub("(?)", sql)
+    return _SPACES.sub(" ", sql).strip()
+
+
+class QueryMonitor:
+    """
+    Instrumentação das consultas SQL por caso de uso.
+
+    Os eventos do engine atribuem cada statement (duração, linhas) ao caso de uso ativo
+    na thread (ContextVar), e cada execução encerrada vai para um buffer circular.
+    Statements fora de um caso de uso (acesso direto ao repositório) só entram nos
+    contadores de "não atribuídos". Thread-safe.
+    """
+
+    def __init__(self, capacity: int = 500, slow_ms: float = 200.0, n_plus_one_threshold: int = 5):
+        self.slow_ms = slow_ms
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self._traces: Deque[UseCaseTrace] = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._active: ContextVar[Optional[UseCaseTrace]] = ContextVar(f"query_monitor_{id(self)}", default=None)
+        self._unattributed_queries = 0
+        self._unattributed_ms = 0.0
+
+    @classmethod
+    def from_env(cls, env=None) -> Optional["QueryMonitor"]:
+        """
+        Monitor configurado por variáveis de ambiente (None se desligado):
+        - QUERY_MONITOR_ENABLED: liga/desliga a instrumentação (padrão: ligada).
+        - QUERY_MONITOR_BUFFER: execuções de casos de uso guardadas no buffer circular.
+        - QUERY_SLOW_MS: duração a partir da qual um statement é sinalizado como lento.
+        - QUERY_N_PLUS_ONE_MIN: repetições do mesmo SQL numa execução para sinalizar N+1.
+        """
+        env = os.environ if env is None else env
+        if (env.get("QUERY_MONITOR_ENABLED") or "true").strip().lower() not in ("1", "true", "yes", "sim", "on"):
+            return None
+        return cls(
+            capacity=int(env.get("QUERY_MONITOR_BUFFER") or 500),
+            slow_ms=float(env.get("QUERY_SLOW_MS") or 200.0),
+            n_plus_one_threshold=int(env.get("QUERY_N_PLUS_ONE_MIN") or 5),
+        )
+
+    # --- CAPTURA ---
+
+    def install(self, engine: Engine) -> None:
+        """Registra os eventos de execução no engine (uma vez por engine)."""
+        if not event.contains(engine, "before_cursor_execute", self._before_cursor_execute):
+            event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+            event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+            event.listen(engine, "handle_error", self._handle_error)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_monitor_started", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        duration_ms = (time.perf_counter() - conn.info["query_monitor_started"].pop()) * 1000
+        # rowcount é -1 quando o driver não informa (ex: DDL)
+        self._record(statement, duration_ms, max(cursor.rowcount, 0), executemany)
+
+    def _handle_error(self, exception_context):
+        """
+        Statement que terminou em erro: after_cursor_execute não roda, então o tempo é fechado
+        aqui (senão ficaria na pilha da conexão) e o statement entra no trace como falha.
+        Erros fora da execução (fetch, conexão, pre-ping) não têm statement e são ignorados.
+        """
+        conn = exception_context.connection
+        started = conn.info.get("query_monitor_started") if conn is not None else None
+        if exception_context.statement is None or not started:
+            return
+        duration_ms = (time.perf_counter() - started.pop()) * 1000
+        executemany = bool(getattr(exception_context.execution_context, "executemany", False))
+        self._record(exception_context.statement, duration_ms, 0, executemany, failed=True)
+
+    def _record(self, statement: str, duration_ms: float, rows: int, executemany: bool, failed: bool = False) -> None:
+        trace = self._active.get()
+        if trace is None:
+            with self._lock:
+                self._unattributed_queries += 1
+                self._unattributed_ms += duration_ms
+            return
+        trace.statements.append(StatementRecord(normalize_sql(statement), duration_ms, rows, executemany, failed))
+
+    @contextmanager
+    def scope(self, use_case: str) -> Iterator[UseCaseTrace]:
+        """
+        Atribui ao caso de uso os statements executados dentro do bloco.
+        Casos de uso aninhados contam para o mais externo (o que a tela chamou).
+        """
+        current = self._active.get()
+        if current is not None:
+            yield current
+            return
+
+        trace = UseCaseTrace(use_case=use_case, started_at=datetime.now())
+        token = self._active.set(trace)
+        started = time.perf_counter()
+        try:
+            yield trace
+        finally:
+            trace.duration_ms = (time.perf_counter() - started) * 1000
+            self._active.reset(token)
+            with self._lock:
+                self._traces.append(trace)
+
+    def instrument(self, use_case: Any) -> "InstrumentedUseCase":
+        return InstrumentedUseCase(use_case, self)
+
+    # --- CONSULTA (painel de diagnóstico) ---
+
+    def recent(self) -> List[UseCaseTrace]:
+        """Execuções no buffer, da mais recente para a mais antiga."""
+        with self._lock:
+            return list(reversed(self._traces))
+
+    def unattributed(self) -> Tuple[int, float]:
+        """(statements, ms) executados fora de um caso de uso."""
+        with self._lock:
+            return self._unattributed_queries, self._unattributed_ms
+
+    def aggregates(self) -> List[UseCaseAggregate]:
+        """Consolidado por caso de uso das execuções do buffer, dos que mais consultam o banco primeiro."""
+        by_use_case: Dict[str, List[UseCaseTrace]] = {}
+        for trace in self.recent():
+            by_use_case.setdefault(trace.use_case, []).append(trace)
+
+        result = []
+        for use_case, traces in by_use_case.items():
+            durations = sorted(t.duration_ms for t in traces)
+            result.append(UseCaseAggregate(
+                use_case=use_case,
+                calls=len(traces),
+                avg_queries=statistics.fmean(t.query_count for t in traces),
+                max_queries=max(t.query_count for t in traces),
+                avg_sql_ms=statistics.fmean(t.sql_ms for t in traces),
+                p95_ms=durations[min(len(durations) - 1, int(0.95 * len(durations)))],
+                rows=sum(t.rows for t in traces),
+                slow_statements=sum(len(t.slow_statements(self.slow_ms)) for t in traces),
+                n_plus_one_calls=sum(1 for t in traces if t.repeated_statements(self.n_plus_one_threshold)),
+                failed_statements=sum(len(t.failed_statements()) for t in traces),
+            ))
+        return sorted(result, key=lambda a: a.avg_queries * a.calls, reverse=True)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._traces.clear()
+            self._unattributed_queries = 0
+            self._unattributed_ms = 0.0
+
+
+class InstrumentedUseCase:
+    """Envolve um caso de uso: cada `execute` abre um escopo do monitor com o nome da classe."""
+
+    def __init__(self, use_case: Any, monitor: QueryMonitor):
+        self._use_case = use_case
+        self._monitor = monitor
+
+    def execute(self, *args, **kwargs):
+        with self._monitor.scope(type(self._use_case).__name__):
+            return self._use_case.execute(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._use_case, name)
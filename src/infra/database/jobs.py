@@ -0,0 +1,47 @@
+"""
+Jobs de manutenção do banco, fora do caminho das telas.
+
+Uso:
+    python -m src.infra.database.jobs fold-scraper-runs                 # uma passada
+    python -m src.infra.database.jobs fold-scraper-runs --interval 300  # em loop (a cada 5 min)
+
+fold-scraper-runs incorpora ao rollup de latência/volume (scraper_runs_rollup) as execuções
+dos scrapers concluídas desde a última passada. Rode ao fim de cada execução dos scrapers
+ou em um agendador (cron); o monitoramento só lê o rollup.
+"""
+import argparse
+import sys
+import time
+
+from src.application.use_cases import FoldScraperRunsUseCase
+from src.infra.database.config import session_scope
+from src.infra.repositories.postgres_repo import PostgresAuctionRepository
+
+
+def fold_scraper_runs() -> int:
+    """Uma passada do fold; retorna quantas execuções foram somadas ao rollup."""
+    with session_scope() as session:
+        return FoldScraperRunsUseCase(PostgresAuctionRepository(session)).execute()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.infra.database.jobs",
+        description="Jobs de manutenção do banco (DATABASE_URL)."
+    )
+    parser.add_argument("command", choices=["fold-scraper-runs"])
+    parser.add_argument("--interval", type=float, default=0,
+                        help="Segundos entre as passadas (0 = uma passada e sai).")
+    args = parser.parse_args(argv)
+
+    while True:
+        started = time.perf_counter()
+        folded = fold_scraper_runs()
+        print(f"{folded} execuções somadas ao rollup em {time.perf_counter() - started:.2f}s", flush=True)
+        if not args.interval:
+            return 0
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,163 @@
+-- Esquema base das quatro tabelas centrais e dos índices usados pelo repositório.
+-- Idempotente: em bancos já existentes só cria o que faltar (colunas novas e índices).
+
+-- Dados raspados (Scraper)
+CREATE TABLE IF NOT EXISTS public.leiloes_analiticos (
+    id_registro_bruto int4 NOT NULL,
+    site varchar NULL,
+    id_leilao varchar NULL,
+    titulo varchar NULL,
+    uf varchar NULL,
+    cidade varchar NULL,
+    tipo_leilao varchar NULL,
+    tipo_bem varchar NULL,
+    valor_1_praca float8 NULL,
+    valor_2_praca float8 NULL,
+    link_detalhe varchar NULL,
+    imagem_capa varchar NULL,
+    data_1_praca timestamp NULL,
+    data_2_praca timestamp NULL,
+    status_imovel varchar NULL,
+    CONSTRAINT leiloes_analiticos_pkey PRIMARY KEY (id_registro_bruto)
+);
+
+ALTER TABLE public.leiloes_analiticos ADD COLUMN IF NOT EXISTS status_imovel varchar NULL;
+
+-- Lookups por (site, id_leilao): cabeçalhos, resolução do id_registro_bruto, transições de status
+CREATE INDEX IF NOT EXISTS ix_analiticos_site_leilao
+    ON public.leiloes_analiticos (site, id_leilao);
+
+-- Fallback legado de _resolve_raw_ids (match só por id_leilao)
+CREATE INDEX IF NOT EXISTS ix_analiticos_id_leilao
+    ON public.leiloes_analiticos (id_leilao);
+
+-- Decisões de triagem/carteira por usuário
+CREATE TABLE IF NOT EXISTS public.leiloes_avaliacoes (
+    usuario_id varchar NOT NULL,
+    site varchar NOT NULL,
+    id_leilao varchar NOT NULL,
+    id_registro_bruto int4 NULL,
+    avaliacao varchar NULL,
+    data_analise timestamp NULL DEFAULT now(),
+    updated_at timestamp NULL DEFAULT now(),
+    CONSTRAINT leiloes_avaliacoes_pkey PRIMARY KEY (usuario_id, site, id_leilao)
+);
+
+-- Anti-join da fila de triagem pelo registro bruto resolvido
+CREATE INDEX IF NOT EXISTS ix_avaliacoes_usuario_registro
+    ON public.leiloes_avaliacoes (usuario_id, id_registro_bruto);
+
+-- Auditoria Jurídica V2.0
+CREATE TABLE IF NOT EXISTS public.leiloes_analise_detalhada (
+    site varchar NOT NULL,
+    id_leilao varchar NOT NULL,
+    usuario_id varchar NOT NULL,
+
+    -- Seção 1: Processo Judicial
+    proc_num varchar NULL,
+    proc_executados jsonb NULL,
+    proc_adv_exec bool NULL,
+    proc_citacao bool NULL,
+    proc_conjuge varchar(10) NULL,
+    proc_credores bool NULL,
+    proc_recursos bool NULL,
+    proc_recursos_obs text NULL,
+    proc_coproprietario_intimado bool NULL,
+    proc_natureza_execucao varchar(20) NULL,
+    proc_justica_gratuita bool NULL,
+    proc_especie_credito varchar(20) NULL,
+    proc_debito_atualizado numeric(15, 2) NULL DEFAULT 0.00,
+    proc_avaliacao_imovel bool NULL,
+    vlr_avaliacao float8 NULL DEFAULT 0.0,
+
+    -- Seção 2: Matrícula e Gravames
+    mat_num varchar NULL,
+    mat_proprietario jsonb NULL,
+    mat_documentos_proprietarios jsonb NULL,
+    mat_penhoras jsonb NULL,
+    mat_conjugue bool NULL,
+    mat_prop_confere bool NULL,
+    mat_proprietario_pj bool NULL,
+    mat_penhora_averbada bool NULL,
+    mat_usufruto bool NULL,
+    mat_indisp bool NULL,
+    mat_vagas_mat bool NULL,
+
+    -- Seção 3: Edital e Dívidas
+    edt_objeto varchar(20) NULL,
+    edt_vlr_avaliacao numeric(15, 2) NULL DEFAULT 0.00,
+    edt_percentual_minimo numeric(5, 2) NULL,
+    edt_data_avaliacao date NULL,
+    edt_parcelamento bool NULL,
+    edt_iptu_subroga bool NULL,
+    edt_condo_claro bool NULL,
+
+    -- Seção 4: Situação Física
+    edt_posse_status varchar(50) NULL,
+
+    -- Seção 5: Financeiro
+    fin_lance numeric(15, 2) NULL DEFAULT 0.00,
+    fin_itbi numeric(15, 2) NULL DEFAULT 0.00,
+    fin_dividas numeric(15, 2) NULL DEFAULT 0.00,
+    recomendacao_ia text NULL,
+
+    -- Campos legados / Seção 6
+    parecer_juridico text NULL,
+    risco_judicial varchar NULL,
+    valor_venda_estimado float8 NULL DEFAULT 0.0,
+    custo_reforma float8 NULL DEFAULT 0.0,
+    custo_desocupacao float8 NULL DEFAULT 0.0,
+    divida_condominio float8 NULL DEFAULT 0.0,
+    divida_iptu float8 NULL DEFAULT 0.0,
+    divida_subroga bool NULL DEFAULT false,
+    data_atualizacao date NULL,
+
+    -- Motivo do descarte
+    no_bid_reason varchar NULL,
+    no_bid_observation text NULL,
+
+    CONSTRAINT leiloes_analise_detalhada_pkey PRIMARY KEY (site, id_leilao, usuario_id)
+);
+
+-- Colunas adicionadas depois da criação original da tabela
+ALTER TABLE public.leiloes_analise_detalhada ADD COLUMN IF NOT EXISTS mat_documentos_proprietarios jsonb NULL;
+ALTER TABLE public.leiloes_analise_detalhada ADD COLUMN IF NOT EXISTS no_bid_reason varchar NULL;
+ALTER TABLE public.leiloes_analise_detalhada ADD COLUMN IF NOT EXISTS no_bid_observation text NULL;
+
+-- Log de execuções dos scrapers (ver src/application/004_TELA_MONITORAMENTO_SCRAPER.md)
+CREATE TABLE IF NOT EXISTS public.scraper_runs (
+    id bigserial NOT NULL,
+    execution_id uuid NOT NULL,
+    source_name varchar(100) NOT NULL,
+    run_type varchar(50) NOT NULL,
+    execution_start_time timestamptz NOT NULL,
+    execution_end_time timestamptz NULL,
+    duration_seconds int4 NULL,
+    run_status varchar(50) NOT NULL, -- 'SUCCESS', 'FAILED', 'IN_PROGRESS'
+    total_requests int4 NULL,
+    successful_requests int4 NULL,
+    failed_requests int4 NULL,
+    avg_latency_ms int4 NULL,
+    p95_latency_ms int4 NULL,
+    raw_items_collected int4 NULL,
+    mapped_items_count int4 NULL,
+    max_pages_scraped int4 NULL,
+    parameters_used jsonb NULL,
+    error_details text NULL,
+    created_at timestamptz NULL DEFAULT now(),
+    CONSTRAINT scraper_runs_pkey PRIMARY KEY (id),
+    CONSTRAINT scraper_runs_execution_id_key UNIQUE (execution_id)
+);
+
+ALTER TABLE public.scraper_runs ADD COLUMN IF NOT EXISTS avg_latency_ms int4 NULL;
+ALTER TABLE public.scraper_runs ADD COLUMN IF NOT EXISTS p95_latency_ms int4 NULL;
+ALTER TABLE public.scraper_runs ADD COLUMN IF NOT EXISTS max_pages_scraped int4 NULL;
+ALTER TABLE public.scraper_runs ADD COLUMN IF NOT EXISTS parameters_used jsonb NULL;
+
+-- Filtro de período do monitoramento (todas as fontes)
+CREATE INDEX IF NOT EXISTS ix_scraper_runs_start
+    ON public.scraper_runs (execution_start_time);
+
+-- Filtro de período por fonte
+CREATE INDEX IF NOT EXISTS ix_scraper_runs_source_start
+    ON public.scraper_runs (source_name, execution_start_time);
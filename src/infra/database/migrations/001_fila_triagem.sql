@@ -0,0 +1,101 @@
+-- Read model da fila de triagem por usuário.
+-- Substitui o anti-join leiloes_analiticos x leiloes_avaliacoes recalculado a cada rerun.
+-- Mantida no lado da escrita:
+-- - leiloes_fila_usuarios é o cadastro dos usuários inscritos; a carga inicial da fila de
+--   um usuário é feita uma vez, na inscrição (repositório, ensure_pending_queue);
+-- - triggers de leiloes_analiticos enfileiram os registros novos para os inscritos,
+--   replicam as alterações das colunas copiadas e removem os registros apagados,
+--   na mesma transação da escrita (as leituras da triagem não escrevem).
+
+CREATE TABLE IF NOT EXISTS public.leiloes_fila_triagem (
+    usuario_id varchar NOT NULL,
+    id_registro_bruto int4 NOT NULL,
+    site varchar NULL,
+    id_leilao varchar NULL,
+    uf varchar NULL,
+    cidade varchar NULL,
+    tipo_bem varchar NULL,
+    status_imovel varchar NULL,
+    valor_1_praca float8 NULL,
+    CONSTRAINT leiloes_fila_triagem_pkey PRIMARY KEY (usuario_id, id_registro_bruto)
+);
+
+-- Remoção da fila ao gravar avaliações (match por site/id_leilao)
+CREATE INDEX IF NOT EXISTS ix_fila_triagem_usuario_site_leilao
+    ON public.leiloes_fila_triagem (usuario_id, site, id_leilao);
+
+CREATE TABLE IF NOT EXISTS public.leiloes_fila_usuarios (
+    usuario_id varchar NOT NULL,
+    atualizado_em timestamp NULL DEFAULT now(),
+    CONSTRAINT leiloes_fila_usuarios_pkey PRIMARY KEY (usuario_id)
+);
+
+-- Registros novos (INSERT, COPY, upsert): um lote por statement, via transition table
+CREATE OR REPLACE FUNCTION public.fila_triagem_enfileira()
+    RETURNS trigger
+    LANGUAGE plpgsql
+AS $$
+BEGIN
+    INSERT INTO public.leiloes_fila_triagem
+        (usuario_id, id_registro_bruto, site, id_leilao, uf, cidade, tipo_bem, status_imovel, valor_1_praca)
+    SELECT u.usuario_id, n.id_registro_bruto, n.site, n.id_leilao, n.uf, n.cidade,
+           n.tipo_bem, n.status_imovel, n.valor_1_praca
+    FROM novos n
+    CROSS JOIN public.leiloes_fila_usuarios u
+    WHERE NOT EXISTS (
+        SELECT 1 FROM public.leiloes_avaliacoes a
+        WHERE a.usuario_id = u.usuario_id
+          AND ((a.site = n.site AND a.id_leilao = n.id_leilao) OR a.id_registro_bruto = n.id_registro_bruto)
+    )
+    ON CONFLICT DO NOTHING;
+    RETURN NULL;
+END
+$$;
+
+-- Alterações: replica as colunas copiadas para a fila (filtros, facetas e volume)
+CREATE OR REPLACE FUNCTION public.fila_triagem_atualiza()
+    RETURNS trigger
+    LANGUAGE plpgsql
+AS $$
+BEGIN
+    UPDATE public.leiloes_fila_triagem f
+    SET site = n.site, id_leilao = n.id_leilao, uf = n.uf, cidade = n.cidade,
+        tipo_bem = n.tipo_bem, status_imovel = n.status_imovel, valor_1_praca = n.valor_1_praca
+    FROM novos n
+    JOIN antigos o ON o.id_registro_bruto = n.id_registro_bruto
+    WHERE f.id_registro_bruto = n.id_registro_bruto
+      AND (n.site, n.id_leilao, n.uf, n.cidade, n.tipo_bem, n.status_imovel, n.valor_1_praca)
+          IS DISTINCT FROM (o.site, o.id_leilao, o.uf, o.cidade, o.tipo_bem, o.status_imovel, o.valor_1_praca);
+    RETURN NULL;
+END
+$$;
+
+CREATE OR REPLACE FUNCTION public.fila_triagem_remove()
+    RETURNS trigger
+    LANGUAGE plpgsql
+AS $$
+BEGIN
+    DELETE FROM public.leiloes_fila_triagem f
+    USING antigos o
+    WHERE f.id_registro_bruto = o.id_registro_bruto;
+    RETURN NULL;
+END
+$$;
+
+DROP TRIGGER IF EXISTS trg_analiticos_fila_insert ON public.leiloes_analiticos;
+CREATE TRIGGER trg_analiticos_fila_insert
+    AFTER INSERT ON public.leiloes_analiticos
+    REFERENCING NEW TABLE AS novos
+    FOR EACH STATEMENT EXECUTE FUNCTION public.fila_triagem_enfileira();
+
+DROP TRIGGER IF EXISTS trg_analiticos_fila_update ON public.leiloes_analiticos;
+CREATE TRIGGER trg_analiticos_fila_update
+    AFTER UPDATE ON public.leiloes_analiticos
+    REFERENCING OLD TABLE AS antigos NEW TABLE AS novos
+    FOR EACH STATEMENT EXECUTE FUNCTION public.fila_triagem_atualiza();
+
+DROP TRIGGER IF EXISTS trg_analiticos_fila_delete ON public.leiloes_analiticos;
+CREATE TRIGGER trg_analiticos_fila_delete
+    AFTER DELETE ON public.leiloes_analiticos
+    REFERENCING OLD TABLE AS antigos
+    FOR EACH STATEMENT EXECUTE FUNCTION public.fila_triagem_remove();
@@ -0,0 +1,21 @@
+-- Rollup de produtividade por (usuario_id, dia, avaliacao) usado por get_stats.
+-- Mantido pelo repositório na mesma transação das escritas de avaliação.
+-- Conta eventos de decisão (mudanças de status, no dia em que aconteceram).
+
+CREATE TABLE IF NOT EXISTS public.leiloes_produtividade_diaria (
+    usuario_id varchar NOT NULL,
+    dia date NOT NULL,
+    avaliacao varchar NOT NULL,
+    total int4 NOT NULL DEFAULT 0,
+    CONSTRAINT leiloes_produtividade_diaria_pkey PRIMARY KEY (usuario_id, dia, avaliacao)
+);
+
+-- Carga inicial a partir do histórico existente (idempotente). O histórico só guarda a
+-- última decisão de cada avaliação: ela conta como um evento no dia em que aconteceu
+-- (updated_at; data_analise nas linhas sem updated_at)
+INSERT INTO public.leiloes_produtividade_diaria (usuario_id, dia, avaliacao, total)
+SELECT usuario_id, coalesce(updated_at, data_analise)::date, upper(avaliacao), count(*)
+FROM public.leiloes_avaliacoes
+WHERE coalesce(updated_at, data_analise) IS NOT NULL AND avaliacao IS NOT NULL
+GROUP BY usuario_id, coalesce(updated_at, data_analise)::date, upper(avaliacao)
+ON CONFLICT (usuario_id, dia, avaliacao) DO NOTHING;
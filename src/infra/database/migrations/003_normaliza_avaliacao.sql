@@ -0,0 +1,27 @@
+-- Normaliza leiloes_avaliacoes.avaliacao para os valores de EvaluationStatus
+-- ('Analisar' -> 'ANALISAR', 'no bid' -> 'NO_BID'), protege com CHECK e cria os
+-- índices usados pela Carteira e pelas estatísticas (filtro por usuario_id + avaliacao).
+
+UPDATE public.leiloes_avaliacoes
+SET avaliacao = replace(upper(trim(avaliacao)), ' ', '_')
+WHERE avaliacao IS DISTINCT FROM replace(upper(trim(avaliacao)), ' ', '_');
+
+UPDATE public.leiloes_produtividade_diaria
+SET avaliacao = replace(upper(trim(avaliacao)), ' ', '_')
+WHERE avaliacao IS DISTINCT FROM replace(upper(trim(avaliacao)), ' ', '_');
+
+ALTER TABLE public.leiloes_avaliacoes
+    DROP CONSTRAINT IF EXISTS ck_leiloes_avaliacoes_avaliacao;
+ALTER TABLE public.leiloes_avaliacoes
+    ADD CONSTRAINT ck_leiloes_avaliacoes_avaliacao
+    CHECK (avaliacao IN ('PENDING', 'ANALISAR', 'PARTICIPAR', 'DESCARTAR', 'NO_BID', 'OUTBID'));
+
+-- Filtros por usuário e status (estatísticas, contagens por aba)
+CREATE INDEX IF NOT EXISTS ix_avaliacoes_usuario_avaliacao
+    ON public.leiloes_avaliacoes (usuario_id, avaliacao);
+
+-- Carteira: apenas os status que aparecem nas abas (índice parcial, bem menor
+-- que a tabela, já que a maioria das avaliações é DESCARTAR)
+CREATE INDEX IF NOT EXISTS ix_avaliacoes_carteira
+    ON public.leiloes_avaliacoes (usuario_id, avaliacao, site, id_leilao)
+    WHERE avaliacao IN ('ANALISAR', 'PARTICIPAR', 'NO_BID', 'OUTBID');
@@ -0,0 +1,41 @@
+-- Rollup de scraper_runs por fonte em buckets de hora e de dia (histórico de latência/volume).
+-- Mantido pelo job fold-scraper-runs, fora das leituras do monitoramento:
+--     python -m src.infra.database.jobs fold-scraper-runs [--interval SEGUNDOS]
+-- (ao fim de cada execução dos scrapers ou em um agendador, ex: cron a cada 5 minutos).
+-- Cada execução concluída é somada uma única vez e marcada em scraper_runs.rollup_em.
+
+CREATE TABLE IF NOT EXISTS public.scraper_runs_rollup (
+    granularidade varchar(8) NOT NULL,
+    source_name varchar(100) NOT NULL,
+    bucket_start timestamptz NOT NULL,
+    runs_total int4 NOT NULL DEFAULT 0,
+    runs_success int4 NOT NULL DEFAULT 0,
+    runs_failed int4 NOT NULL DEFAULT 0,
+    total_requests int8 NOT NULL DEFAULT 0,
+    successful_requests int8 NOT NULL DEFAULT 0,
+    failed_requests int8 NOT NULL DEFAULT 0,
+    raw_items_collected int8 NOT NULL DEFAULT 0,
+    mapped_items_count int8 NOT NULL DEFAULT 0,
+    max_pages_scraped int4 NULL,
+    latency_weighted_sum_ms int8 NOT NULL DEFAULT 0,
+    latency_weight int8 NOT NULL DEFAULT 0,
+    latency_min_ms int4 NULL,
+    latency_max_ms int4 NULL,
+    p95_max_ms int4 NULL,
+    p95_le_250 int4 NOT NULL DEFAULT 0,
+    p95_le_500 int4 NOT NULL DEFAULT 0,
+    p95_le_1000 int4 NOT NULL DEFAULT 0,
+    p95_le_2000 int4 NOT NULL DEFAULT 0,
+    p95_le_5000 int4 NOT NULL DEFAULT 0,
+    p95_gt_5000 int4 NOT NULL DEFAULT 0,
+    CONSTRAINT scraper_runs_rollup_pkey PRIMARY KEY (granularidade, source_name, bucket_start)
+);
+
+-- Pendentes do rollup: só as execuções concluídas ainda não somadas (índice parcial)
+ALTER TABLE public.scraper_runs ADD COLUMN IF NOT EXISTS rollup_em timestamptz NULL;
+
+CREATE INDEX IF NOT EXISTS ix_scraper_runs_rollup_pendentes
+    ON public.scraper_runs (id)
+    WHERE rollup_em IS NULL AND run_status <> 'IN_PROGRESS';
+
+-- A carga inicial do histórico é feita pelo próprio job (em lotes).
@@ -0,0 +1,37 @@
+-- Busca textual por título e ID do leilão (triagem e carteira).
+-- Full-text em português sem acentos (ranking) + trigramas (prefixos, erros de digitação
+-- e trechos de ID). Requer as extensões contrib unaccent e pg_trgm.
+
+CREATE EXTENSION IF NOT EXISTS unaccent;
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- unaccent() é STABLE (depende do search_path): o wrapper com dicionário explícito pode
+-- ser IMMUTABLE e, portanto, usado em índices de expressão.
+CREATE OR REPLACE FUNCTION public.normaliza_busca(texto text)
+    RETURNS text
+    LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+AS $$ SELECT lower(public.unaccent('public.unaccent'::regdictionary, texto)) $$;
+
+-- Configuração "portuguese" com remoção de acentos antes do stemming
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_ts_config c JOIN pg_namespace n ON n.oid = c.cfgnamespace
+        WHERE c.cfgname = 'pt_unaccent' AND n.nspname = 'public'
+    ) THEN
+        CREATE TEXT SEARCH CONFIGURATION public.pt_unaccent (COPY = pg_catalog.portuguese);
+        ALTER TEXT SEARCH CONFIGURATION public.pt_unaccent
+            ALTER MAPPING FOR hword, hword_part, word WITH public.unaccent, portuguese_stem;
+    END IF;
+END
+$$;
+
+-- As expressões abaixo precisam ser idênticas às do repositório (postgres_repo.SEARCH_*)
+CREATE INDEX IF NOT EXISTS ix_analiticos_titulo_fts
+    ON public.leiloes_analiticos USING gin (to_tsvector('public.pt_unaccent'::regconfig, titulo));
+
+CREATE INDEX IF NOT EXISTS ix_analiticos_titulo_trgm
+    ON public.leiloes_analiticos USING gin (public.normaliza_busca(titulo) gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS ix_analiticos_id_leilao_trgm
+    ON public.leiloes_analiticos USING gin (id_leilao gin_trgm_ops);
@@ -0,0 +1,15 @@
+-- Listagem da Carteira paginada no banco (filtros, ordenação e contagens por aba).
+
+-- Junção avaliações -> analíticos por (site, id_leilao) com as colunas de ordenação e
+-- filtro incluídas: a seleção das chaves da página é um index-only scan, e as colunas
+-- completas só são lidas (pela PK) para os itens da página. Substitui ix_analiticos_site_leilao.
+CREATE INDEX IF NOT EXISTS ix_analiticos_site_leilao_cobertura
+    ON public.leiloes_analiticos (site, id_leilao)
+    INCLUDE (id_registro_bruto, data_1_praca, data_2_praca, valor_2_praca);
+
+DROP INDEX IF EXISTS public.ix_analiticos_site_leilao;
+
+-- Filtro por motivo do No Bid (somente as análises que têm motivo)
+CREATE INDEX IF NOT EXISTS ix_analise_detalhada_no_bid_reason
+    ON public.leiloes_analise_detalhada (usuario_id, no_bid_reason)
+    WHERE no_bid_reason IS NOT NULL;
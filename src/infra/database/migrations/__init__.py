@@ -0,0 +1,113 @@
+"""
+Migrações versionadas do banco.
+
+Cada arquivo `NNN_descricao.sql` desta pasta é uma versão, aplicada uma única vez e em
+ordem numérica; as versões aplicadas ficam registradas em `schema_migrations`.
+Os scripts são idempotentes (IF NOT EXISTS / ON CONFLICT), então bancos em que eles já
+foram rodados à mão apenas registram as versões na primeira execução.
+
+Uso:
+    python -m src.infra.database.migrations            # aplica as pendentes
+    python -m src.infra.database.migrations status     # lista aplicadas e pendentes
+    python -m src.infra.database.migrations check      # índices do ORM que faltam no banco
+"""
+import re
+from pathlib import Path
+from typing import List, Set, Tuple
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent
+
+_FILE_PATTERN = re.compile(r"^(\d{3})_\w+\.sql$")
+
+# Chave do advisory lock que impede dois processos de migrarem ao mesmo tempo
+_LOCK_KEY = 4_716_001
+
+
+def list_migrations() -> List[Tuple[str, Path]]:
+    """Retorna (versão, arquivo) de todas as migrações, em ordem de versão."""
+    found = []
+    for path in MIGRATIONS_DIR.glob("*.sql"):
+        match = _FILE_PATTERN.match(path.name)
+        if match:
+            found.append((match.group(1), path))
+    return sorted(found)
+
+
+def _ensure_table(conn: Connection) -> None:
+    conn.execute(text(
+        """
+        CREATE TABLE IF NOT EXISTS public.schema_migrations (
+            version varchar(3) NOT NULL,
+            name varchar NOT NULL,
+            applied_at timestamptz NOT NULL DEFAULT now(),
+            CONSTRAINT schema_migrations_pkey PRIMARY KEY (version)
+        )
+        """
+    ))
+
+
+def applied_versions(conn: Connection) -> Set[str]:
+    """Versões já registradas em schema_migrations (vazio se a tabela ainda não existe)."""
+    if not inspect(conn).has_table("schema_migrations", schema="public"):
+        return set()
+    return {row[0] for row in conn.execute(text("SELECT version FROM public.schema_migrations"))}
+
+
+def pending_migrations(engine: Engine) -> List[Tuple[str, Path]]:
+    with engine.connect() as conn:
+        done = applied_versions(conn)
+    return [(version, path) for version, path in list_migrations() if version not in done]
+
+
+def apply_migrations(engine: Engine) -> List[str]:
+    """
+    Aplica as migrações pendentes, cada uma em sua própria transação (script + registro
+    da versão), e retorna os nomes dos arquivos aplicados.
+    """
+    applied = []
+    with engine.connect() as conn:
+        conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": _LOCK_KEY})
+        conn.commit()
+        try:
+            _ensure_table(conn)
+            conn.commit()
+            done = applied_versions(conn)
+            conn.commit()
+
+            for version, path in list_migrations():
+                if version in done:
+                    continue
+                with conn.begin():
+                    conn.exec_driver_sql(path.read_text(encoding="utf-8"))
+                    conn.execute(
+                        text("INSERT INTO public.schema_migrations (version, name) VALUES (:version, :name)"),
+                        {"version": version, "name": path.name}
+                    )
+                applied.append(path.name)
+        finally:
+            conn.rollback()
+            conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": _LOCK_KEY})
+            conn.commit()
+    return applied
+
+
+def missing_indexes(engine: Engine) -> List[str]:
+    """
+    Compara os índices declarados nos modelos (models_sql) com os existentes no banco.
+    Retorna "tabela.indice" de cada índice declarado que não existe.
+    """
+    from src.infra.database.models_sql import Base
+
+    inspector = inspect(engine)
+    missing = []
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            missing.extend(f"{table.name}.{index.name}" for index in table.indexes)
+            continue
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        missing.extend(
+            f"{table.name}.{index.name}" for index in table.indexes if index.name not in existing
+        )
+    return sorted(missing)
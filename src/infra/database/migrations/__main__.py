@@ -0,0 +1,42 @@
+import argparse
+import os
+import sys
+
+from src.infra.database.config import create_engine_from_env
+from src.infra.database.migrations import apply_migrations, list_migrations, missing_indexes, pending_migrations
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.infra.database.migrations",
+        description="Aplica e verifica as migrações versionadas do banco (DATABASE_URL)."
+    )
+    parser.add_argument("command", nargs="?", default="upgrade", choices=["upgrade", "status", "check"])
+    args = parser.parse_args(argv)
+
+    # Índices e backfills das migrações podem passar do statement_timeout da aplicação
+    engine = create_engine_from_env({**os.environ, "DB_STATEMENT_TIMEOUT_MS": "0"})
+
+    if args.command == "upgrade":
+        applied = apply_migrations(engine)
+        for name in applied:
+            print(f"aplicada: {name}")
+        print("banco atualizado" if applied else "nenhuma migração pendente")
+        return 0
+
+    if args.command == "status":
+        pending = {version for version, _ in pending_migrations(engine)}
+        for version, path in list_migrations():
+            print(f"{'pendente ' if version in pending else 'aplicada '} {path.name}")
+        return 0
+
+    missing = missing_indexes(engine)
+    for name in missing:
+        print(f"índice ausente: {name}")
+    if not missing:
+        print("todos os índices declarados existem")
+    return 1 if missing else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
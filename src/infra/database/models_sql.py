@@ -1,5 +1,5 @@
 # Arquivo: src/infra/database/models_sql.py
-from sqlalchemy import Column, String, Integer, Float, DateTime, Boolean, Text, Date, Numeric, ForeignKey
+from sqlalchemy import Column, String, Integer, BigInteger, Float, DateTime, Boolean, Text, Date, Numeric, ForeignKey, Index, CheckConstraint, text
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime, timezone
 from sqlalchemy.dialects.postgresql import JSONB
@@ -12,6 +12,22 @@ class LeilaoAnaliticoModel(Base):
     Tabela com os dados brutos raspados (Scraper).
     """
     __tablename__ = "leiloes_analiticos"  # Verifique se este nome está exato no seu banco
+    __table_args__ = (
+        # Lookups por (site, id_leilao) e fallback só por id_leilao (_resolve_raw_ids).
+        # Na junção da carteira, as colunas de ordenação/filtro incluídas permitem index-only scan
+        Index(
+            "ix_analiticos_site_leilao_cobertura", "site", "id_leilao",
+            postgresql_include=["id_registro_bruto", "data_1_praca", "data_2_praca", "valor_2_praca"]
+        ),
+        Index("ix_analiticos_id_leilao", "id_leilao"),
+        # Busca textual (migração 005): full-text sem acentos e trigramas de título e ID
+        Index("ix_analiticos_titulo_fts", text("to_tsvector('public.pt_unaccent'::regconfig, titulo)"),
+              postgresql_using="gin"),
+        Index("ix_analiticos_titulo_trgm", text("public.normaliza_busca(titulo) gin_trgm_ops"),
+              postgresql_using="gin"),
+        Index("ix_analiticos_id_leilao_trgm", "id_leilao", postgresql_using="gin",
+              postgresql_ops={"id_leilao": "gin_trgm_ops"}),
+    )
     
     id_registro_bruto = Column(Integer, primary_key=True) 
     site = Column(String)
@@ -36,6 +52,19 @@ class LeilaoAvaliacaoModel(Base):
     Ajustada para bater com o SQL: public.leiloes_avaliacoes
     """
     __tablename__ = "leiloes_avaliacoes" # <--- CORRIGIDO (PLURAL)
+    __table_args__ = (
+        CheckConstraint(
+            "avaliacao IN ('PENDING', 'ANALISAR', 'PARTICIPAR', 'DESCARTAR', 'NO_BID', 'OUTBID')",
+            name="ck_leiloes_avaliacoes_avaliacao"
+        ),
+        Index("ix_avaliacoes_usuario_avaliacao", "usuario_id", "avaliacao"),
+        Index(
+            "ix_avaliacoes_carteira", "usuario_id", "avaliacao", "site", "id_leilao",
+            postgresql_where=text("avaliacao IN ('ANALISAR', 'PARTICIPAR', 'NO_BID', 'OUTBID')")
+        ),
+        # Anti-join da fila de triagem pelo registro bruto resolvido
+        Index("ix_avaliacoes_usuario_registro", "usuario_id", "id_registro_bruto"),
+    )
     
     # PK Composta baseada no seu SQL: PRIMARY KEY (usuario_id, site, id_leilao)
     usuario_id = Column(String, primary_key=True)
@@ -43,16 +72,69 @@ class LeilaoAvaliacaoModel(Base):
     id_leilao = Column(String, primary_key=True)
     
     id_registro_bruto = Column(Integer) # FK lógica
-    avaliacao = Column(String) # 'Analisar' ou 'Descartar'
+    avaliacao = Column(String) # Valores de EvaluationStatus (ex: 'ANALISAR', 'DESCARTAR')
     data_analise = Column(DateTime, default=datetime.now)
     updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
 
+class ProdutividadeDiariaModel(Base):
+    """
+    Rollup de produtividade: quantidade de decisões gravadas por usuário, dia e status.
+    Atualizado na mesma transação das escritas em leiloes_avaliacoes.
+    """
+    __tablename__ = "leiloes_produtividade_diaria"
+
+    usuario_id = Column(String, primary_key=True)
+    dia = Column(Date, primary_key=True)
+    avaliacao = Column(String, primary_key=True)
+    total = Column(Integer, nullable=False, default=0)
+
+class LeilaoFilaTriagemModel(Base):
+    """
+    Read model da fila de triagem por usuário (leilões ainda não avaliados por ele).
+    Mantido no lado da escrita: triggers de leiloes_analiticos (migração 001) enfileiram
+    os registros novos para os usuários inscritos e replicam alterações e remoções; o
+    repositório remove os leilões quando o usuário grava uma avaliação.
+    Replica as colunas de faceta para que filtros/contagens não precisem do anti-join.
+    """
+    __tablename__ = "leiloes_fila_triagem"
+    __table_args__ = (
+        Index("ix_fila_triagem_usuario_site_leilao", "usuario_id", "site", "id_leilao"),
+    )
+
+    # PK (usuario_id, id_registro_bruto) serve a leitura paginada por cursor
+    usuario_id = Column(String, primary_key=True)
+    id_registro_bruto = Column(Integer, primary_key=True)
+    site = Column(String)
+    id_leilao = Column(String)
+    uf = Column(String)
+    cidade = Column(String)
+    tipo_bem = Column(String)
+    status_imovel = Column(String, nullable=True)
+    valor_1_praca = Column(Float)
+
+class LeilaoFilaUsuarioModel(Base):
+    """
+    Usuários inscritos na fila de triagem: os triggers enfileiram os registros novos
+    para cada um deles. A inscrição (carga inicial da fila) é feita uma única vez.
+    """
+    __tablename__ = "leiloes_fila_usuarios"
+
+    usuario_id = Column(String, primary_key=True)
+    atualizado_em = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+
 class LeilaoAnaliseDetalhadaModel(Base):
     """
     Representação ORM da tabela leiloes_analise_detalhada.
     Mapeia todos os campos da Auditoria Jurídica V2.0.
     """
     __tablename__ = 'leiloes_analise_detalhada'
+    __table_args__ = (
+        # Filtro da carteira por motivo do No Bid
+        Index(
+            "ix_analise_detalhada_no_bid_reason", "usuario_id", "no_bid_reason",
+            postgresql_where=text("no_bid_reason IS NOT NULL")
+        ),
+    )
 
     # Chaves Primárias / Identificadores (Existentes)
     site = Column(String, primary_key=True)
@@ -76,14 +158,12 @@ class LeilaoAnaliseDetalhadaModel(Base):
     proc_avaliacao_imovel = Column(Boolean, nullable=True)
 
     # --- OUTROS CAMPOS E METADADOS ---
-    parecer_juridico = Column(String, nullable=True)
-    risco_judicial = Column(String, default='Baixo')
     vlr_avaliacao = Column(Float, default=0.0)
-    data_atualizacao = Column(DateTime, default=datetime.now, onupdate=datetime.now)
 
     # --- Seção 2: Matrícula e Gravames ---
     mat_num = Column(String, nullable=True)
     mat_proprietario = Column(JSONB, nullable=True, default=list)
+    mat_documentos_proprietarios = Column(JSONB, nullable=True, default=list)
     mat_penhoras = Column(JSONB, nullable=True, default=list)
     mat_conjugue = Column(Boolean, nullable=True)
     mat_prop_confere = Column(Boolean, nullable=True)
@@ -92,11 +172,6 @@ class LeilaoAnaliseDetalhadaModel(Base):
     mat_usufruto = Column(Boolean, nullable=True)
     mat_indisp = Column(Boolean, nullable=True)
     mat_vagas_mat = Column(Boolean, nullable=True)
-    # --- Novos Campos: Seção Matrícula ---
-    mat_proprietario = Column(JSONB, default=[])
-    mat_documentos_proprietarios = Column(JSONB, default=[])
-    mat_penhoras = Column(JSONB, default=[])
-    mat_conjugue = Column(Boolean, default=None)
 
     # --- Seção 3: Edital e Dívidas ---
     edt_objeto = Column(String(20), nullable=True)
@@ -138,8 +213,18 @@ class ScraperRunModel(Base):
     Representação ORM da tabela de log de execuções dos scrapers.
     """
     __tablename__ = 'scraper_runs'
+    __table_args__ = (
+        # Filtros de período do monitoramento, com e sem fonte
+        Index("ix_scraper_runs_start", "execution_start_time"),
+        Index("ix_scraper_runs_source_start", "source_name", "execution_start_time"),
+        # Execuções concluídas ainda não somadas ao rollup (o fold lê só este índice)
+        Index(
+            "ix_scraper_runs_rollup_pendentes", "id",
+            postgresql_where=text("rollup_em IS NULL AND run_status <> 'IN_PROGRESS'")
+        ),
+    )
 
-    id = Column(Integer, primary_key=True)
+    id = Column(BigInteger, primary_key=True)
     execution_id = Column(String, unique=True, nullable=False)
     source_name = Column(String(100), nullable=False)
     run_type = Column(String(50), nullable=False)
@@ -158,3 +243,42 @@ class ScraperRunModel(Base):
     parameters_used = Column(JSONB, nullable=True)
     error_details = Column(Text, nullable=True)
     created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    rollup_em = Column(DateTime(timezone=True), nullable=True)  # quando foi somada ao rollup (fold)
+
+class ScraperRunRollupModel(Base):
+    """
+    Rollup das execuções de scraper por fonte em buckets de hora e de dia (granularidade).
+    Só entram execuções concluídas, uma única vez (marcadas em scraper_runs.rollup_em).
+    Todas as métricas são somas, mínimos, máximos ou contagens de histograma, então
+    buckets podem ser combinados (várias fontes, dias -> mês) sem voltar a scraper_runs.
+    """
+    __tablename__ = "scraper_runs_rollup"
+
+    granularidade = Column(String(8), primary_key=True)  # 'hour' | 'day'
+    source_name = Column(String(100), primary_key=True)
+    bucket_start = Column(DateTime(timezone=True), primary_key=True)
+
+    runs_total = Column(Integer, nullable=False, default=0)
+    runs_success = Column(Integer, nullable=False, default=0)
+    runs_failed = Column(Integer, nullable=False, default=0)
+    total_requests = Column(BigInteger, nullable=False, default=0)
+    successful_requests = Column(BigInteger, nullable=False, default=0)
+    failed_requests = Column(BigInteger, nullable=False, default=0)
+    raw_items_collected = Column(BigInteger, nullable=False, default=0)
+    mapped_items_count = Column(BigInteger, nullable=False, default=0)
+    max_pages_scraped = Column(Integer, nullable=True)
+
+    # Latência média ponderada por requisições: soma(avg_latency_ms * peso) / soma(peso)
+    latency_weighted_sum_ms = Column(BigInteger, nullable=False, default=0)
+    latency_weight = Column(BigInteger, nullable=False, default=0)
+    latency_min_ms = Column(Integer, nullable=True)
+    latency_max_ms = Column(Integer, nullable=True)
+
+    # p95 não é somável: guardamos o máximo e um histograma fixo do p95 de cada execução
+    p95_max_ms = Column(Integer, nullable=True)
+    p95_le_250 = Column(Integer, nullable=False, default=0)
+    p95_le_500 = Column(Integer, nullable=False, default=0)
+    p95_le_1000 = Column(Integer, nullable=False, default=0)
+    p95_le_2000 = Column(Integer, nullable=False, default=0)
+    p95_le_5000 = Column(Integer, nullable=False, default=0)
+    p95_gt_5000 = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,410 @@
+"""
+Gerador de dados sintéticos com distribuições parecidas com as de produção.
+
+Gera leilões (UF, cidade e site desbalanceados), avaliações de vários usuários com
+atividade desigual, análises detalhadas com as listas JSONB preenchidas e meses de
+execuções de scraper. Tudo é produzido em streams (geradores de tuplas) e carregado
+por COPY (psycopg2) ou INSERT multi-linha em lotes, com memória constante
+independente do volume. A mesma semente gera sempre os mesmos dados.
+
+Uso:
+    python -m src.infra.database.synthetic --auctions 1000000 --users 20 --reset
+    python -m src.infra.database.synthetic --auctions 50000 --method insert --reset
+
+Usado também pelos benchmarks (benchmarks/bench_repository.py).
+"""
+import csv
+import io
+import json
+import math
+import random
+import time
+import uuid
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from itertools import accumulate, islice
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+from src.domain.models import (
+    ConjugeStatus, EspecieCredito, EvaluationStatus, NaturezaExecucao, NoBidReason, OccupationStatus, RiskLevel
+)
+from src.infra.database.migrations import apply_migrations
+
+BATCH_SIZE = 5000
+
+# --- DISTRIBUIÇÕES ---
+
+# Peso aproximado de cada UF no volume de leilões de imóveis
+UF_WEIGHTS = {
+    "SP": 35, "RJ": 12, "MG": 10, "PR": 7, "RS": 6, "SC": 5, "BA": 4, "GO": 4, "PE": 3, "DF": 3,
+    "ES": 2, "CE": 2, "MT": 2, "MS": 2, "PA": 1, "AM": 1, "MA": 1, "PB": 1, "RN": 1, "AL": 1,
+}
+CAPITAIS = {
+    "SP": "São Paulo", "RJ": "Rio de Janeiro", "MG": "Belo Horizonte", "PR": "Curitiba", "RS": "Porto Alegre",
+    "SC": "Florianópolis", "BA": "Salvador", "GO": "Goiânia", "PE": "Recife", "DF": "Brasília",
+    "ES": "Vitória", "CE": "Fortaleza", "MT": "Cuiabá", "MS": "Campo Grande", "PA": "Belém",
+    "AM": "Manaus", "MA": "São Luís", "PB": "João Pessoa", "RN": "Natal", "AL": "Maceió",
+}
+# Cidades por UF (a capital é a primeira; a distribuição dentro da UF é Zipf)
+CITIES_PER_UF = 120
+SITES = 60
+TIPOS_BEM = {"Apartamento": 45, "Casa": 30, "Terreno": 12, "Comercial": 8, "Rural": 3, "Vaga de Garagem": 2}
+STATUS_IMOVEL = {"Ocupado": 45, "Desocupado": 35, None: 20}
+DECISION_WEIGHTS = {
+    EvaluationStatus.DESCARTAR: 60, EvaluationStatus.ANALISAR: 22, EvaluationStatus.PARTICIPAR: 8,
+    EvaluationStatus.NO_BID: 7, EvaluationStatus.OUTBID: 3,
+}
+PORTFOLIO_DECISIONS = {
+    EvaluationStatus.ANALISAR, EvaluationStatus.PARTICIPAR, EvaluationStatus.NO_BID, EvaluationStatus.OUTBID,
+}
+SCRAPER_SOURCES = {
+    # fonte: (latência média base em ms, execuções por dia relativas)
+    "zuk": (220, 4), "mega": (350, 4), "sold": (480, 2), "leilaoimovel": (650, 2),
+    "frazao": (300, 1), "biasi": (900, 1), "caixa": (1400, 3), "santander": (500, 1),
+}
+
+_MASK64 = (1 << 64) - 1
+
+
+def _mix(seed: int, value: int) -> float:
+    """Hash splitmix64 de (semente, valor) em [0, 1): atributos derivados do id sem guardar estado."""
+    z = (seed * 0x9E3779B97F4A7C15 + value * 0xBF58476D1CE4E5B9 + 0x632BE59BD9B4E019) & _MASK64
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return (z ^ (z >> 31)) / 2 ** 64
+
+
+class _Weighted:
+    """Escolha ponderada por busca binária nos pesos acumulados."""
+
+    def __init__(self, weights: Dict):
+        self.values = list(weights)
+        self.cumulative = list(accumulate(weights.values()))
+
+    def pick(self, u: float):
+        return self.values[min(bisect_right(self.cumulative, u * self.cumulative[-1]), len(self.values) - 1)]
+
+    def choice(self, rnd: random.Random):
+        return self.pick(rnd.random())
+
+
+def _zipf(n: int, s: float = 1.1) -> Dict[int, float]:
+    return {k: 1 / (k + 1) ** s for k in range(n)}
+
+
+_UF = _Weighted(UF_WEIGHTS)
+_CITY_RANK = _Weighted(_zipf(CITIES_PER_UF))
+_SITE = _Weighted(_zipf(SITES, 0.9))
+_TIPO_BEM = _Weighted(TIPOS_BEM)
+_STATUS_IMOVEL = _Weighted(STATUS_IMOVEL)
+_DECISION = _Weighted(DECISION_WEIGHTS)
+
+
+@dataclass
+class SyntheticConfig:
+    """
+    Volume e forma da base sintética.
+
+    :param auctions: Linhas de leiloes_analiticos.
+    :param users: Usuários com avaliações.
+    :param evaluated_ratio: Fração média da base avaliada por usuário (a atividade varia entre usuários).
+    :param analysis_ratio: Fração dos itens de carteira com análise detalhada.
+    :param history_days: Janela das datas de avaliação (produtividade).
+    :param scraper_days: Meses de histórico de scraper_runs, em dias.
+    :param runs_per_day: Execuções por dia de uma fonte de peso 1.
+    """
+    auctions: int = 100_000
+    users: int = 10
+    evaluated_ratio: float = 0.2
+    analysis_ratio: float = 0.5
+    history_days: int = 180
+    scraper_days: int = 90
+    runs_per_day: int = 6
+    seed: int = 42
+    start: datetime = field(default_factory=lambda: datetime.now().replace(microsecond=0))
+
+    @property
+    def user_ids(self) -> List[str]:
+        return [f"usuario_{i:03d}" for i in range(self.users)]
+
+    def auction_key(self, raw_id: int) -> Tuple[str, str]:
+        """(site, id_leilao) do registro bruto `raw_id` (derivado do id, sem consultar o banco)."""
+        return f"leiloeiro_{_SITE.pick(_mix(self.seed, raw_id)):02d}", f"{raw_id:09d}"
+
+    def user_ratio(self, user_index: int) -> float:
+        """Atividade desigual: poucos usuários avaliam muito, a maioria avalia pouco (média = evaluated_ratio)."""
+        weights = [1 / (i + 1) ** 0.8 for i in range(self.users)]
+        return min(1.0, self.evaluated_ratio * weights[user_index] * self.users / sum(weights))
+
+
+# --- STREAMS DE LINHAS ---
+
+AUCTION_COLUMNS = (
+    "id_registro_bruto", "site", "id_leilao", "titulo", "uf", "cidade", "tipo_leilao", "tipo_bem",
+    "valor_1_praca", "valor_2_praca", "link_detalhe", "imagem_capa", "data_1_praca", "data_2_praca", "status_imovel",
+)
+EVALUATION_COLUMNS = ("usuario_id", "site", "id_leilao", "id_registro_bruto", "avaliacao", "data_analise", "updated_at")
+ANALYSIS_COLUMNS = (
+    "site", "id_leilao", "usuario_id", "proc_num", "proc_executados", "proc_adv_exec", "proc_citacao",
+    "proc_conjuge", "proc_credores", "proc_natureza_execucao", "proc_especie_credito", "proc_debito_atualizado",
+    "vlr_avaliacao", "mat_num", "mat_proprietario", "mat_documentos_proprietarios", "mat_penhoras",
+    "mat_prop_confere", "mat_penhora_averbada", "mat_indisp", "edt_vlr_avaliacao", "edt_percentual_minimo",
+    "edt_data_avaliacao", "edt_posse_status", "fin_lance", "fin_itbi", "fin_dividas", "parecer_juridico",
+    "risco_judicial", "divida_condominio", "divida_iptu", "data_atualizacao", "no_bid_reason", "no_bid_observation",
+)
+SCRAPER_RUN_COLUMNS = (
+    "execution_id", "source_name", "run_type", "execution_start_time", "execution_end_time", "duration_seconds",
+    "run_status", "total_requests", "successful_requests", "failed_requests", "avg_latency_ms", "p95_latency_ms",
+    "raw_items_collected", "mapped_items_count", "max_pages_scraped", "parameters_used", "error_details",
+)
+
+
+def auction_rows(cfg: SyntheticConfig) -> Iterator[tuple]:
+    rnd = random.Random(f"{cfg.seed}:leiloes")
+    base = cfg.start - timedelta(days=30)
+    for raw_id in range(1, cfg.auctions + 1):
+        site, id_leilao = cfg.auction_key(raw_id)
+        uf = _UF.choice(rnd)
+        rank = _CITY_RANK.choice(rnd)
+        tipo_bem = _TIPO_BEM.choice(rnd)
+        # Valores log-normais (mediana ~ R$ 350 mil), 2ª praça entre 50% e 70% da 1ª
+        valor_1 = round(math.exp(rnd.gauss(12.8, 0.8)), 2)
+        data_1 = base + timedelta(days=rnd.randint(0, 150), hours=rnd.choice((10, 11, 14, 15)))
+        yield (
+            raw_id, site, id_leilao, f"{tipo_bem} {rnd.randint(30, 600)} m² - {CAPITAIS[uf] if rank == 0 else uf}",
+            uf, CAPITAIS[uf] if rank == 0 else f"Município {uf}-{rank:03d}",
+            "Judicial" if rnd.random() < 0.7 else "Extrajudicial", tipo_bem,
+            valor_1, round(valor_1 * rnd.uniform(0.5, 0.7), 2),
+            f"https://{site}.example/lote/{id_leilao}", f"https://{site}.example/img/{id_leilao}.jpg",
+            data_1, data_1 + timedelta(days=rnd.choice((7, 14, 15, 21))), _STATUS_IMOVEL.choice(rnd),
+        )
+
+
+def _user_decisions(cfg: SyntheticConfig, user_index: int) -> Iterator[Tuple[int, EvaluationStatus, datetime]]:
+    """
+    Decisões de um usuário em ordem de id: amostragem de Bernoulli por saltos geométricos
+    (não materializa a lista de ids). É reproduzível, por isso avaliações e análises
+    percorrem a mesma sequência sem guardar a carteira em memória.
+    """
+    p = cfg.user_ratio(user_index)
+    if p <= 0:
+        return
+    rnd = random.Random(f"{cfg.seed}:avaliacoes:{user_index}")
+    raw_id = 0
+    while True:
+        raw_id += 1 if p >= 1 else 1 + int(math.log(1.0 - rnd.random()) / math.log(1.0 - p))
+        if raw_id > cfg.auctions:
+            return
+        when = cfg.start - timedelta(seconds=int(rnd.random() * cfg.history_days * 86400))
+        yield raw_id, _DECISION.choice(rnd), when
+
+
+def evaluation_rows(cfg: SyntheticConfig) -> Iterator[tuple]:
+    for index, user in enumerate(cfg.user_ids):
+        for raw_id, decision, when in _user_decisions(cfg, index):
+            site, id_leilao = cfg.auction_key(raw_id)
+            yield user, site, id_leilao, raw_id, decision.value, when, when
+
+
+def _names(rnd: random.Random, prefix: str, low: int, high: int) -> List[str]:
+    return [f"{prefix} {rnd.randint(1, 99999):05d}" for _ in range(rnd.randint(low, high))]
+
+
+def analysis_rows(cfg: SyntheticConfig) -> Iterator[tuple]:
+    """Análises detalhadas de parte dos itens de carteira (listas JSONB preenchidas)."""
+    rnd = random.Random(f"{cfg.seed}:analises")
+    for index, user in enumerate(cfg.user_ids):
+        for raw_id, decision, when in _user_decisions(cfg, index):
+            if decision not in PORTFOLIO_DECISIONS or rnd.random() >= cfg.analysis_ratio:
+                continue
+            site, id_leilao = cfg.auction_key(raw_id)
+            avaliacao = round(math.exp(rnd.gauss(13.0, 0.7)), 2)
+            no_bid = decision == EvaluationStatus.NO_BID
+            yield (
+                site, id_leilao, user, f"{rnd.randint(1000000, 9999999)}-{rnd.randint(10, 99)}.2025.8.26.{rnd.randint(1, 999):04d}",
+                json.dumps(_names(rnd, "Executado", 1, 3), ensure_ascii=False), rnd.random() < 0.8, rnd.random() < 0.9,
+                rnd.choice(list(ConjugeStatus)).value, rnd.random() < 0.85,
+                rnd.choice(list(NaturezaExecucao)).value, rnd.choice(list(EspecieCredito)).value,
+                round(avaliacao * rnd.uniform(0.05, 0.6), 2), avaliacao, str(rnd.randint(1000, 999999)),
+                json.dumps(_names(rnd, "Proprietário", 1, 2), ensure_ascii=False),
+                json.dumps(_names(rnd, "CPF", 0, 2), ensure_ascii=False),
+                json.dumps(_names(rnd, "Penhora", 0, 4), ensure_ascii=False),
+                rnd.random() < 0.9, rnd.random() < 0.7, rnd.random() < 0.1, avaliacao,
+                rnd.choice((50.0, 60.0, 70.0)), (when - timedelta(days=rnd.randint(30, 400))).date(),
+                rnd.choice(list(OccupationStatus)).value, round(avaliacao * rnd.uniform(0.4, 0.7), 2),
+                round(avaliacao * 0.03, 2), round(rnd.uniform(0, 80_000), 2), "Parecer gerado para testes.",
+                rnd.choice(list(RiskLevel)).value, round(rnd.uniform(0, 40_000), 2), round(rnd.uniform(0, 15_000), 2),
+                when.date(), rnd.choice(list(NoBidReason)).value if no_bid else None,
+                "Descartado na análise detalhada." if no_bid else None,
+            )
+
+
+def scraper_run_rows(cfg: SyntheticConfig) -> Iterator[tuple]:
+    """Execuções em ordem cronológica: cada fonte roda várias vezes ao dia, com falhas e picos de latência."""
+    rnd = random.Random(f"{cfg.seed}:scraper_runs")
+    fim = cfg.start
+    inicio = fim - timedelta(days=cfg.scraper_days)
+    dia = inicio.replace(hour=0, minute=0, second=0)
+    while dia < fim:
+        execucoes = []
+        for source, (latencia_base, peso) in SCRAPER_SOURCES.items():
+            for _ in range(cfg.runs_per_day * peso):
+                execucoes.append((dia + timedelta(seconds=rnd.randint(0, 86399)), source, latencia_base))
+        for start, source, latencia_base in sorted(execucoes):
+            if start < inicio or start >= fim:
+                continue
+            status = "IN_PROGRESS" if fim - start < timedelta(hours=1) else ("FAILED" if rnd.random() < 0.08 else "SUCCESS")
+            pico = rnd.random() < 0.05
+            latencia = int(latencia_base * rnd.lognormvariate(0, 0.3) * (4 if pico else 1))
+            requisicoes = rnd.randint(20, 600)
+            falhas = int(requisicoes * (rnd.uniform(0.2, 0.9) if status == "FAILED" else rnd.uniform(0, 0.05)))
+            duracao = None if status == "IN_PROGRESS" else int(requisicoes * latencia / 1000 * rnd.uniform(1.0, 1.6))
+            coletados = 0 if status == "FAILED" and rnd.random() < 0.5 else rnd.randint(10, 1500)
+            yield (
+                str(uuid.UUID(int=rnd.getrandbits(128), version=4)), source, rnd.choice(("FULL", "FULL", "INCREMENTAL")),
+                start, start + timedelta(seconds=duracao) if duracao is not None else None, duracao, status,
+                requisicoes, requisicoes - falhas, falhas, latencia, int(latencia * rnd.uniform(1.8, 3.5)),
+                coletados, int(coletados * rnd.uniform(0.85, 1.0)), rnd.randint(1, 80),
+                json.dumps({"max_pages": 80, "uf": rnd.choice(list(UF_WEIGHTS))}),
+                "Timeout ao acessar a listagem" if status == "FAILED" else None,
+            )
+        dia += timedelta(days=1)
+
+
+# --- CARGA ---
+
+class _CsvStream(io.TextIOBase):
+    """Arquivo somente-leitura que serializa as linhas em CSV sob demanda (COPY sem materializar a carga)."""
+
+    def __init__(self, rows: Iterable[tuple], chunk_rows: int = 1000):
+        self._rows = iter(rows)
+        self._chunk_rows = chunk_rows
+        self._buffer = ""
+        self.count = 0
+
+    def _fill(self) -> bool:
+        out = io.StringIO()
+        writer = csv.writer(out, lineterminator="\n")
+        chunk = list(islice(self._rows, self._chunk_rows))
+        writer.writerows(chunk)
+        self.count += len(chunk)
+        self._buffer += out.getvalue()
+        return bool(chunk)
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> str:
+        while (size < 0 or len(self._buffer) < size) and self._fill():
+            pass
+        if size < 0:
+            size = len(self._buffer)
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+    def readline(self, size: int = -1) -> str:
+        return self.read(size)
+
+
+def copy_rows(conn: Connection, table: str, columns: Sequence[str], rows: Iterable[tuple]) -> int:
+    """Carrega as linhas com COPY ... FROM STDIN (CSV; None vira NULL). Exige o driver psycopg2."""
+    stream = _CsvStream(rows)
+    cursor = conn.connection.driver_connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY public.{table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", stream)
+    finally:
+        cursor.close()
+    return stream.count
+
+
+def insert_rows(conn: Connection, table: str, columns: Sequence[str], rows: Iterable[tuple]) -> int:
+    """Carrega as linhas com INSERT multi-linha em lotes de BATCH_SIZE (qualquer driver)."""
+    names = ", ".join(columns)
+    placeholders = ", ".join(f":{column}" for column in columns)
+    stmt = text(f"INSERT INTO public.{table} ({names}) VALUES ({placeholders})")
+    total = 0
+    rows = iter(rows)
+    while True:
+        batch = [dict(zip(columns, row)) for row in islice(rows, BATCH_SIZE)]
+        if not batch:
+            return total
+        conn.execute(stmt, batch)
+        total += len(batch)
+
+
+LOADERS = {"copy": copy_rows, "insert": insert_rows}
+
+APP_TABLES = (
+    "leiloes_analiticos", "leiloes_avaliacoes", "leiloes_analise_detalhada", "scraper_runs",
+    "leiloes_fila_triagem", "leiloes_fila_usuarios", "leiloes_produtividade_diaria",
+    "scraper_runs_rollup",
+)
+
+
+def reset_schema(engine: Engine) -> None:
+    """Apaga as tabelas da aplicação e recria o esquema pelas migrações (como em produção)."""
+    with engine.begin() as conn:
+        for table in APP_TABLES + ("schema_migrations",):
+            conn.execute(text(f"DROP TABLE IF EXISTS public.{table} CASCADE"))
+    apply_migrations(engine)
+
+
+def _is_empty(conn: Connection) -> bool:
+    return not any(
+        conn.execute(text(f"SELECT EXISTS (SELECT 1 FROM public.{table})")).scalar()
+        for table in ("leiloes_analiticos", "leiloes_avaliacoes", "leiloes_analise_detalhada", "scraper_runs")
+    )
+
+
+def load(engine: Engine, cfg: SyntheticConfig, method: str = "copy", reset: bool = False) -> Dict[str, dict]:
+    """
+    Gera e carrega a base sintética; retorna {tabela: {"rows", "seconds"}}.
+    Com `reset` recria o esquema antes; sem ele as tabelas precisam estar vazias
+    (os ids e chaves gerados começam sempre do 1).
+    O rollup de produtividade é recalculado a partir das avaliações e as tabelas são analisadas.
+    """
+    if method not in LOADERS:
+        raise ValueError(f"Método de carga inválido: {method} (use {', '.join(LOADERS)}).")
+    if reset:
+        reset_schema(engine)
+    else:
+        apply_migrations(engine)
+
+    loader = LOADERS[method]
+    summary = {}
+    with engine.begin() as conn:
+        if not _is_empty(conn):
+            raise RuntimeError("A base já tem dados: use reset=True (--reset) para recriar o esquema.")
+
+        for table, columns, rows in (
+            ("leiloes_analiticos", AUCTION_COLUMNS, auction_rows(cfg)),
+            ("leiloes_avaliacoes", EVALUATION_COLUMNS, evaluation_rows(cfg)),
+            ("leiloes_analise_detalhada", ANALYSIS_COLUMNS, analysis_rows(cfg)),
+            ("scraper_runs", SCRAPER_RUN_COLUMNS, scraper_run_rows(cfg)),
+        ):
+            started = time.perf_counter()
+            summary[table] = {"rows": loader(conn, table, columns, rows)}
+            summary[table]["seconds"] = round(time.perf_counter() - started, 3)
+
+        # Rollup diário de produtividade coerente com as avaliações geradas
+        started = time.perf_counter()
+        result = conn.execute(text(
+            """
+            INSERT INTO public.leiloes_produtividade_diaria (usuario_id, dia, avaliacao, total)
+            SELECT usuario_id, coalesce(updated_at, data_analise)::date, avaliacao, count(*)
+            FROM public.leiloes_avaliacoes
+            GROUP BY 1, 2, 3
+            """
+        ))
+        summary["leiloes_produtividade_diaria"] = {
+            "rows": result.rowcount, "seconds": round(time.perf_counter() - started, 3)
+        }
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for table in summary:
+            conn.execute(text(f"ANALYZE public.{table}"))
+    return summary
@@ -0,0 +1,48 @@
+import argparse
+import os
+import sys
+
+from src.infra.database.config import create_engine_from_env
+from src.infra.database.synthetic import LOADERS, SyntheticConfig, load
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.infra.database.synthetic",
+        description="Gera e carrega uma base sintética (DATABASE_URL) para benchmarks, testes de carga e demos."
+    )
+    parser.add_argument("--auctions", type=int, default=SyntheticConfig.auctions, help="Linhas de leiloes_analiticos.")
+    parser.add_argument("--users", type=int, default=SyntheticConfig.users)
+    parser.add_argument("--evaluated-ratio", type=float, default=SyntheticConfig.evaluated_ratio,
+                        help="Fração média da base avaliada por usuário.")
+    parser.add_argument("--analysis-ratio", type=float, default=SyntheticConfig.analysis_ratio,
+                        help="Fração dos itens de carteira com análise detalhada.")
+    parser.add_argument("--scraper-days", type=int, default=SyntheticConfig.scraper_days)
+    parser.add_argument("--runs-per-day", type=int, default=SyntheticConfig.runs_per_day)
+    parser.add_argument("--seed", type=int, default=SyntheticConfig.seed)
+    parser.add_argument("--method", choices=sorted(LOADERS), default="copy",
+                        help="copy (psycopg2, mais rápido) ou insert (INSERT multi-linha).")
+    parser.add_argument("--reset", action="store_true",
+                        help="APAGA as tabelas da aplicação e recria o esquema antes da carga.")
+    args = parser.parse_args(argv)
+
+    cfg = SyntheticConfig(
+        auctions=args.auctions, users=args.users, evaluated_ratio=args.evaluated_ratio,
+        analysis_ratio=args.analysis_ratio, scraper_days=args.scraper_days,
+        runs_per_day=args.runs_per_day, seed=args.seed
+    )
+    try:
+        # COPY/INSERT em massa e as migrações podem passar do statement_timeout da aplicação
+        engine = create_engine_from_env({**os.environ, "DB_STATEMENT_TIMEOUT_MS": "0"})
+        summary = load(engine, cfg, method=args.method, reset=args.reset)
+    except RuntimeError as e:
+        print(e, file=sys.stderr)
+        return 1
+
+    for table, info in summary.items():
+        print(f"{table:<30} {info['rows']:>12,} linhas em {info['seconds']:>8.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,352 @@
+"""
+Miniaturas locais das imagens de capa (imagem_capa).
+
+Os cards apontavam direto para a imagem original no site de cada leiloeiro: cada rerun
+baixava de novo a foto em tamanho cheio, e a página ficava lenta sempre que a CDN do
+leiloeiro estava lenta. Aqui cada URL é baixada uma única vez, recortada no tamanho do
+card e gravada em disco (JPEG) num LRU limitado por bytes; as telas servem a miniatura local.
+
+O download é plugável (`fetch`): em produção é HTTP (http_fetcher); nos testes, um
+servidor HTTP local ou uma função qualquer que devolva os bytes da imagem.
+
+As URLs vêm dos sites raspados, então o download não pode alcançar a rede interna (SSRF):
+toda conexão, inclusive as de redirecionamentos, só é aberta para endereços públicos.
+"""
+import hashlib
+import http.client
+import io
+import ipaddress
+import os
+import socket
+import tempfile
+import threading
+import time
+import urllib.request
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from PIL import Image, ImageOps
+
+# Recebe a URL e devolve os bytes da imagem original (levanta exceção em caso de falha)
+ImageFetcher = Callable[[str], bytes]
+
+# Tamanho do card da triagem (altura fixa de 220px, recorte "cover")
+CARD_SIZE = (300, 220)
+
+# Limite de pixels da imagem original, verificado pelo cabeçalho antes de decodificar
+# (o padrão do Pillow só recusa acima de ~179 MP; draft() só reduz JPEG)
+MAX_SOURCE_PIXELS = 40_000_000
+
+
+def _guarded_create_connection(allowed_networks: Tuple[ipaddress._BaseNetwork, ...]):
+    """
+    socket.create_connection que resolve o host e recusa endereços não públicos (privados,
+    loopback, link-local, reservados, multicast) fora de `allowed_networks`. A conexão é aberta
+    no endereço validado, então o DNS não pode trocar o destino entre a checagem e o connect.
+    """
+    def create_connection(address, timeout=socket._GLOBAL_DEFAULT_TIMEOUT, source_address=None, *args, **kwargs):
+        host, port = address
+        resolved = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        for *_, sockaddr in resolved:
+            ip = ipaddress.ip_address(sockaddr[0])
+            ip = getattr(ip, "ipv4_mapped", None) or ip
+            if (not ip.is_global or ip.is_multicast) and not any(ip in net for net in allowed_networks):
+                raise ValueError(f"Endereço não público recusado para {host}: {ip}")
+        last_error = None
+        for *_, sockaddr in resolved:
+            try:
+                return socket.create_connection((sockaddr[0], port), timeout, source_address)
+            except OSError as e:
+                last_error = e
+        raise last_error or OSError(f"Sem endereço para {host}")
+    return create_connection
+
+
+class _GuardedHTTPHandler(urllib.request.HTTPHandler):
+    def __init__(self, create_connection):
+        super().__init__()
+        self._create_connection = create_connection
+
+    def http_open(self, req):
+        return self.do_open(_with_connection(http.client.HTTPConnection, self._create_connection), req)
+
+
+class _GuardedHTTPSHandler(urllib.request.HTTPSHandler):
+    def __init__(self, create_connection):
+        super().__init__()
+        self._create_connection = create_connection
+
+    def https_open(self, req):
+        return self.do_open(
+            _with_connection(http.client.HTTPSConnection, self._create_connection), req, context=self._context
+        )
+
+
+def _with_connection(connection_class, create_connection):
+    def build(*args, **kwargs):
+        connection = connection_class(*args, **kwargs)
+        connection._create_connection = create_connection
+        return connection
+    return build
+
+
+def http_fetcher(timeout: float = 5.0, max_bytes: int = 15 * 1024 * 1024,
+                 allowed_networks: Iterable[str] = ()) -> ImageFetcher:
+    """
+    Download HTTP(S) com timeout e limite de tamanho da imagem original.
+    Só conecta em endereços públicos, também nos redirecionamentos (que só podem ir para
+    http/https); `allowed_networks` libera redes internas (ex: "10.0.0.0/8" de uma CDN própria).
+    Não usa proxy do ambiente: o destino precisa ser validado na própria conexão.
+    """
+    create_connection = _guarded_create_connection(tuple(ipaddress.ip_network(n) for n in allowed_networks))
+    opener = urllib.request.OpenerDirector()
+    for handler in (
+        urllib.request.UnknownHandler(), urllib.request.HTTPDefaultErrorHandler(),
+        urllib.request.HTTPRedirectHandler(), urllib.request.HTTPErrorProcessor(),
+        _GuardedHTTPHandler(create_connection), _GuardedHTTPSHandler(create_connection),
+    ):
+        opener.add_handler(handler)
+
+    def fetch(url: str) -> bytes:
+        if not url.lower().startswith(("http://", "https://")):
+            raise ValueError(f"URL de imagem não suportada: {url!r}")
+        request = urllib.request.Request(url, headers={"User-Agent": "Mozilla/5.0 (garimpo-thumbnails)"})
+        with opener.open(request, timeout=timeout) as response:
+            data = response.read(max_bytes + 1)
+        if len(data) > max_bytes:
+            raise ValueError(f"Imagem maior que {max_bytes} bytes: {url}")
+        return data
+    return fetch
+
+
+def make_thumbnail(data: bytes, size: Tuple[int, int] = CARD_SIZE, quality: int = 80) -> bytes:
+    """Recorta e reduz a imagem para `size` (como object-fit: cover) e devolve um JPEG."""
+    with Image.open(io.BytesIO(data)) as image:
+        # Image.open só lê o cabeçalho: recusa "bombas de descompressão" antes de decodificar
+        if image.width * image.height > MAX_SOURCE_PIXELS:
+            raise ValueError(f"Imagem com {image.width}x{image.height} pixels excede o limite de {MAX_SOURCE_PIXELS}")
+        # JPEG: decodifica já reduzido (escala 1/2, 1/4, 1/8) quando a original é bem maior que o card
+        image.draft("RGB", (size[0] * 2, size[1] * 2))
+        image = ImageOps.exif_transpose(image).convert("RGB")
+        thumbnail = ImageOps.fit(image, size, Image.Resampling.LANCZOS)
+    out = io.BytesIO()
+    thumbnail.save(out, "JPEG", quality=quality, optimize=True)
+    return out.getvalue()
+
+
+@dataclass
+class ThumbnailCounters:
+    """Contadores do cache de miniaturas (painel de diagnóstico)."""
+    hits: int = 0
+    misses: int = 0
+    failures: int = 0
+    evictions: int = 0
+    files: int = 0
+    bytes: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class ThumbnailCache:
+    """
+    Cache em disco das miniaturas, compartilhado por todas as sessões do processo. Thread-safe.
+    - Cada URL vira um arquivo `<dir>/<hh>/<sha256>.jpg`, escrito de forma atômica.
+    - LRU por bytes: o acesso atualiza o mtime do arquivo (a ordem sobrevive a reinícios)
+      e os menos usados são apagados quando o total passa de `max_bytes`.
+    - Downloads rodam num pool próprio; pedidos simultâneos da mesma URL compartilham o download.
+    - Falhas (URL quebrada, arquivo que não é imagem) ficam em quarentena por `failure_ttl`
+      segundos, para não repetir o download a cada rerun.
+    """
+
+    def __init__(self, directory: str, fetch: Optional[ImageFetcher] = None,
+                 max_bytes: int = 200 * 1024 * 1024, size: Tuple[int, int] = CARD_SIZE,
+                 quality: int = 80, failure_ttl: float = 300.0, max_workers: int = 4,
+                 clock: Callable[[], float] = time.monotonic):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.size = size
+        self.quality = quality
+        self.failure_ttl = failure_ttl
+        self._fetch = fetch or http_fetcher()
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="thumbnails")
+        self._index: Optional["OrderedDict[str, int]"] = None  # chave -> bytes, do menos para o mais usado
+        self._total_bytes = 0
+        self._inflight: Dict[str, Future] = {}
+        self._failures: Dict[str, float] = {}
+        self._counters = ThumbnailCounters()
+
+    @classmethod
+    def from_env(cls, env=None) -> Optional["ThumbnailCache"]:
+        """
+        Cache configurado por variáveis de ambiente (None se desligado):
+        - THUMBNAIL_CACHE_ENABLED: liga/desliga as miniaturas locais (padrão: ligado).
+        - THUMBNAIL_CACHE_DIR: diretório dos arquivos (padrão: <tmp>/garimpo-thumbnails).
+        - THUMBNAIL_CACHE_MAX_MB: limite do cache em disco.
+        - THUMBNAIL_FETCH_TIMEOUT: timeout (s) do download de cada imagem original.
+        - THUMBNAIL_FETCH_ALLOWED_NETWORKS: redes internas liberadas no download, separadas
+          por vírgula (padrão: só endereços públicos).
+        """
+        env = os.environ if env is None else env
+        if (env.get("THUMBNAIL_CACHE_ENABLED") or "true").strip().lower() not in ("1", "true", "yes", "sim", "on"):
+            return None
+        return cls(
+            directory=env.get("THUMBNAIL_CACHE_DIR") or os.path.join(tempfile.gettempdir(), "garimpo-thumbnails"),
+            fetch=http_fetcher(
+                timeout=float(env.get("THUMBNAIL_FETCH_TIMEOUT") or 5.0),
+                allowed_networks=[n.strip() for n in (env.get("THUMBNAIL_FETCH_ALLOWED_NETWORKS") or "").split(",") if n.strip()]
+            ),
+            max_bytes=int(float(env.get("THUMBNAIL_CACHE_MAX_MB") or 200) * 1024 * 1024),
+        )
+
+    # --- LEITURA ---
+
+    def get(self, url: str, timeout: Optional[float] = None) -> Optional[bytes]:
+        """Miniatura da URL (baixa e gera se preciso). None se a imagem não puder ser obtida a tempo."""
+        return self.get_many([url], timeout=timeout).get(url)
+
+    def get_many(self, urls: Iterable[str], timeout: Optional[float] = None) -> Dict[str, bytes]:
+        """
+        Miniaturas de várias URLs, baixando as que faltam em paralelo.
+        Espera no máximo `timeout` segundos: as que não ficarem prontas continuam em segundo
+        plano (aparecem no próximo rerun) e ficam fora do resultado, assim como as que falharem.
+        """
+        result, pending = {}, {}
+        for url in dict.fromkeys(u for u in urls if u):
+            data = self._read(url)
+            if data is not None:
+                result[url] = data
+            else:
+                future = self._submit(url)
+                if future is not None:
+                    pending[url] = future
+        if pending:
+            wait(pending.values(), timeout=timeout)
+            for url, future in pending.items():
+                if future.done() and future.exception() is None and future.result() is not None:
+                    result[url] = future.result()
+        return result
+
+    def prefetch(self, urls: Iterable[str]) -> None:
+        """Agenda a geração das miniaturas ainda ausentes (ex: próxima página), sem esperar."""
+        for url in dict.fromkeys(u for u in urls if u):
+            if not os.path.exists(self._path(self._key(url))):
+                self._submit(url)
+
+    # --- GERAÇÃO ---
+
+    def _submit(self, url: str) -> Optional[Future]:
+        key = self._key(url)
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                return future
+            quarantined_until = self._failures.get(key)
+            if quarantined_until is not None:
+                if quarantined_until > self._clock():
+                    return None
+                del self._failures[key]
+            self._counters.misses += 1
+            future = self._executor.submit(self._generate, key, url)
+            self._inflight[key] = future
+        return future
+
+    def _generate(self, key: str, url: str) -> Optional[bytes]:
+        try:
+            data = make_thumbnail(self._fetch(url), self.size, self.quality)
+            self._write(key, data)
+            return data
+        except Exception:
+            with self._lock:
+                self._counters.failures += 1
+                self._failures[key] = self._clock() + self.failure_ttl
+            return None
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    # --- ARMAZENAMENTO (LRU em disco) ---
+
+    @staticmethod
+    def _key(url: str) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.jpg")
+
+    def _load_index(self) -> "OrderedDict[str, int]":
+        """Reconstrói o índice a partir do diretório (ordem LRU pelo mtime). Chamado com o lock."""
+        if self._index is None:
+            found = []
+            if os.path.isdir(self.directory):
+                for entry in os.scandir(self.directory):
+                    if not entry.is_dir():
+                        continue
+                    for file in os.scandir(entry.path):
+                        if file.name.endswith(".jpg"):
+                            stat = file.stat()
+                            found.append((stat.st_mtime, file.name[:-4], stat.st_size))
+            found.sort()
+            self._index = OrderedDict((key, size) for _, key, size in found)
+            self._total_bytes = sum(self._index.values())
+        return self._index
+
+    def _read(self, url: str) -> Optional[bytes]:
+        key = self._key(url)
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            index = self._load_index()
+            if key in index:
+                index.move_to_end(key)
+            else:
+                index[key] = len(data)
+                self._total_bytes += len(data)
+            self._counters.hits += 1
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return data
+
+    def _write(self, key: str, data: bytes) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Arquivo temporário + rename: leitores nunca veem uma miniatura pela metade
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            index = self._load_index()
+            self._total_bytes += len(data) - index.pop(key, 0)
+            index[key] = len(data)
+            while self._total_bytes > self.max_bytes and len(index) > 1:
+                old_key, old_size = index.popitem(last=False)
+                self._total_bytes -= old_size
+                self._counters.evictions += 1
+                try:
+                    os.remove(self._path(old_key))
+                except FileNotFoundError:
+                    pass
+
+    def stats(self) -> ThumbnailCounters:
+        """Cópia dos contadores (com o número de arquivos e bytes em disco)."""
+        with self._lock:
+            index = self._load_index()
+            c = self._counters
+            return ThumbnailCounters(
+                hits=c.hits, misses=c.misses, failures=c.failures, evictions=c.evictions,
+                files=len(index), bytes=self._total_bytes
+            )
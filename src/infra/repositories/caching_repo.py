@@ -0,0 +1,404 @@
+import copy
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, fields, is_dataclass
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from src.application.interfaces import AuctionRepository
+from src.domain.models import (
+    Auction, AuctionFilter, AuctionFramePage, AuctionPage, AuctionSearchPage, AuditoriaSnapshot, BatchWriteResult, DetailedAnalysis, Evaluation,
+    EvaluationStatus, FilterFacets, FinalizadosIndicators, PortfolioPage, PortfolioQuery, PortfolioSummary, ScraperLatencyBucket, ScraperRun, ScraperRunFilter, ScraperRunStats,
+    SearchScope, StatusTransition
+)
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """Validade (segundos) e limite de entradas (LRU) do cache de um método de leitura."""
+    ttl_seconds: float
+    max_entries: int
+
+
+@dataclass
+class CacheCounters:
+    """Contadores de um método cacheado (para calibrar TTL e tamanho em produção)."""
+    hits: int = 0
+    misses: int = 0
+    expirations: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+    size: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+# Escopo das entradas que não pertencem a um usuário (cabeçalho de leilão, monitoramento)
+SHARED_SCOPE = None
+
+# Métodos por usuário: invalidados pelas escritas do próprio usuário
+USER_SCOPED_METHODS = (
+    "get_pending_auctions", "get_pending_auctions_frame", "get_filter_facets", "get_stats",
+    "search_auctions", "get_portfolio_page", "get_portfolio_summary", "get_finalizados_indicators",
+)
+
+# Leituras da carteira afetadas pela análise detalhada (motivo do No Bid)
+PORTFOLIO_ANALYSIS_METHODS = (
+    "search_auctions", "get_portfolio_page", "get_portfolio_summary", "get_finalizados_indicators",
+)
+
+DEFAULT_POLICIES: Dict[str, CachePolicy] = {
+    # Triagem: a fila também recebe registros novos do ETL, por isso o TTL curto
+    "get_pending_auctions": CachePolicy(ttl_seconds=30, max_entries=512),
+    "get_pending_auctions_frame": CachePolicy(ttl_seconds=30, max_entries=512),
+    "get_filter_facets": CachePolicy(ttl_seconds=60, max_entries=512),
+    # Busca textual (triagem e carteira): paginar e voltar não repete a consulta
+    "search_auctions": CachePolicy(ttl_seconds=30, max_entries=512),
+    "get_stats": CachePolicy(ttl_seconds=60, max_entries=256),
+    # Carteira
+    "get_portfolio_page": CachePolicy(ttl_seconds=120, max_entries=1024),
+    "get_portfolio_summary": CachePolicy(ttl_seconds=120, max_entries=512),
+    "get_finalizados_indicators": CachePolicy(ttl_seconds=120, max_entries=256),
+    "get_auction": CachePolicy(ttl_seconds=300, max_entries=1024),
+    # Monitoramento: escrito pelos scrapers, fora da aplicação (só TTL)
+    "get_scraper_runs": CachePolicy(ttl_seconds=60, max_entries=64),
+    "get_scraper_runs_frame": CachePolicy(ttl_seconds=60, max_entries=64),
+    "get_scraper_run_stats": CachePolicy(ttl_seconds=60, max_entries=64),
+    "get_scraper_latency_history": CachePolicy(ttl_seconds=300, max_entries=64),
+    "get_scraper_sources": CachePolicy(ttl_seconds=600, max_entries=1),
+}
+
+
+def _freeze(value: Any) -> Hashable:
+    """Converte argumentos (dataclasses de filtro, listas, dicts) em uma chave hashable."""
+    if is_dataclass(value):
+        return (type(value).__name__,) + tuple(_freeze(getattr(value, f.name)) for f in fields(value))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    return value
+
+
+_IMMUTABLE = (int, float, str, bytes, bool, type(None), date, datetime)
+_MISS = object()
+
+
+def _copy(value: Any) -> Any:
+    """
+    Cópia do valor cacheado entregue a cada leitor: DataFrames, páginas, facetas e listas
+    são mutáveis, e uma alteração feita por uma sessão não pode chegar às demais.
+    """
+    if isinstance(value, _IMMUTABLE):
+        return value
+    return copy.deepcopy(value)
+
+
+class RepositoryCache:
+    """
+    Armazenamento do cache de leitura, compartilhado por todas as sessões do processo.
+    Um LRU com TTL por método; as chaves levam o escopo (usuario_id ou SHARED_SCOPE)
+    para que as escritas invalidem apenas as entradas afetadas. Thread-safe.
+    Cada leitura recebe uma cópia do valor guardado (ver `_copy`).
+    """
+
+    def __init__(self, policies: Optional[Dict[str, CachePolicy]] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self._policies = dict(DEFAULT_POLICIES if policies is None else policies)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: Dict[str, "OrderedDict[Tuple[Hashable, Hashable], Tuple[float, Any]]"] = {
+            method: OrderedDict() for method in self._policies
+        }
+        self._counters: Dict[str, CacheCounters] = {method: CacheCounters() for method in self._policies}
+        # Incrementada a cada invalidação: um load iniciado antes dela não é guardado
+        self._generations: Dict[str, int] = {method: 0 for method in self._policies}
+
+    @classmethod
+    def from_env(cls, env=None) -> Optional["RepositoryCache"]:
+        """
+        Cache configurado por variáveis de ambiente (None se desligado):
+        - REPO_CACHE_ENABLED: liga/desliga o cache (padrão: ligado).
+        - REPO_CACHE_TTL_SCALE: multiplica os TTLs padrão (ex: 0.5 para dados mais frescos).
+        """
+        env = os.environ if env is None else env
+        if (env.get("REPO_CACHE_ENABLED") or "true").strip().lower() not in ("1", "true", "yes", "sim", "on"):
+            return None
+        scale = float(env.get("REPO_CACHE_TTL_SCALE") or 1.0)
+        return cls({
+            method: CachePolicy(policy.ttl_seconds * scale, policy.max_entries)
+            for method, policy in DEFAULT_POLICIES.items()
+        })
+
+    def get_or_load(self, method: str, scope: Hashable, args: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+        Retorna o valor cacheado de (método, escopo, argumentos) ou chama `loader` e guarda o resultado.
+        O loader roda fora do lock: duas leituras simultâneas da mesma chave podem ir ao banco,
+        e o resultado de um load concorrente com uma invalidação do método é descartado.
+        """
+        if method not in self._policies:
+            return loader()
+
+        key = (scope, args)
+        entries, counters = self._entries[method], self._counters[method]
+        with self._lock:
+            entry = entries.get(key)
+            if entry is not None and entry[0] > self._clock():
+                entries.move_to_end(key)
+                counters.hits += 1
+                cached = entry[1]
+            else:
+                if entry is not None:
+                    del entries[key]
+                    counters.expirations += 1
+                counters.misses += 1
+                generation = self._generations[method]
+                cached = _MISS
+        # Cópia fora do lock: o valor guardado nunca é alterado depois de entrar no cache
+        if cached is not _MISS:
+            return _copy(cached)
+
+        value = loader()
+
+        policy = self._policies[method]
+        with self._lock:
+            if self._generations[method] != generation:
+                return value
+            entries[key] = (self._clock() + policy.ttl_seconds, value)
+            entries.move_to_end(key)
+            while len(entries) > policy.max_entries:
+                entries.popitem(last=False)
+                counters.evictions += 1
+        return _copy(value)
+
+    def invalidate(self, methods: Iterable[str], scope: Any = ..., args: Any = ...) -> None:
+        """
+        Remove entradas dos métodos informados.
+        Sem `scope` remove todas as entradas do método; com `scope` só as do usuário
+        (ou SHARED_SCOPE); com `args` só a chave exata.
+        """
+        with self._lock:
+            for method in methods:
+                entries = self._entries.get(method)
+                if entries is None:
+                    continue
+                self._generations[method] += 1
+                if scope is ...:
+                    stale = list(entries)
+                elif args is ...:
+                    stale = [key for key in entries if key[0] == scope]
+                else:
+                    stale = [(scope, args)] if (scope, args) in entries else []
+                for key in stale:
+                    del entries[key]
+                self._counters[method].invalidations += len(stale)
+
+    def clear(self) -> None:
+        self.invalidate(list(self._entries))
+
+    def stats(self) -> Dict[str, CacheCounters]:
+        """Cópia dos contadores por método (com o tamanho atual de cada cache)."""
+        with self._lock:
+            return {
+                method: CacheCounters(
+                    hits=c.hits, misses=c.misses, expirations=c.expirations, evictions=c.evictions,
+                    invalidations=c.invalidations, size=len(self._entries[method])
+                )
+                for method, c in self._counters.items()
+            }
+
+
+class CachingAuctionRepository(AuctionRepository):
+    """
+    Decorator read-through sobre qualquer AuctionRepository.
+    Leituras repetidas entre reruns (facetas, fila, carteira, produtividade, monitoramento)
+    são servidas do RepositoryCache; as escritas delegam ao repositório interno e
+    invalidam somente as entradas que podem ter mudado (do usuário, quando aplicável).
+
+    Análise detalhada e snapshot da auditoria não são cacheados aqui: são objetos
+    mutáveis com controle de alterações e já ficam no session_state da tela.
+    """
+
+    def __init__(self, inner: AuctionRepository, cache: RepositoryCache):
+        self.inner = inner
+        self.cache = cache
+
+    def _invalidate_user(self, user_ids: Iterable[str], methods: Iterable[str] = USER_SCOPED_METHODS) -> None:
+        methods = list(methods)
+        for user_id in set(user_ids):
+            self.cache.invalidate(methods, scope=user_id)
+
+    # --- TRIAGEM ---
+
+    def ensure_pending_queue(self, user_id: str) -> int:
+        loaded = self.inner.ensure_pending_queue(user_id)
+        if loaded:
+            self._invalidate_user([user_id])
+        return loaded
+
+    def get_pending_auctions(self, user_id: str, filters: AuctionFilter,
+                             cursor: Optional[int] = None, page_size: int = 15) -> AuctionPage:
+        return self.cache.get_or_load(
+            "get_pending_auctions", user_id, _freeze((filters, cursor, page_size)),
+            lambda: self.inner.get_pending_auctions(user_id, filters, cursor=cursor, page_size=page_size)
+        )
+
+    def get_pending_auctions_frame(self, user_id: str, filters: AuctionFilter,
+                                   cursor: Optional[int] = None, page_size: int = 15) -> AuctionFramePage:
+        return self.cache.get_or_load(
+            "get_pending_auctions_frame", user_id, _freeze((filters, cursor, page_size)),
+            lambda: self.inner.get_pending_auctions_frame(user_id, filters, cursor=cursor, page_size=page_size)
+        )
+
+    def count_pending_auctions(self, user_id: str, filters: AuctionFilter) -> int:
+        # Sem cache: nenhuma tela usa (o total da triagem vem de get_filter_facets)
+        return self.inner.count_pending_auctions(user_id, filters)
+
+    def get_filter_facets(self, user_id: str, filters: AuctionFilter) -> FilterFacets:
+        return self.cache.get_or_load(
+            "get_filter_facets", user_id, _freeze(filters),
+            lambda: self.inner.get_filter_facets(user_id, filters)
+        )
+
+    def search_auctions(self, user_id: str, query: str, scope: SearchScope = SearchScope.TODOS,
+                        filters: Optional[AuctionFilter] = None, statuses: Optional[List[str]] = None,
+                        offset: int = 0, page_size: int = 20, min_valor: Optional[float] = None,
+                        max_valor: Optional[float] = None,
+                        no_bid_reasons: Optional[List[str]] = None) -> AuctionSearchPage:
+        return self.cache.get_or_load(
+            "search_auctions", user_id,
+            _freeze((query, SearchScope(scope).value, filters, statuses, offset, page_size,
+                     min_valor, max_valor, no_bid_reasons)),
+            lambda: self.inner.search_auctions(
+                user_id, query, scope=scope, filters=filters, statuses=statuses, offset=offset, page_size=page_size,
+                min_valor=min_valor, max_valor=max_valor, no_bid_reasons=no_bid_reasons
+            )
+        )
+
+    def save_evaluations(self, evaluations: List[Evaluation]) -> BatchWriteResult:
+        try:
+            return self.inner.save_evaluations(evaluations)
+        finally:
+            self._invalidate_user(ev.usuario_id for ev in evaluations)
+
+    def get_stats(self, user_id: str, start_date: Optional[date] = None,
+                  end_date: Optional[date] = None) -> Dict[str, int]:
+        # O padrão "hoje" entra na chave: a entrada de ontem não é servida após a meia-noite
+        start_date = start_date or date.today()
+        return self.cache.get_or_load(
+            "get_stats", user_id, (start_date, end_date),
+            lambda: self.inner.get_stats(user_id, start_date=start_date, end_date=end_date)
+        )
+
+    # --- CARTEIRA / AUDITORIA ---
+
+    def get_portfolio_page(self, user_id: str, query: PortfolioQuery) -> PortfolioPage:
+        return self.cache.get_or_load(
+            "get_portfolio_page", user_id, _freeze(query),
+            lambda: self.inner.get_portfolio_page(user_id, query)
+        )
+
+    def get_portfolio_summary(self, user_id: str, query: Optional[PortfolioQuery] = None) -> PortfolioSummary:
+        return self.cache.get_or_load(
+            "get_portfolio_summary", user_id, _freeze(query),
+            lambda: self.inner.get_portfolio_summary(user_id, query)
+        )
+
+    def get_finalizados_indicators(self, user_id: str) -> FinalizadosIndicators:
+        return self.cache.get_or_load(
+            "get_finalizados_indicators", user_id, (),
+            lambda: self.inner.get_finalizados_indicators(user_id)
+        )
+
+    def get_auction(self, site: str, id_leilao: str) -> Optional[Auction]:
+        return self.cache.get_or_load(
+            "get_auction", SHARED_SCOPE, (site, id_leilao),
+            lambda: self.inner.get_auction(site, id_leilao)
+        )
+
+    def update_auction_core_data(self, site: str, id_leilao: str, data: dict) -> None:
+        try:
+            self.inner.update_auction_core_data(site, id_leilao, data)
+        finally:
+            # Título/valores aparecem nas listagens de todos os usuários
+            self.cache.invalidate(["get_auction"], scope=SHARED_SCOPE, args=(site, id_leilao))
+            self.cache.invalidate([
+                "get_pending_auctions", "get_pending_auctions_frame", "get_filter_facets", "search_auctions",
+                "get_portfolio_page", "get_portfolio_summary", "get_finalizados_indicators",
+            ])
+
+    def save_detailed_analysis(self, analysis: DetailedAnalysis) -> None:
+        try:
+            self.inner.save_detailed_analysis(analysis)
+        finally:
+            # A carteira (e a busca nela) exibe e filtra pelo motivo do No Bid gravado na análise
+            self._invalidate_user([analysis.usuario_id], PORTFOLIO_ANALYSIS_METHODS)
+
+    def save_auditoria_rascunho(self, analysis: DetailedAnalysis) -> None:
+        try:
+            self.inner.save_auditoria_rascunho(analysis)
+        finally:
+            self._invalidate_user([analysis.usuario_id], PORTFOLIO_ANALYSIS_METHODS)
+
+    def get_detailed_analysis(self, site: str, id_leilao: str, user_id: str) -> Optional[DetailedAnalysis]:
+        return self.inner.get_detailed_analysis(site, id_leilao, user_id)
+
+    def get_auditoria_snapshot(self, site: str, id_leilao: str, user_id: str) -> AuditoriaSnapshot:
+        return self.inner.get_auditoria_snapshot(site, id_leilao, user_id)
+
+    def update_status(self, user_id: str, site: str, id_leilao: str, new_status: EvaluationStatus) -> None:
+        try:
+            self.inner.update_status(user_id, site, id_leilao, new_status)
+        finally:
+            self._invalidate_user([user_id])
+
+    def transition_statuses(self, user_id: str, transitions: List[StatusTransition]) -> BatchWriteResult:
+        try:
+            return self.inner.transition_statuses(user_id, transitions)
+        finally:
+            self._invalidate_user([user_id])
+
+    # --- MONITORAMENTO ---
+
+    def get_scraper_runs(self, filters: ScraperRunFilter, limit: Optional[int] = None,
+                         offset: int = 0) -> List[ScraperRun]:
+        return self.cache.get_or_load(
+            "get_scraper_runs", SHARED_SCOPE, _freeze((filters, limit, offset)),
+            lambda: self.inner.get_scraper_runs(filters, limit=limit, offset=offset)
+        )
+
+    def get_scraper_runs_frame(self, filters: ScraperRunFilter, limit: Optional[int] = None,
+                               offset: int = 0):
+        return self.cache.get_or_load(
+            "get_scraper_runs_frame", SHARED_SCOPE, _freeze((filters, limit, offset)),
+            lambda: self.inner.get_scraper_runs_frame(filters, limit=limit, offset=offset)
+        )
+
+    def get_scraper_run_stats(self, filters: ScraperRunFilter) -> ScraperRunStats:
+        return self.cache.get_or_load(
+            "get_scraper_run_stats", SHARED_SCOPE, _freeze(filters),
+            lambda: self.inner.get_scraper_run_stats(filters)
+        )
+
+    def fold_scraper_runs(self, batch_size: int = 5000) -> int:
+        folded = self.inner.fold_scraper_runs(batch_size)
+        if folded:
+            self.cache.invalidate(["get_scraper_latency_history"])
+        return folded
+
+    def get_scraper_latency_history(self, sources: Optional[List[str]], start: datetime, end: datetime,
+                                    granularity: str = "day") -> List[ScraperLatencyBucket]:
+        return self.cache.get_or_load(
+            "get_scraper_latency_history", SHARED_SCOPE, _freeze((sources, start, end, granularity)),
+            lambda: self.inner.get_scraper_latency_history(sources, start, end, granularity)
+        )
+
+    def get_scraper_sources(self) -> List[str]:
+        return self.cache.get_or_load("get_scraper_sources", SHARED_SCOPE, (), self.inner.get_scraper_sources)
@@ -0,0 +1,94 @@
+"""
+Resultados das listagens em formato colunar (Arrow -> pandas).
+
+As telas exibem as listagens como DataFrames. Em vez de materializar um dataclass por linha
+e depois copiá-lo para o pandas (`pd.DataFrame([vars(a) for a in items])`), os repositórios
+montam cada lote do cursor direto em arrays Arrow tipados e convertem a tabela uma única vez:
+- texto repetido (uf, cidade, site, tipo_bem...): dictionary -> `category` no pandas;
+- valores: float64; datas: datetime64; ids e contadores: int64 (Int64 quando admitem nulo).
+"""
+from typing import Any, Iterable, Sequence
+
+import pandas as pd
+import pyarrow as pa
+
+# Texto com poucos valores distintos: vira `category` no DataFrame
+_CATEGORY = pa.dictionary(pa.int32(), pa.string())
+
+# Colunas da fila de triagem, na mesma ordem de postgres_repo.AUCTION_COLUMNS
+AUCTION_FRAME_SCHEMA = pa.schema([
+    ("site", _CATEGORY),
+    ("id_leilao", pa.string()),
+    ("titulo", pa.string()),
+    ("uf", _CATEGORY),
+    ("cidade", _CATEGORY),
+    ("tipo_leilao", _CATEGORY),
+    ("tipo_bem", _CATEGORY),
+    ("valor_1_praca", pa.float64()),
+    ("valor_2_praca", pa.float64()),
+    ("link_detalhe", pa.string()),
+    ("imagem_capa", pa.string()),
+    ("data_1_praca", pa.timestamp("us")),
+    ("data_2_praca", pa.timestamp("us")),
+    ("status_imovel", _CATEGORY),
+    ("id_registro_bruto", pa.int64()),
+])
+
+# Valores ausentes viram 0.0, como em Auction (postgres_repo._row_to_auction)
+AUCTION_ZERO_FILLED = ("valor_1_praca", "valor_2_praca")
+
+# Colunas escalares de ScraperRun (parameters_used, JSON, fica de fora); horários com fuso (timestamptz)
+SCRAPER_RUN_FRAME_SCHEMA = pa.schema([
+    ("id", pa.int64()),
+    ("execution_id", pa.string()),
+    ("source_name", _CATEGORY),
+    ("run_type", _CATEGORY),
+    ("execution_start_time", pa.timestamp("us", tz="UTC")),
+    ("execution_end_time", pa.timestamp("us", tz="UTC")),
+    ("duration_seconds", pa.int64()),
+    ("run_status", _CATEGORY),
+    ("total_requests", pa.int64()),
+    ("successful_requests", pa.int64()),
+    ("failed_requests", pa.int64()),
+    ("raw_items_collected", pa.int64()),
+    ("mapped_items_count", pa.int64()),
+    ("error_details", pa.string()),
+    ("avg_latency_ms", pa.int64()),
+    ("p95_latency_ms", pa.int64()),
+    ("max_pages_scraped", pa.int64()),
+])
+
+
+def _record_batch(schema: pa.Schema, rows: Sequence[Sequence[Any]]) -> pa.RecordBatch:
+    """Transpõe um lote de linhas (tuplas na ordem do schema) em arrays tipados."""
+    columns = list(zip(*rows)) if rows else [()] * len(schema)
+    return pa.RecordBatch.from_arrays(
+        [pa.array(values, type=f.type) for f, values in zip(schema, columns)], schema=schema
+    )
+
+
+def frame_from_batches(schema: pa.Schema, batches: Iterable[Sequence[Sequence[Any]]],
+                       zero_filled: Sequence[str] = ()) -> pd.DataFrame:
+    """
+    DataFrame a partir de lotes de linhas do cursor (ex: `Result.partitions()`).
+    Cada lote é convertido e descartado antes do próximo: não há um objeto Python por linha.
+    """
+    table = pa.Table.from_batches([_record_batch(schema, rows) for rows in batches], schema=schema)
+    # Cada lote tem o próprio dicionário: unifica para virar uma única categoria no pandas
+    table = table.unify_dictionaries()
+    for name in zero_filled:
+        index = table.schema.get_field_index(name)
+        table = table.set_column(index, name, table.column(name).fill_null(0.0))
+    # Inteiros com nulo viram Int64 (e não float64 com NaN)
+    return table.to_pandas(types_mapper={pa.int64(): pd.Int64Dtype()}.get)
+
+
+def frame_from_objects(schema: pa.Schema, objects: Iterable[Any], zero_filled: Sequence[str] = ()) -> pd.DataFrame:
+    """DataFrame com as colunas do schema lidas dos atributos de objetos já carregados (ex: repositório em memória)."""
+    names = schema.names
+    return frame_from_batches(schema, [[tuple(getattr(obj, name) for name in names) for obj in objects]], zero_filled)
+
+
+def auctions_frame(auctions: Iterable[Any]) -> pd.DataFrame:
+    """DataFrame da fila de triagem a partir de Auctions (ex: resultados da busca textual)."""
+    return frame_from_objects(AUCTION_FRAME_SCHEMA, auctions, AUCTION_ZERO_FILLED)
@@ -0,0 +1,778 @@
+import copy
+import heapq
+import re
+import threading
+import unicodedata
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from dataclasses import replace
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from src.application.interfaces import AuctionRepository
+from src.domain.models import (
+    Auction, AuctionFilter, AuctionFramePage, AuctionPage, AuctionSearchPage, AuditoriaSnapshot, BatchWriteResult, DetailedAnalysis, Evaluation,
+    EvaluationStatus, FacetValue, FilterFacets, FinalizadosIndicators, FinalizadosMonthlyBucket, FinalizadosReasonCount,
+    FinalizadosUfBucket, PortfolioPage, PortfolioQuery, PortfolioSort, PortfolioSummary,
+    ScraperDailyBucket, ScraperLatencyBucket, ScraperRun,
+    ScraperRunFilter, ScraperRunStats, ScraperSourceTotals, SearchScope, StatusTransition
+)
+from src.infra.repositories.columnar import SCRAPER_RUN_FRAME_SCHEMA, auctions_frame, frame_from_objects
+
+# Status exibidos na Carteira (mesmo conjunto de PORTFOLIO_STATUSES do repositório Postgres)
+PORTFOLIO_STATUSES = (
+    EvaluationStatus.ANALISAR.value,
+    EvaluationStatus.PARTICIPAR.value,
+    EvaluationStatus.NO_BID.value,
+    EvaluationStatus.OUTBID.value,
+)
+
+# Carteira: leilões sem data/valor ficam no fim da ordenação (mesmas sentinelas do Postgres)
+PORTFOLIO_NO_DATE = datetime(9999, 12, 31)
+PORTFOLIO_NO_VALUE = -1.0
+
+# Campos do leilão que update_auction_core_data pode corrigir
+CORE_DATA_FIELDS = ("titulo", "valor_1_praca", "valor_2_praca", "data_1_praca", "data_2_praca", "link_detalhe")
+
+Key = Tuple[str, str]
+
+_NO_IDS: frozenset = frozenset()
+
+# Mesmos limiares da busca do repositório Postgres
+SEARCH_MIN_TRIGRAM_CHARS = 3
+SEARCH_EXACT_ID_BOOST = 10.0
+
+
+def _normalize(value: str) -> str:
+    """Minúsculas sem acentos (equivalente a normaliza_busca no Postgres)."""
+    decomposed = unicodedata.normalize("NFKD", value)
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).lower()
+
+
+def _terms(value: Optional[str]) -> Set[str]:
+    return set(re.findall(r"\w+", _normalize(value))) if value else set()
+
+
+def _prefix_range(vocab: List[str], prefix: str) -> List[str]:
+    """Palavras de `vocab` (ordenado) que começam com `prefix`, por busca binária."""
+    start = bisect_left(vocab, prefix)
+    return vocab[start:bisect_left(vocab, prefix + "\U0010ffff", start)]
+
+
+def _cents(value: Optional[float]) -> int:
+    """Valor em centavos: somas e subtrações incrementais sem acumular erro de float."""
+    return round((value or 0.0) * 100)
+
+
+def _naive(value: datetime) -> datetime:
+    """Converte timestamps com fuso para o horário local sem fuso (comparação com datas do filtro)."""
+    return value.astimezone().replace(tzinfo=None) if value.tzinfo else value
+
+
+def _truncate(value: datetime, granularity: str) -> datetime:
+    """Equivalente ao date_trunc('hour' | 'day') do Postgres."""
+    value = value.replace(minute=0, second=0, microsecond=0)
+    return value.replace(hour=0) if granularity == "day" else value
+
+
+def _run_bucket(run: ScraperRun, granularity: str) -> ScraperLatencyBucket:
+    """Bucket do rollup com uma única execução (mesmas regras de fold_scraper_runs no Postgres)."""
+    peso = run.total_requests or 1
+    com_latencia = run.avg_latency_ms is not None
+    histograma = [0] * (len(ScraperLatencyBucket.P95_BOUNDS_MS) + 1)
+    if run.p95_latency_ms is not None:
+        histograma[bisect_left(ScraperLatencyBucket.P95_BOUNDS_MS, run.p95_latency_ms)] = 1
+
+    return ScraperLatencyBucket(
+        source_name=run.source_name,
+        bucket_start=_truncate(run.execution_start_time, granularity),
+        runs_total=1,
+        runs_success=int(run.run_status == 'SUCCESS'),
+        runs_failed=int(run.run_status == 'FAILED'),
+        total_requests=run.total_requests or 0,
+        successful_requests=run.successful_requests or 0,
+        failed_requests=run.failed_requests or 0,
+        raw_items_collected=run.raw_items_collected or 0,
+        mapped_items_count=run.mapped_items_count or 0,
+        max_pages_scraped=run.max_pages_scraped,
+        latency_weighted_sum_ms=run.avg_latency_ms * peso if com_latencia else 0,
+        latency_weight=peso if com_latencia else 0,
+        latency_min_ms=run.avg_latency_ms,
+        latency_max_ms=run.avg_latency_ms,
+        p95_max_ms=run.p95_latency_ms,
+        p95_histogram=histograma
+    )
+
+
+class InMemoryAuctionRepository(AuctionRepository):
+    """
+    Implementação em memória do AuctionRepository, com o mesmo comportamento observável
+    do repositório Postgres (fila de triagem, facetas, carteira, auditoria, transições
+    e monitoramento dos scrapers).
+
+    Usada em testes rápidos, demos locais e como linha de base dos benchmarks.
+    Mantém índices em dicionários para não varrer a base nos acessos quentes:
+    - leilões por id_registro_bruto, por (site, id_leilao) e por id_leilao;
+    - valores das facetas -> ids de registro bruto;
+    - palavras dos títulos (sem acentos) -> ids de registro bruto (busca textual);
+    - avaliações por usuário e (usuário, status) -> chaves (site, id_leilao);
+    - fila de triagem por usuário: ids que saíram da fila e, para eles, contadores por valor
+      de faceta e volume, mantidos nas escritas (pendentes = base - saídos), de modo que
+      contagem e facetas sem filtro custam O(valores distintos), não O(base);
+    - execuções de scraper por fonte e o rollup por (granularidade, fonte, bucket).
+    Uma única instância pode ser compartilhada entre threads (todas as operações usam o mesmo lock).
+    """
+
+    def __init__(self, auctions: Optional[Iterable[Auction]] = None,
+                 scraper_runs: Optional[Iterable[ScraperRun]] = None):
+        self._lock = threading.RLock()
+
+        # --- Base analítica ---
+        self._auctions: Dict[int, Auction] = {}
+        self._raw_ids: List[int] = []  # ordenados, para a paginação keyset
+        self._by_key: Dict[Key, List[int]] = defaultdict(list)
+        self._by_id_leilao: Dict[str, List[int]] = defaultdict(list)
+        self._facet_index: Dict[str, Dict[str, Set[int]]] = {
+            name: defaultdict(set) for name in FilterFacets.FIELDS
+        }
+        self._title_index: Dict[str, Set[int]] = defaultdict(set)
+        # Chaves dos índices de título e de id_leilao em ordem (busca por prefixo com bisect);
+        # as novas entram no fim e a ordenação é refeita na próxima busca
+        self._title_vocab: List[str] = []
+        self._id_vocab: List[str] = []
+        self._vocab_sorted = True
+        self._volume_cents = 0  # soma de valor_1_praca da base
+
+        # --- Avaliações e produtividade ---
+        self._evaluations: Dict[str, Dict[Key, Evaluation]] = defaultdict(dict)
+        self._evaluated_raw: Dict[str, Set[int]] = defaultdict(set)
+        self._status_index: Dict[str, Dict[str, Set[Key]]] = defaultdict(lambda: defaultdict(set))
+        self._status_changed_at: Dict[Tuple[str, Key], datetime] = {}  # updated_at do Postgres
+        self._productivity: Counter = Counter()  # (usuario_id, dia, avaliacao) -> total
+
+        # --- Fila de triagem (equivalente a leiloes_fila_triagem, mantida nas escritas) ---
+        self._dequeued: Dict[str, Set[int]] = defaultdict(set)
+        self._dequeued_facets: Dict[str, Dict[str, Counter]] = defaultdict(
+            lambda: {name: Counter() for name in FilterFacets.FIELDS}
+        )
+        self._dequeued_volume: Counter = Counter()  # usuario_id -> centavos de valor_1_praca
+
+        # --- Auditoria ---
+        self._analyses: Dict[Tuple[str, str, str], DetailedAnalysis] = {}
+
+        # --- Monitoramento ---
+        self._scraper_runs: Dict[int, ScraperRun] = {}
+        self._runs_by_source: Dict[str, Dict[int, ScraperRun]] = defaultdict(dict)
+        self._unfolded: Set[int] = set()
+        self._folded: Set[int] = set()
+        self._rollup: Dict[Tuple[str, str, datetime], ScraperLatencyBucket] = {}
+
+        if auctions:
+            self.add_auctions(auctions)
+        if scraper_runs:
+            self.add_scraper_runs(scraper_runs)
+
+    # --- CARGA DE DADOS (equivalente ao ETL que alimenta as tabelas) ---
+
+    def add_auctions(self, auctions: Iterable[Auction]) -> None:
+        """
+        Inclui leilões na base analítica. Leilões sem id_registro_bruto recebem o próximo id livre;
+        um id já existente substitui o registro anterior.
+        """
+        with self._lock:
+            next_id = (self._raw_ids[-1] if self._raw_ids else 0) + 1
+            novos = []
+            for auction in auctions:
+                if auction.id_registro_bruto is None:
+                    auction = replace(auction, id_registro_bruto=next_id)
+                raw_id = auction.id_registro_bruto
+                next_id = max(next_id, raw_id + 1)
+                if raw_id in self._auctions:
+                    self._unindex_auction(self._auctions[raw_id])
+                else:
+                    novos.append(raw_id)
+                self._index_auction(auction)
+            if novos:
+                # Timsort é linear para ids que chegam (quase) em ordem
+                self._raw_ids.extend(novos)
+                self._raw_ids.sort()
+
+    def _index_auction(self, auction: Auction) -> None:
+        raw_id = auction.id_registro_bruto
+        self._auctions[raw_id] = auction
+        self._by_key[(auction.site, auction.id_leilao)].append(raw_id)
+        if auction.id_leilao not in self._by_id_leilao:
+            self._id_vocab.append(auction.id_leilao)
+            self._vocab_sorted = False
+        self._by_id_leilao[auction.id_leilao].append(raw_id)
+        for name in FilterFacets.FIELDS:
+            self._facet_index[name][getattr(auction, name)].add(raw_id)
+        for term in _terms(auction.titulo):
+            if term not in self._title_index:
+                self._title_vocab.append(term)
+                self._vocab_sorted = False
+            self._title_index[term].add(raw_id)
+        self._volume_cents += _cents(auction.valor_1_praca)
+        for user_id in self._evaluations:
+            if not self._is_pending(user_id, auction):
+                self._dequeue(user_id, auction)
+
+    def _unindex_auction(self, auction: Auction) -> None:
+        raw_id = auction.id_registro_bruto
+        self._by_key[(auction.site, auction.id_leilao)].remove(raw_id)
+        self._by_id_leilao[auction.id_leilao].remove(raw_id)
+        for name in FilterFacets.FIELDS:
+            self._facet_index[name][getattr(auction, name)].discard(raw_id)
+        for term in _terms(auction.titulo):
+            self._title_index[term].discard(raw_id)
+        self._volume_cents -= _cents(auction.valor_1_praca)
+        for user_id, dequeued in self._dequeued.items():
+            if raw_id in dequeued:
+                dequeued.discard(raw_id)
+                for name in FilterFacets.FIELDS:
+                    self._dequeued_facets[user_id][name][getattr(auction, name)] -= 1
+                self._dequeued_volume[user_id] -= _cents(auction.valor_1_praca)
+
+    def _dequeue(self, user_id: str, auction: Auction) -> None:
+        """Tira o leilão da fila do usuário, atualizando os contadores das facetas e do volume."""
+        dequeued = self._dequeued[user_id]
+        if auction.id_registro_bruto in dequeued:
+            return
+        dequeued.add(auction.id_registro_bruto)
+        for name in FilterFacets.FIELDS:
+            self._dequeued_facets[user_id][name][getattr(auction, name)] += 1
+        self._dequeued_volume[user_id] += _cents(auction.valor_1_praca)
+
+    def add_scraper_runs(self, runs: Iterable[ScraperRun]) -> None:
+        """Registra execuções de scraper (um id já existente substitui a execução anterior)."""
+        with self._lock:
+            for run in runs:
+                anterior = self._scraper_runs.get(run.id)
+                if anterior is not None:
+                    self._runs_by_source[anterior.source_name].pop(run.id, None)
+                self._scraper_runs[run.id] = run
+                self._runs_by_source[run.source_name][run.id] = run
+                if run.run_status != 'IN_PROGRESS' and run.id not in self._folded:
+                    self._unfolded.add(run.id)
+
+    # --- MÉTODOS DA FASE 1 (TRIAGEM) ---
+
+    def _is_pending(self, user_id: str, auction: Auction) -> bool:
+        """Mesmo critério da fila do Postgres: avaliado por (site, id_leilao) ou pelo registro bruto."""
+        return (
+            auction.id_registro_bruto not in self._evaluated_raw[user_id]
+            and (auction.site, auction.id_leilao) not in self._evaluations[user_id]
+        )
+
+    def _candidates(self, filters: AuctionFilter, skip: Optional[str] = None) -> Optional[Set[int]]:
+        """
+        Ids que satisfazem os filtros das facetas (exceto `skip`) pelos índices invertidos.
+        None significa "sem filtro" (toda a base).
+        """
+        result = None
+        for name in FilterFacets.FIELDS:
+            selected = getattr(filters, name)
+            if not selected or name == skip:
+                continue
+            index = self._facet_index[name]
+            ids = set().union(*(index.get(value, ()) for value in selected))
+            result = ids if result is None else result & ids
+            if not result:
+                return set()
+        return result
+
+    def _pending_ids(self, user_id: str, candidates: Set[int]) -> Set[int]:
+        return candidates - self._dequeued.get(user_id, _NO_IDS)
+
+    def _pending_count(self, user_id: str) -> int:
+        return len(self._auctions) - len(self._dequeued.get(user_id, _NO_IDS))
+
+    def _facet_counts(self, user_id: str, name: str, ids: Optional[Set[int]]) -> Counter:
+        """Pendentes por valor da faceta: pelos contadores (sem filtro) ou intersectando o índice com os ids filtrados."""
+        index = self._facet_index[name]
+        if ids is None:
+            dequeued = self._dequeued_facets[user_id][name] if user_id in self._dequeued_facets else Counter()
+            return Counter({value: len(raw_ids) - dequeued[value] for value, raw_ids in index.items()})
+        return Counter({value: len(raw_ids & ids) for value, raw_ids in index.items()})
+
+    def ensure_pending_queue(self, user_id: str) -> int:
+        # A fila em memória é derivada dos leilões e avaliações: não há carga a fazer
+        return 0
+
+    def get_pending_auctions(self, user_id: str, filters: AuctionFilter,
+                             cursor: Optional[int] = None, page_size: int = 15) -> AuctionPage:
+        with self._lock:
+            candidates = self._candidates(filters)
+            if candidates is None:
+                # Sem filtro: percorre a lista ordenada a partir do cursor (keyset)
+                end = bisect_left(self._raw_ids, cursor) if cursor is not None else len(self._raw_ids)
+                ids = (self._raw_ids[i] for i in range(end - 1, -1, -1))
+            else:
+                ids = sorted(
+                    (raw_id for raw_id in candidates if cursor is None or raw_id < cursor), reverse=True
+                )
+
+            dequeued = self._dequeued.get(user_id, _NO_IDS)
+            page = []
+            for raw_id in ids:
+                if raw_id not in dequeued:
+                    page.append(self._auctions[raw_id])
+                    # Uma linha a mais apenas para saber se existe próxima página
+                    if len(page) > page_size:
+                        break
+
+        items = [replace(auction) for auction in page[:page_size]]
+        next_cursor = items[-1].id_registro_bruto if len(page) > page_size and items else None
+        return AuctionPage(items=items, next_cursor=next_cursor, page_size=page_size)
+
+    def get_pending_auctions_frame(self, user_id: str, filters: AuctionFilter,
+                                   cursor: Optional[int] = None, page_size: int = 15) -> AuctionFramePage:
+        page = self.get_pending_auctions(user_id, filters, cursor, page_size)
+        return AuctionFramePage(frame=auctions_frame(page.items), next_cursor=page.next_cursor, page_size=page_size)
+
+    def count_pending_auctions(self, user_id: str, filters: AuctionFilter) -> int:
+        with self._lock:
+            candidates = self._candidates(filters)
+            if candidates is None:
+                return self._pending_count(user_id)
+            return len(self._pending_ids(user_id, candidates))
+
+    def get_filter_facets(self, user_id: str, filters: AuctionFilter) -> FilterFacets:
+        """
+        Mesma semântica do GROUPING SETS do Postgres: cada faceta é contada com os filtros
+        das demais; count_filtered é a contagem dentro da seleção completa.
+        Sem filtros, usa os contadores da fila; com filtros, conta só os ids dos índices das facetas.
+        """
+        with self._lock:
+            candidates = self._candidates(filters)
+            if candidates is None:
+                selecao = None
+                facets = FilterFacets(
+                    total=self._pending_count(user_id),
+                    volume_1_praca=(self._volume_cents - self._dequeued_volume[user_id]) / 100
+                )
+            else:
+                selecao = self._pending_ids(user_id, candidates)
+                facets = FilterFacets(
+                    total=len(selecao),
+                    volume_1_praca=sum(_cents(self._auctions[raw_id].valor_1_praca) for raw_id in selecao) / 100
+                )
+            for name in FilterFacets.FIELDS:
+                others = self._candidates(filters, skip=name)
+                counts = self._facet_counts(
+                    user_id, name, None if others is None else self._pending_ids(user_id, others)
+                )
+                filtered = counts if selecao is None else self._facet_counts(user_id, name, selecao)
+                getattr(facets, name).extend(
+                    FacetValue(value=value, count=count, count_filtered=filtered.get(value, 0))
+                    for value, count in sorted(
+                        ((v, c) for v, c in counts.items() if v and c), key=lambda item: item[0]
+                    )
+                )
+        return facets
+
+    def search_auctions(self, user_id: str, query: str, scope: SearchScope = SearchScope.TODOS,
+                        filters: Optional[AuctionFilter] = None, statuses: Optional[List[str]] = None,
+                        offset: int = 0, page_size: int = 20, min_valor: Optional[float] = None,
+                        max_valor: Optional[float] = None,
+                        no_bid_reasons: Optional[List[str]] = None) -> AuctionSearchPage:
+        """
+        Mesmo contrato da busca do Postgres, em versão simplificada: cada termo casa com o
+        início de uma palavra do título (sem acentos), sem stemming nem tolerância a erros
+        de digitação; o ID casa por igualdade ou por prefixo (a partir de 3 caracteres).
+        """
+        query = (query or "").strip()
+        terms = re.findall(r"\w+", _normalize(query))
+        if not terms:
+            return AuctionSearchPage(offset=offset, page_size=page_size)
+        filters = filters or AuctionFilter()
+
+        with self._lock:
+            if not self._vocab_sorted:
+                # Timsort: as chaves novas formam uma sequência curta no fim da lista já ordenada
+                self._title_vocab.sort()
+                self._id_vocab.sort()
+                self._vocab_sorted = True
+
+            title_ids = None
+            for term in terms:
+                ids = set().union(*(self._title_index[word] for word in _prefix_range(self._title_vocab, term)))
+                title_ids = ids if title_ids is None else title_ids & ids
+
+            id_ids = set(self._by_id_leilao.get(query, ()))
+            if len(query) >= SEARCH_MIN_TRIGRAM_CHARS:
+                id_ids.update(
+                    raw_id for id_leilao in _prefix_range(self._id_vocab, query) for raw_id in self._by_id_leilao[id_leilao]
+                )
+
+            candidates = self._candidates(filters)
+            if candidates is not None:
+                title_ids &= candidates
+                id_ids &= candidates
+
+            if scope == SearchScope.CARTEIRA:
+                wanted = [st for st in statuses if st in PORTFOLIO_STATUSES] if statuses else PORTFOLIO_STATUSES
+                status_by_key = {
+                    key: status for status in wanted for key in self._status_index[user_id].get(status, ())
+                }
+
+            hits = []
+            for raw_id in title_ids | id_ids:
+                auction = self._auctions[raw_id]
+                if filters.tipo_leilao and auction.tipo_leilao not in filters.tipo_leilao:
+                    continue
+                key = (auction.site, auction.id_leilao)
+                if scope == SearchScope.TRIAGEM and raw_id in self._dequeued.get(user_id, _NO_IDS):
+                    continue
+                if scope == SearchScope.CARTEIRA:
+                    if key not in status_by_key:
+                        continue
+                    analysis = self._analyses.get((auction.site, auction.id_leilao, user_id))
+                    auction = replace(
+                        auction, status_carteira=status_by_key[key],
+                        no_bid_reason=analysis.no_bid_reason.value if analysis and analysis.no_bid_reason else None
+                    )
+                    if not self._matches_portfolio_filters(auction, min_valor, max_valor, no_bid_reasons):
+                        continue
+                rank = (1.0 if raw_id in title_ids else 0.0) + (SEARCH_EXACT_ID_BOOST if auction.id_leilao == query else 0.0)
+                hits.append((rank, raw_id, auction))
+
+        hits.sort(key=lambda hit: (hit[0], hit[1]), reverse=True)
+        items = [replace(auction) for _, _, auction in hits[offset:offset + page_size]]
+        return AuctionSearchPage(items=items, total=len(hits), offset=offset, page_size=page_size)
+
+    def _resolve_raw_id(self, site: str, id_leilao: str) -> Optional[int]:
+        """Match exato por (site, id_leilao), com o fallback legado por id_leilao."""
+        ids = self._by_key.get((site, id_leilao)) or self._by_id_leilao.get(id_leilao)
+        return ids[0] if ids else None
+
+    def _set_evaluation(self, user_id: str, site: str, id_leilao: str, raw_id: int,
+                        status: EvaluationStatus, data_analise: datetime, keep_date: bool = False) -> bool:
+        """
+        Upsert de uma avaliação, mantendo os índices (sem registrar produtividade).
+        Retorna se houve decisão nova (leilão sem avaliação ou com status diferente).
+        """
+        key = (site, id_leilao)
+        anterior = self._evaluations[user_id].get(key)
+        if anterior is not None:
+            self._status_index[user_id][anterior.avaliacao.value].discard(key)
+            if keep_date:
+                data_analise = anterior.data_analise
+        self._evaluations[user_id][key] = Evaluation(
+            usuario_id=user_id, site=site, id_leilao=id_leilao, avaliacao=status, data_analise=data_analise
+        )
+        self._status_index[user_id][status.value].add(key)
+        self._evaluated_raw[user_id].add(raw_id)
+        for dequeued_id in (raw_id, *self._by_key.get(key, ())):
+            if dequeued_id in self._auctions:
+                self._dequeue(user_id, self._auctions[dequeued_id])
+        self._status_changed_at[(user_id, key)] = datetime.now() if keep_date else data_analise
+        return anterior is None or anterior.avaliacao != status
+
+    def save_evaluations(self, evaluations: List[Evaluation]) -> BatchWriteResult:
+        with self._lock:
+            # Deduplica pela PK (a última decisão vence), como no Postgres
+            rows, skipped = {}, []
+            for ev in evaluations:
+                raw_id = self._resolve_raw_id(ev.site, ev.id_leilao)
+                if raw_id is None:
+                    skipped.append((ev.site, ev.id_leilao))
+                    continue
+                rows[(ev.usuario_id, ev.site, ev.id_leilao)] = (ev, raw_id)
+
+            for ev, raw_id in rows.values():
+                if self._set_evaluation(ev.usuario_id, ev.site, ev.id_leilao, raw_id, ev.avaliacao, ev.data_analise):
+                    self._productivity[(ev.usuario_id, ev.data_analise.date(), ev.avaliacao.value)] += 1
+
+        return BatchWriteResult(saved=len(rows), skipped=skipped)
+
+    def get_stats(self, user_id: str, start_date: Optional[date] = None,
+                  end_date: Optional[date] = None) -> Dict[str, int]:
+        start_date = start_date or date.today()
+        end_date = end_date or start_date
+        stats = {'analisar': 0, 'descartar': 0, 'total_processado': 0}
+        with self._lock:
+            for (usuario_id, dia, avaliacao), total in self._productivity.items():
+                if usuario_id == user_id and start_date <= dia <= end_date:
+                    stats[avaliacao.lower()] = stats.get(avaliacao.lower(), 0) + total
+        stats['total_processado'] = stats['analisar'] + stats['descartar']
+        return stats
+
+    # --- MÉTODOS DA FASE 2 (CARTEIRA / ANÁLISE) ---
+
+    def _portfolio_auctions(self, user_id: str, statuses) -> List[Auction]:
+        """Leilões da carteira do usuário nos status pedidos, com status_carteira e no_bid_reason."""
+        with self._lock:
+            result = []
+            for status in statuses:
+                for site, id_leilao in self._status_index[user_id].get(status, ()):
+                    analysis = self._analyses.get((site, id_leilao, user_id))
+                    no_bid_reason = analysis.no_bid_reason.value if analysis and analysis.no_bid_reason else None
+                    result.extend(
+                        replace(self._auctions[raw_id], status_carteira=status, no_bid_reason=no_bid_reason)
+                        for raw_id in self._by_key.get((site, id_leilao), ())
+                    )
+        return result
+
+    @staticmethod
+    def _portfolio_sort_key(auction: Auction, sort: PortfolioSort) -> Tuple:
+        """(chave de ordenação, id_registro_bruto), com o mesmo formato do cursor do Postgres."""
+        if sort == PortfolioSort.MAIOR_VALOR:
+            value = auction.valor_2_praca if auction.valor_2_praca is not None else PORTFOLIO_NO_VALUE
+        elif sort == PortfolioSort.DATA_2_PRACA:
+            value = auction.data_2_praca or PORTFOLIO_NO_DATE
+        else:
+            datas = [d for d in (auction.data_1_praca, auction.data_2_praca) if d is not None]
+            value = max(datas) if datas else PORTFOLIO_NO_DATE
+        return value, auction.id_registro_bruto
+
+    @staticmethod
+    def _matches_portfolio_filters(auction: Auction, min_valor: Optional[float], max_valor: Optional[float],
+                                   no_bid_reasons: Optional[List[str]]) -> bool:
+        """Filtros de valor (2ª praça) e motivo do No Bid da carteira (listagem e busca)."""
+        valor = auction.valor_2_praca
+        if min_valor is not None and (valor is None or valor < min_valor):
+            return False
+        if max_valor is not None and (valor is None or valor > max_valor):
+            return False
+        return not no_bid_reasons or auction.no_bid_reason in no_bid_reasons
+
+    def _filtered_portfolio(self, user_id: str, query: PortfolioQuery) -> List[Auction]:
+        statuses = [st for st in query.statuses if st in PORTFOLIO_STATUSES] if query.statuses else PORTFOLIO_STATUSES
+        return [
+            auction for auction in self._portfolio_auctions(user_id, statuses)
+            if self._matches_portfolio_filters(auction, query.min_valor, query.max_valor, query.no_bid_reasons)
+        ]
+
+    def get_portfolio_page(self, user_id: str, query: PortfolioQuery) -> PortfolioPage:
+        sort = PortfolioSort(query.sort)
+        descending = sort == PortfolioSort.MAIOR_VALOR
+        keyed = sorted(
+            ((self._portfolio_sort_key(a, sort), a) for a in self._filtered_portfolio(user_id, query)),
+            key=lambda pair: pair[0], reverse=descending
+        )
+        if query.cursor is not None:
+            cursor = tuple(query.cursor)
+            keyed = [(k, a) for k, a in keyed if (k < cursor if descending else k > cursor)]
+        items = [a for _, a in keyed]
+        page = items[:query.page_size]
+        has_next = len(items) > query.page_size and page
+        return PortfolioPage(
+            items=page,
+            next_cursor=self._portfolio_sort_key(page[-1], sort) if has_next else None,
+            page_size=query.page_size
+        )
+
+    def get_portfolio_summary(self, user_id: str, query: Optional[PortfolioQuery] = None) -> PortfolioSummary:
+        items = self._filtered_portfolio(user_id, query or PortfolioQuery())
+        return PortfolioSummary(
+            counts=dict(Counter(a.status_carteira for a in items)),
+            max_valor_2_praca=max((a.valor_2_praca or 0.0 for a in items), default=0.0)
+        )
+
+    def get_finalizados_indicators(self, user_id: str) -> FinalizadosIndicators:
+        finalizados = self._filtered_portfolio(user_id, PortfolioQuery(
+            statuses=[EvaluationStatus.NO_BID.value, EvaluationStatus.OUTBID.value]
+        ))
+        indicators = FinalizadosIndicators()
+        reasons: Dict[Optional[str], FinalizadosReasonCount] = {}
+        by_uf, monthly = Counter(), Counter()
+        for auction in finalizados:
+            status = auction.status_carteira
+            if status == EvaluationStatus.NO_BID.value:
+                indicators.no_bid += 1
+                indicators.capital_evitado += auction.valor_2_praca or 0.0
+                reason = reasons.setdefault(auction.no_bid_reason, FinalizadosReasonCount(auction.no_bid_reason, 0))
+                reason.total += 1
+                reason.valor_2_praca += auction.valor_2_praca or 0.0
+            else:
+                indicators.outbid += 1
+            by_uf[(auction.uf, status)] += 1
+            changed_at = self._status_changed_at.get((user_id, (auction.site, auction.id_leilao)))
+            if changed_at is not None:
+                monthly[(changed_at.date().replace(day=1), status)] += 1
+
+        indicators.by_reason = sorted(reasons.values(), key=lambda r: (-r.total, r.reason or ""))
+        indicators.by_uf = [FinalizadosUfBucket(uf, status, total) for (uf, status), total in sorted(
+            by_uf.items(), key=lambda item: (item[0][0] or "", item[0][1])
+        )]
+        indicators.monthly = [FinalizadosMonthlyBucket(mes, status, total) for (mes, status), total in sorted(monthly.items())]
+        return indicators
+
+    def get_auction(self, site: str, id_leilao: str) -> Optional[Auction]:
+        with self._lock:
+            ids = self._by_key.get((site, id_leilao))
+            return replace(self._auctions[ids[0]]) if ids else None
+
+    def update_auction_core_data(self, site: str, id_leilao: str, data: dict) -> None:
+        with self._lock:
+            ids = self._by_key.get((site, id_leilao))
+            if not ids:
+                raise ValueError("Leilão não encontrado para edição.")
+            auction = self._auctions[ids[0]]
+            # O título entra no índice da busca textual: reindexa o leilão
+            self._unindex_auction(auction)
+            for name in CORE_DATA_FIELDS:
+                if name in data:
+                    setattr(auction, name, data[name])
+            self._index_auction(auction)
+
+    def save_detailed_analysis(self, analysis: DetailedAnalysis) -> None:
+        """
+        Mesma regra do Postgres: sem alterações não faz nada; análise já sincronizada
+        grava apenas os campos alterados; análise nova grava o objeto inteiro.
+        """
+        dirty = analysis.dirty_fields()
+        if not dirty:
+            return
+
+        key = (analysis.site, analysis.id_leilao, analysis.usuario_id)
+        with self._lock:
+            stored = self._analyses.get(key)
+            if analysis.is_persisted and stored is not None:
+                for name in dirty:
+                    setattr(stored, name, copy.deepcopy(getattr(analysis, name)))
+            else:
+                stored = copy.deepcopy(analysis)
+                self._analyses[key] = stored
+            stored.data_atualizacao = datetime.now()
+        analysis.mark_clean()
+
+    def save_auditoria_rascunho(self, analysis: DetailedAnalysis) -> None:
+        self.save_detailed_analysis(analysis)
+
+    def get_detailed_analysis(self, site: str, id_leilao: str, user_id: str) -> Optional[DetailedAnalysis]:
+        with self._lock:
+            stored = self._analyses.get((site, id_leilao, user_id))
+            if stored is None:
+                return None
+            analysis = copy.deepcopy(stored)
+        analysis.mark_clean()
+        return analysis
+
+    def get_auditoria_snapshot(self, site: str, id_leilao: str, user_id: str) -> AuditoriaSnapshot:
+        with self._lock:
+            return AuditoriaSnapshot(
+                auction=self.get_auction(site, id_leilao),
+                analysis=self.get_detailed_analysis(site, id_leilao, user_id)
+            )
+
+    def transition_statuses(self, user_id: str, transitions: List[StatusTransition]) -> BatchWriteResult:
+        """
+        Aplica o lote de transições (a última de cada leilão vence). Leilões fora da base
+        analítica voltam em `skipped`; data_analise é mantida a da primeira avaliação.
+        """
+        lote = {(t.site, t.id_leilao): t.new_status for t in transitions}
+        if not lote:
+            return BatchWriteResult()
+
+        now = datetime.now()
+        saved, skipped = 0, []
+        with self._lock:
+            for (site, id_leilao), status in lote.items():
+                ids = self._by_key.get((site, id_leilao))
+                if not ids:
+                    skipped.append((site, id_leilao))
+                    continue
+                if self._set_evaluation(user_id, site, id_leilao, ids[0], status, now, keep_date=True):
+                    self._productivity[(user_id, now.date(), status.value)] += 1
+                saved += 1
+        return BatchWriteResult(saved=saved, skipped=skipped)
+
+    def update_status(self, user_id: str, site: str, id_leilao: str, new_status: EvaluationStatus) -> None:
+        result = self.transition_statuses(user_id, [StatusTransition(site, id_leilao, new_status)])
+        if result.skipped:
+            raise RuntimeError(f"Falha de integridade: Leilão {id_leilao} no site {site} não encontrado na base analítica.")
+
+    # --- MÉTODOS DA TELA DE MONITORAMENTO ---
+
+    def _filtered_runs(self, filters: ScraperRunFilter) -> List[ScraperRun]:
+        if filters.sources:
+            runs = [run for source in filters.sources for run in self._runs_by_source.get(source, {}).values()]
+        else:
+            runs = list(self._scraper_runs.values())
+
+        start = datetime.combine(filters.start_date, time.min) if filters.start_date else None
+        end = datetime.combine(filters.end_date + timedelta(days=1), time.min) if filters.end_date else None
+        statuses = set(filters.statuses or ())
+        return [
+            run for run in runs
+            if (start is None or _naive(run.execution_start_time) >= start)
+            and (end is None or _naive(run.execution_start_time) < end)
+            and (not statuses or run.run_status in statuses)
+        ]
+
+    def get_scraper_runs(self, filters: ScraperRunFilter, limit: Optional[int] = None,
+                         offset: int = 0) -> List[ScraperRun]:
+        with self._lock:
+            runs = self._filtered_runs(filters)
+        runs.sort(key=lambda run: (_naive(run.execution_start_time), run.id), reverse=True)
+        return runs[offset:offset + limit if limit is not None else None]
+
+    def get_scraper_runs_frame(self, filters: ScraperRunFilter, limit: Optional[int] = None,
+                               offset: int = 0):
+        return frame_from_objects(SCRAPER_RUN_FRAME_SCHEMA, self.get_scraper_runs(filters, limit, offset))
+
+    def get_scraper_run_stats(self, filters: ScraperRunFilter) -> ScraperRunStats:
+        with self._lock:
+            runs = self._filtered_runs(filters)
+
+        stats = ScraperRunStats(total_runs=len(runs))
+        daily, by_source = Counter(), {}
+        duracoes = []
+        for run in runs:
+            daily[(_naive(run.execution_start_time).date(), run.run_status)] += 1
+            totais = by_source.setdefault(run.source_name, ScraperSourceTotals(source_name=run.source_name))
+            totais.raw_items_collected += run.raw_items_collected or 0
+            totais.mapped_items_count += run.mapped_items_count or 0
+            if run.run_status == 'SUCCESS':
+                stats.success_runs += 1
+                if run.duration_seconds is not None:
+                    duracoes.append(run.duration_seconds)
+
+        stats.total_collected = sum(s.raw_items_collected for s in by_source.values())
+        stats.total_mapped = sum(s.mapped_items_count for s in by_source.values())
+        stats.avg_duration_success = sum(duracoes) / len(duracoes) if duracoes else None
+        stats.daily = [
+            ScraperDailyBucket(dia=dia, run_status=status, total=total)
+            for (dia, status), total in sorted(daily.items())
+        ]
+        stats.by_source = [by_source[name] for name in sorted(by_source)]
+        return stats
+
+    def fold_scraper_runs(self, batch_size: int = 5000) -> int:
+        """Soma ao rollup (hora e dia) as execuções concluídas ainda não incorporadas, em ordem de id."""
+        total = 0
+        while True:
+            with self._lock:
+                lote = heapq.nsmallest(batch_size, self._unfolded)
+                for run_id in lote:
+                    run = self._scraper_runs[run_id]
+                    for granularity in ("hour", "day"):
+                        bucket = _run_bucket(run, granularity)
+                        key = (granularity, run.source_name, bucket.bucket_start)
+                        atual = self._rollup.get(key)
+                        self._rollup[key] = atual.merge(bucket) if atual else bucket
+                    self._unfolded.discard(run_id)
+                    self._folded.add(run_id)
+            total += len(lote)
+            if len(lote) < batch_size:
+                return total
+
+    def get_scraper_latency_history(self, sources: Optional[List[str]], start: datetime, end: datetime,
+                                    granularity: str = "day") -> List[ScraperLatencyBucket]:
+        start, end = _naive(start), _naive(end)
+        fontes = set(sources or ())
+        with self._lock:
+            buckets = [
+                replace(bucket, p95_histogram=list(bucket.p95_histogram))
+                for (gran, source, bucket_start), bucket in self._rollup.items()
+                if gran == granularity and start <= _naive(bucket_start) < end
+                and (not fontes or source in fontes)
+            ]
+        buckets.sort(key=lambda b: (_naive(b.bucket_start), b.source_name))
+        return buckets
+
+    def get_scraper_sources(self) -> List[str]:
+        with self._lock:
+            return sorted(source for source, runs in self._runs_by_source.items() if runs)
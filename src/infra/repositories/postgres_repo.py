@@ -1,125 +1,654 @@
-from typing import List, Dict, Optional
+import re
+import time
+import pandas as pd
+from typing import List, Dict, Optional, Tuple
+from collections import Counter
 from sqlalchemy.orm import Session
-from sqlalchemy import text, and_, func, distinct
-from datetime import datetime
+from sqlalchemy import text, and_, or_, true, func, distinct, select, update, delete, literal, values, column, tuple_, cast, case, literal_column, String, Date, DateTime
+from datetime import datetime, date, timedelta
 from sqlalchemy.dialects.postgresql import insert
 from src.application.interfaces import AuctionRepository
 from src.domain.models import (
-    Auction, AuctionFilter, Evaluation, DetailedAnalysis,
+    Auction, AuctionFilter, AuctionFramePage, AuctionPage, AuctionSearchPage, BatchWriteResult, Evaluation, DetailedAnalysis, FacetValue, FilterFacets,
     RiskLevel, OccupationStatus, ConjugeStatus, NaturezaExecucao, EspecieCredito, EvaluationStatus, NoBidReason,
-    ScraperRun, ScraperRunFilter
+    PortfolioPage, PortfolioQuery, PortfolioSort, PortfolioSummary,
+    FinalizadosIndicators, FinalizadosMonthlyBucket, FinalizadosReasonCount, FinalizadosUfBucket,
+    ScraperRun, ScraperRunFilter, SearchScope, StatusTransition, AuditoriaSnapshot,
+    ScraperRunStats, ScraperDailyBucket, ScraperSourceTotals, ScraperLatencyBucket
 )
 from src.infra.database.models_sql import (
     LeilaoAnaliticoModel, LeilaoAvaliacaoModel, LeilaoAnaliseDetalhadaModel,
-    ScraperRunModel
+    LeilaoFilaTriagemModel, LeilaoFilaUsuarioModel, ProdutividadeDiariaModel, ScraperRunModel,
+    ScraperRunRollupModel
 )
+from src.infra.repositories.columnar import (
+    AUCTION_FRAME_SCHEMA, AUCTION_ZERO_FILLED, SCRAPER_RUN_FRAME_SCHEMA, frame_from_batches
+)
+
+# Status exibidos na Carteira (mesmo predicado do índice parcial ix_avaliacoes_carteira)
+PORTFOLIO_STATUSES = [
+    EvaluationStatus.ANALISAR.value,
+    EvaluationStatus.PARTICIPAR.value,
+    EvaluationStatus.NO_BID.value,
+    EvaluationStatus.OUTBID.value,
+]
+
+# Campos de DetailedAnalysis cujo nome de coluna difere do domínio
+ANALYSIS_FIELD_TO_COLUMN = {
+    "analise_ia": "parecer_juridico",
+}
+
+# Colunas do histograma de p95 em scraper_runs_rollup (mesma ordem de ScraperLatencyBucket.p95_histogram)
+ROLLUP_HISTOGRAM_COLUMNS = ("p95_le_250", "p95_le_500", "p95_le_1000", "p95_le_2000", "p95_le_5000", "p95_gt_5000")
+
+# Colunas de leiloes_analiticos usadas pelas telas (listagens e cabeçalho).
+# A ordem é a mesma dos argumentos posicionais de _row_to_auction.
+AUCTION_COLUMNS = (
+    LeilaoAnaliticoModel.site,
+    LeilaoAnaliticoModel.id_leilao,
+    LeilaoAnaliticoModel.titulo,
+    LeilaoAnaliticoModel.uf,
+    LeilaoAnaliticoModel.cidade,
+    LeilaoAnaliticoModel.tipo_leilao,
+    LeilaoAnaliticoModel.tipo_bem,
+    LeilaoAnaliticoModel.valor_1_praca,
+    LeilaoAnaliticoModel.valor_2_praca,
+    LeilaoAnaliticoModel.link_detalhe,
+    LeilaoAnaliticoModel.imagem_capa,
+    LeilaoAnaliticoModel.data_1_praca,
+    LeilaoAnaliticoModel.data_2_praca,
+    LeilaoAnaliticoModel.status_imovel,
+    LeilaoAnaliticoModel.id_registro_bruto,
+)
+
+# Linhas por lote do cursor nas leituras colunares (cada lote vira um RecordBatch Arrow)
+FRAME_BATCH_SIZE = 1000
+
+# Inscrição na fila: espera máxima pelas escritas que estavam abertas quando o usuário foi inscrito
+QUEUE_ENROLL_WAIT_SECONDS = 30.0
+
+# Carteira: leilões sem data/valor ficam no fim da ordenação (e o cursor nunca é NULL)
+PORTFOLIO_NO_DATE = datetime(9999, 12, 31)
+PORTFOLIO_NO_VALUE = -1.0
+
+# Chave de ordenação de cada PortfolioSort e se ela é decrescente
+PORTFOLIO_SORT_KEYS = {
+    PortfolioSort.DATA_ORDENACAO: (func.coalesce(
+        func.greatest(LeilaoAnaliticoModel.data_1_praca, LeilaoAnaliticoModel.data_2_praca), PORTFOLIO_NO_DATE
+    ), False),
+    PortfolioSort.DATA_2_PRACA: (func.coalesce(LeilaoAnaliticoModel.data_2_praca, PORTFOLIO_NO_DATE), False),
+    PortfolioSort.MAIOR_VALOR: (func.coalesce(LeilaoAnaliticoModel.valor_2_praca, PORTFOLIO_NO_VALUE), True),
+}
+
+# Busca textual: as expressões são as mesmas dos índices da migração 005
+# (o planner só usa um índice de expressão quando a consulta repete a expressão)
+SEARCH_TS_CONFIG = literal_column("'public.pt_unaccent'::regconfig")
+SEARCH_TSVECTOR = func.to_tsvector(SEARCH_TS_CONFIG, LeilaoAnaliticoModel.titulo)
+SEARCH_TITLE_NORMALIZED = func.public.normaliza_busca(LeilaoAnaliticoModel.titulo)
+
+# Trigramas só valem a partir de 3 caracteres (abaixo disso LIKE '%..%' não usa o índice)
+SEARCH_MIN_TRIGRAM_CHARS = 3
+
+# Peso do ID digitado por inteiro: o leilão exato vem antes de qualquer título parecido
+SEARCH_EXACT_ID_BOOST = 10.0
+
+
+def _prefix_tsquery(query: str) -> Optional[str]:
+    """Termos da busca como tsquery de prefixos: 'apartamento pinhei' -> 'apartamento:* & pinhei:*'."""
+    terms = re.findall(r"\w+", query)
+    return " & ".join(f"{term}:*" for term in terms) or None
+
+
+def _like_pattern(value: str) -> str:
+    """Padrão LIKE de "contém" com os curingas do próprio texto escapados."""
+    escaped = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def _row_to_auction(site, id_leilao, titulo, uf, cidade, tipo_leilao, tipo_bem, valor_1_praca, valor_2_praca,
+                    link_detalhe, imagem_capa, data_1_praca, data_2_praca, status_imovel, id_registro_bruto,
+                    status_carteira=None, no_bid_reason=None) -> Auction:
+    """Constrói o Auction direto da tupla do resultado (sem entidade ORM / identity map)."""
+    return Auction(
+        site=site,
+        id_leilao=id_leilao,
+        titulo=titulo,
+        uf=uf,
+        cidade=cidade,
+        tipo_leilao=tipo_leilao,
+        tipo_bem=tipo_bem,
+        valor_1_praca=float(valor_1_praca) if valor_1_praca else 0.0,
+        valor_2_praca=float(valor_2_praca) if valor_2_praca else 0.0,
+        link_detalhe=link_detalhe,
+        imagem_capa=imagem_capa,
+        data_1_praca=data_1_praca,
+        data_2_praca=data_2_praca,
+        status_carteira=status_carteira,
+        no_bid_reason=no_bid_reason,
+        status_imovel=status_imovel,
+        id_registro_bruto=id_registro_bruto
+    )
+
+
+def _safe_enum(enum_cls, value):
+    try:
+        return enum_cls(value) if value else None
+    except ValueError:
+        return None
+
+
+def _row_to_analysis(row: LeilaoAnaliseDetalhadaModel) -> DetailedAnalysis:
+    """Mapeia uma linha de leiloes_analise_detalhada para o domínio (já marcada como sincronizada)."""
+    analysis = DetailedAnalysis(
+        site=row.site,
+        id_leilao=row.id_leilao,
+        usuario_id=row.usuario_id,
+        
+        # --- Seção 1 ---
+        proc_num=row.proc_num,
+        proc_executados=row.proc_executados if isinstance(row.proc_executados, list) else [],
+        proc_adv_exec=row.proc_adv_exec,
+        proc_citacao=row.proc_citacao,
+        proc_conjuge=_safe_enum(ConjugeStatus, row.proc_conjuge),
+        proc_credores=row.proc_credores,
+        proc_recursos=row.proc_recursos,
+        proc_recursos_obs=row.proc_recursos_obs,
+        proc_coproprietario_intimado=row.proc_coproprietario_intimado,
+        proc_natureza_execucao=_safe_enum(NaturezaExecucao, row.proc_natureza_execucao),
+        proc_justica_gratuita=row.proc_justica_gratuita,
+        proc_especie_credito=_safe_enum(EspecieCredito, row.proc_especie_credito),
+        proc_debito_atualizado=float(row.proc_debito_atualizado or 0.0),
+        proc_avaliacao_imovel=row.proc_avaliacao_imovel,
+        vlr_avaliacao=float(row.vlr_avaliacao or 0.0),
+
+        # --- Seção 2 ---
+        mat_num=row.mat_num,
+        mat_proprietario=row.mat_proprietario if isinstance(row.mat_proprietario, list) else [],
+        mat_documentos_proprietarios=row.mat_documentos_proprietarios if isinstance(row.mat_documentos_proprietarios, list) else [],
+        mat_penhoras=row.mat_penhoras if isinstance(row.mat_penhoras, list) else [],
+        mat_conjugue=str(row.mat_conjugue) if row.mat_conjugue is not None else "",
+        mat_prop_confere=row.mat_prop_confere,
+        mat_proprietario_pj=row.mat_proprietario_pj,
+        mat_penhora_averbada=row.mat_penhora_averbada,
+        mat_usufruto=row.mat_usufruto,
+        mat_indisp=row.mat_indisp,
+        mat_vagas_mat=str(row.mat_vagas_mat) if row.mat_vagas_mat is not None else "",
+
+        # --- Seção 3 ---
+        edt_objeto=row.edt_objeto,
+        edt_vlr_avaliacao=float(row.edt_vlr_avaliacao or 0.0),
+        edt_percentual_minimo=float(row.edt_percentual_minimo or 0.0),
+        edt_data_avaliacao=row.edt_data_avaliacao,
+        edt_parcelamento=row.edt_parcelamento,
+        edt_iptu_subroga=row.edt_iptu_subroga,
+        edt_condo_claro=row.edt_condo_claro,
+
+        # --- Seção 4 ---
+        edt_posse_status=_safe_enum(OccupationStatus, row.edt_posse_status),
+        #edt_posse_estrategia=row.edt_posse_estrategia,
+
+        # --- Seção 5 ---
+        fin_lance=float(row.fin_lance or 0.0),
+        fin_itbi=float(row.fin_itbi or 0.0),
+        fin_dividas=float(row.fin_dividas or 0.0),
+        recomendacao_ia=row.recomendacao_ia,
+
+        # --- Legado ---
+        analise_ia=row.parecer_juridico,
+        risco_judicial=_safe_enum(RiskLevel, row.risco_judicial) if row.risco_judicial else RiskLevel.BAIXO,
+        valor_venda_estimado=float(row.valor_venda_estimado or 0.0),
+        custo_reforma=float(row.custo_reforma or 0.0),
+        custo_desocupacao=float(row.custo_desocupacao or 0.0),
+        divida_condominio=float(row.divida_condominio or 0.0),
+        divida_iptu=float(row.divida_iptu or 0.0),
+        divida_subroga=row.divida_subroga if row.divida_subroga is not None else True,
+
+        no_bid_reason=_safe_enum(NoBidReason, row.no_bid_reason),
+        no_bid_observation=row.no_bid_observation
+    )
+    # Estado de referência para o autosave gravar só o que mudar daqui em diante
+    analysis.mark_clean()
+    return analysis
+
 
 class PostgresAuctionRepository(AuctionRepository):
     def __init__(self, session: Session):
         self.session = session
 
     # --- MÉTODOS DA FASE 1 (TRIAGEM) ---
-    def get_pending_auctions(self, user_id: str, filters: AuctionFilter) -> List[Auction]:
-        query = self.session.query(LeilaoAnaliticoModel).outerjoin(
-            LeilaoAvaliacaoModel,
-            and_(
-                LeilaoAnaliticoModel.site == LeilaoAvaliacaoModel.site,
-                LeilaoAnaliticoModel.id_leilao == LeilaoAvaliacaoModel.id_leilao
-            )
-        ).filter(LeilaoAvaliacaoModel.id_leilao == None)
+    def ensure_pending_queue(self, user_id: str) -> int:
+        """
+        Inscreve o usuário na fila de triagem (uma única vez) e faz a carga inicial
+        da fila com os leilões que ele ainda não avaliou. Dali em diante a fila é
+        mantida pelos triggers de leiloes_analiticos (migração 001); as leituras só leem.
+        Retorna quantos leilões entraram pela carga inicial (0 se o usuário já estava inscrito).
+        """
+        fila, controle = LeilaoFilaTriagemModel, LeilaoFilaUsuarioModel
+        if self.session.get(controle, user_id) is not None:
+            return 0
 
-        if filters.uf: query = query.filter(LeilaoAnaliticoModel.uf.in_(filters.uf))
-        if filters.cidade: query = query.filter(LeilaoAnaliticoModel.cidade.in_(filters.cidade))
-        if filters.tipo_bem: query = query.filter(LeilaoAnaliticoModel.tipo_bem.in_(filters.tipo_bem))
-        if filters.site: query = query.filter(LeilaoAnaliticoModel.site.in_(filters.site))
-        if filters.status_imovel: query = query.filter(LeilaoAnaliticoModel.status_imovel.in_(filters.status_imovel))
-        
-        query = query.order_by(LeilaoAnaliticoModel.id_registro_bruto.desc())
-        
-        results = query.all()
-        return self._map_to_domain(results)
+        # 1. Inscrição commitada antes da carga: as escritas na base analítica a partir daqui
+        #    já encontram o usuário e entram pelo trigger (sem lock em leiloes_analiticos)
+        try:
+            inscrito = self.session.execute(
+                insert(controle).values(usuario_id=user_id, atualizado_em=func.now())
+                .on_conflict_do_nothing().returning(controle.usuario_id)
+            ).first()
+            self.session.commit()
+        except Exception as e:
+            self.session.rollback()
+            raise e
+        if inscrito is None:
+            # Inscrito por outra sessão ao mesmo tempo
+            return 0
 
-    def save_evaluations(self, evaluations: List[Evaluation]) -> int:
-        count = 0
         try:
-            for ev in evaluations:
-                raw_id = self.session.query(LeilaoAnaliticoModel.id_registro_bruto)\
-                    .filter_by(site=ev.site, id_leilao=ev.id_leilao).scalar()
-                
-                if raw_id is None:
-                    raw_id = self.session.query(LeilaoAnaliticoModel.id_registro_bruto)\
-                        .filter_by(id_leilao=ev.id_leilao).first()
-                    if raw_id: raw_id = raw_id[0]
-                    else: continue
-
-                db_model = LeilaoAvaliacaoModel(
-                    usuario_id=ev.usuario_id,
-                    site=ev.site,
-                    id_leilao=ev.id_leilao,
-                    id_registro_bruto=raw_id,
-                    avaliacao=ev.avaliacao.value,
-                    data_analise=ev.data_analise
+            # 2. Escritas que rodaram o trigger antes da inscrição e ainda não commitaram
+            #    não entram pelo trigger nem seriam vistas pela carga: espera terminarem
+            self._wait_for_open_writes()
+
+            # 3. Carga inicial; ON CONFLICT: o que o trigger já enfileirou fica como está.
+            # Mesmo critério de _dequeue: por (site, id_leilao) ou pelo registro bruto resolvido
+            ja_avaliado = select(LeilaoAvaliacaoModel.id_leilao).where(
+                LeilaoAvaliacaoModel.usuario_id == user_id,
+                or_(
+                    and_(
+                        LeilaoAvaliacaoModel.site == LeilaoAnaliticoModel.site,
+                        LeilaoAvaliacaoModel.id_leilao == LeilaoAnaliticoModel.id_leilao
+                    ),
+                    LeilaoAvaliacaoModel.id_registro_bruto == LeilaoAnaliticoModel.id_registro_bruto
                 )
-                self.session.merge(db_model)
-                count += 1
+            ).exists()
+            result = self.session.execute(
+                insert(fila).from_select(
+                    ["usuario_id", "id_registro_bruto", "site", "id_leilao", "uf", "cidade",
+                     "tipo_bem", "status_imovel", "valor_1_praca"],
+                    select(
+                        literal(user_id), LeilaoAnaliticoModel.id_registro_bruto, LeilaoAnaliticoModel.site,
+                        LeilaoAnaliticoModel.id_leilao, LeilaoAnaliticoModel.uf, LeilaoAnaliticoModel.cidade,
+                        LeilaoAnaliticoModel.tipo_bem, LeilaoAnaliticoModel.status_imovel,
+                        LeilaoAnaliticoModel.valor_1_praca
+                    ).where(~ja_avaliado)
+                ).on_conflict_do_nothing()
+            )
             self.session.commit()
-            return count
+            return result.rowcount
         except Exception as e:
+            # Desfaz a inscrição: a próxima chamada refaz a carga inteira
             self.session.rollback()
+            self.session.execute(delete(fila).where(fila.usuario_id == user_id))
+            self.session.execute(delete(controle).where(controle.usuario_id == user_id))
+            self.session.commit()
             raise e
 
-    def get_filter_options(self) -> Dict[str, List[str]]:
+    def _wait_for_open_writes(self, timeout: float = QUEUE_ENROLL_WAIT_SECONDS) -> None:
         """
-        Retorna opções de filtro apenas para leilões pendentes de triagem.
-        Filtra leilões que NÃO possuem avaliação na tabela leiloes_avaliacoes.
+        Espera terminarem as transações com escrita abertas neste momento (xip do snapshot),
+        sem bloquear as novas. RuntimeError se alguma passar de `timeout` segundos.
         """
-        # Subquery para identificar leilões já avaliados
-        subquery = self.session.query(
-            LeilaoAvaliacaoModel.site,
-            LeilaoAvaliacaoModel.id_leilao
-        ).subquery()
-        
-        # Query base com outerjoin para filtrar apenas pendentes
-        base_query = self.session.query(LeilaoAnaliticoModel).outerjoin(
-            subquery,
-            and_(
-                LeilaoAnaliticoModel.site == subquery.c.site,
-                LeilaoAnaliticoModel.id_leilao == subquery.c.id_leilao
+        xids = [str(xid) for xid in self.session.execute(
+            text("SELECT pg_snapshot_xip(pg_current_snapshot())")
+        ).scalars()]
+        deadline = time.monotonic() + timeout
+        while xids:
+            xids = list(self.session.execute(
+                text("SELECT x::text FROM unnest(CAST(:xids AS xid8[])) AS x WHERE pg_xact_status(x) = 'in progress'"),
+                {"xids": xids}
+            ).scalars())
+            if not xids:
+                return
+            if time.monotonic() > deadline:
+                raise RuntimeError("Inscrição na fila de triagem: carga da base analítica em andamento, tente novamente.")
+            time.sleep(0.05)
+
+    def _dequeue(self, user_id: str, keys: List[Tuple[str, str]], raw_ids: List[int]) -> None:
+        """Remove da fila do usuário os leilões que acabaram de ser avaliados (sem commit)."""
+        if not keys and not raw_ids:
+            return
+        fila = LeilaoFilaTriagemModel
+        self.session.execute(
+            delete(fila).where(
+                fila.usuario_id == user_id,
+                or_(
+                    tuple_(fila.site, fila.id_leilao).in_(keys),
+                    fila.id_registro_bruto.in_(raw_ids)
+                )
             )
-        ).filter(subquery.c.id_leilao == None)
-        
+        )
+
+    def _pending_select(self, user_id: str, filters: AuctionFilter, *columns):
+        """Select (Core) da fila de triagem do usuário (read model) + filtros da sidebar."""
+        fila = LeilaoFilaTriagemModel
+        stmt = select(*columns).select_from(fila).where(fila.usuario_id == user_id)
+
+        if filters.uf: stmt = stmt.where(fila.uf.in_(filters.uf))
+        if filters.cidade: stmt = stmt.where(fila.cidade.in_(filters.cidade))
+        if filters.tipo_bem: stmt = stmt.where(fila.tipo_bem.in_(filters.tipo_bem))
+        if filters.site: stmt = stmt.where(fila.site.in_(filters.site))
+        if filters.status_imovel: stmt = stmt.where(fila.status_imovel.in_(filters.status_imovel))
+        return stmt
+
+    def _pending_page_select(self, user_id: str, filters: AuctionFilter, cursor: Optional[int], page_size: int):
+        """SELECT de uma página da fila (AUCTION_COLUMNS), com uma linha a mais para detectar a próxima página."""
+        fila = LeilaoFilaTriagemModel
+
+        stmt = self._pending_select(user_id, filters, *AUCTION_COLUMNS).join(
+            LeilaoAnaliticoModel, LeilaoAnaliticoModel.id_registro_bruto == fila.id_registro_bruto
+        )
+
+        # Keyset: continua a partir do último id_registro_bruto entregue (ordem decrescente)
+        if cursor is not None:
+            stmt = stmt.where(fila.id_registro_bruto < cursor)
+
+        # Busca uma linha a mais apenas para saber se existe próxima página
+        return stmt.order_by(fila.id_registro_bruto.desc()).limit(page_size + 1)
+
+    def get_pending_auctions(self, user_id: str, filters: AuctionFilter,
+                             cursor: Optional[int] = None, page_size: int = 15) -> AuctionPage:
+        rows = self.session.execute(self._pending_page_select(user_id, filters, cursor, page_size)).all()
+
+        items = [_row_to_auction(*row) for row in rows[:page_size]]
+        next_cursor = items[-1].id_registro_bruto if len(rows) > page_size and items else None
+        return AuctionPage(items=items, next_cursor=next_cursor, page_size=page_size)
+
+    def get_pending_auctions_frame(self, user_id: str, filters: AuctionFilter,
+                                   cursor: Optional[int] = None, page_size: int = 15) -> AuctionFramePage:
+        """
+        Mesma query de get_pending_auctions, lida em lotes do cursor direto para Arrow
+        (sem Row -> Auction -> dict por linha) e convertida para DataFrame uma única vez.
+        """
+        stmt = self._pending_page_select(user_id, filters, cursor, page_size)
+        result = self.session.execute(stmt.execution_options(yield_per=FRAME_BATCH_SIZE))
+        frame = frame_from_batches(AUCTION_FRAME_SCHEMA, result.partitions(), AUCTION_ZERO_FILLED)
+
+        has_next = len(frame) > page_size
+        frame = frame.iloc[:page_size]
+        next_cursor = int(frame["id_registro_bruto"].iloc[-1]) if has_next and len(frame) else None
+        return AuctionFramePage(frame=frame, next_cursor=next_cursor, page_size=page_size)
+
+    def count_pending_auctions(self, user_id: str, filters: AuctionFilter) -> int:
+        return self.session.execute(self._pending_select(user_id, filters, func.count())).scalar() or 0
+
+    def _resolve_raw_ids(self, keys: List[Tuple[str, str]]) -> Dict[Tuple[str, str], int]:
+        """
+        Resolve o id_registro_bruto de vários (site, id_leilao) em um único SELECT.
+        Mantém o fallback legado: se não houver match exato por site, usa o primeiro
+        registro com o mesmo id_leilao. Pares não encontrados ficam fora do dicionário.
+        """
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return {}
+
+        lote = values(
+            column("site", String), column("id_leilao", String), name="lote"
+        ).data(keys)
+
+        exato = select(LeilaoAnaliticoModel.id_registro_bruto).where(
+            LeilaoAnaliticoModel.site == lote.c.site,
+            LeilaoAnaliticoModel.id_leilao == lote.c.id_leilao
+        ).limit(1).scalar_subquery()
+
+        por_id_leilao = select(LeilaoAnaliticoModel.id_registro_bruto).where(
+            LeilaoAnaliticoModel.id_leilao == lote.c.id_leilao
+        ).limit(1).scalar_subquery()
+
+        stmt = select(lote.c.site, lote.c.id_leilao, func.coalesce(exato, por_id_leilao))
         return {
-            "ufs": [r[0] for r in base_query.with_entities(distinct(LeilaoAnaliticoModel.uf)).order_by(LeilaoAnaliticoModel.uf).all() if r[0]],
-            "cidades": [r[0] for r in base_query.with_entities(distinct(LeilaoAnaliticoModel.cidade)).order_by(LeilaoAnaliticoModel.cidade).all() if r[0]],
-            "tipos": [r[0] for r in base_query.with_entities(distinct(LeilaoAnaliticoModel.tipo_bem)).order_by(LeilaoAnaliticoModel.tipo_bem).all() if r[0]],
-            "sites": [r[0] for r in base_query.with_entities(distinct(LeilaoAnaliticoModel.site)).order_by(LeilaoAnaliticoModel.site).all() if r[0]],
-            "status_imovel": [r[0] for r in base_query.with_entities(distinct(LeilaoAnaliticoModel.status_imovel)).order_by(LeilaoAnaliticoModel.status_imovel).all() if r[0]],
+            (site, id_leilao): raw_id
+            for site, id_leilao, raw_id in self.session.execute(stmt)
+            if raw_id is not None
         }
 
-    def get_stats(self, user_id: str) -> Dict[str, int]:
+    def save_evaluations(self, evaluations: List[Evaluation]) -> BatchWriteResult:
+        """
+        Grava o lote inteiro com custo constante de round trips (não depende do tamanho do lote),
+        tudo em uma transação:
+        1. SELECT que resolve os id_registro_bruto;
+        2. SELECT ... FOR UPDATE dos status atuais (_current_statuses), para contar só as mudanças;
+        3. INSERT multi-linha com ON CONFLICT DO UPDATE das avaliações;
+        4. upsert multi-linha no rollup de produtividade (_record_productivity), se algum status mudou;
+        5. DELETE da fila de triagem por usuário do lote (_dequeue), em geral um só;
+        6. COMMIT.
+        """
+        raw_ids = self._resolve_raw_ids([(ev.site, ev.id_leilao) for ev in evaluations])
+
+        # Deduplica pela PK (a última decisão vence): o Postgres não permite
+        # que o mesmo INSERT ... ON CONFLICT afete a mesma linha duas vezes.
+        rows, skipped = {}, []
+        now = datetime.now()
+        for ev in evaluations:
+            raw_id = raw_ids.get((ev.site, ev.id_leilao))
+            if raw_id is None:
+                skipped.append((ev.site, ev.id_leilao))
+                continue
+            rows[(ev.usuario_id, ev.site, ev.id_leilao)] = {
+                "usuario_id": ev.usuario_id,
+                "site": ev.site,
+                "id_leilao": ev.id_leilao,
+                "id_registro_bruto": raw_id,
+                "avaliacao": ev.avaliacao.value,
+                "data_analise": ev.data_analise,
+                "updated_at": now
+            }
+
+        if not rows:
+            return BatchWriteResult(saved=0, skipped=skipped)
+
+        stmt = insert(LeilaoAvaliacaoModel).values(list(rows.values()))
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["usuario_id", "site", "id_leilao"],
+            set_={
+                "id_registro_bruto": stmt.excluded.id_registro_bruto,
+                "avaliacao": stmt.excluded.avaliacao,
+                "data_analise": stmt.excluded.data_analise,
+                "updated_at": stmt.excluded.updated_at
+            }
+        )
+
+        try:
+            previous = self._current_statuses(list(rows))
+            self.session.execute(stmt)
+            self._record_productivity([
+                (row["usuario_id"], row["data_analise"].date(), row["avaliacao"])
+                for key, row in rows.items() if previous.get(key) != row["avaliacao"]
+            ])
+            for user_id in {row["usuario_id"] for row in rows.values()}:
+                user_rows = [row for row in rows.values() if row["usuario_id"] == user_id]
+                self._dequeue(
+                    user_id,
+                    [(row["site"], row["id_leilao"]) for row in user_rows],
+                    [row["id_registro_bruto"] for row in user_rows]
+                )
+            self.session.commit()
+            return BatchWriteResult(saved=len(rows), skipped=skipped)
+        except Exception as e:
+            self.session.rollback()
+            raise e
+
+    def get_filter_facets(self, user_id: str, filters: AuctionFilter) -> FilterFacets:
+        """
+        Retorna todas as facetas da fila de triagem (uf, cidade, tipo_bem, site, status_imovel)
+        com contagens em UMA única query (GROUPING SETS).
+        Cada faceta é contada aplicando os filtros das demais facetas (mas não o dela própria),
+        de modo que as cidades acompanham a UF escolhida sem esconder as UFs alternativas.
+        """
+        columns = {name: getattr(LeilaoFilaTriagemModel, name) for name in FilterFacets.FIELDS}
+        conditions = {
+            name: col.in_(getattr(filters, name))
+            for name, col in columns.items() if getattr(filters, name)
+        }
+
+        def all_except(facet: Optional[str]):
+            conds = [cond for name, cond in conditions.items() if name != facet]
+            return and_(true(), *conds)
+
+        stmt = self._pending_select(
+            user_id,
+            AuctionFilter(),
+            *columns.values(),
+            *[func.grouping(col) for col in columns.values()],
+            *[func.count().filter(all_except(name)) for name in columns],
+            func.count().filter(all_except(None)),
+            func.sum(LeilaoFilaTriagemModel.valor_1_praca).filter(all_except(None))
+        )
+        # Só interessam linhas que satisfazem a seleção de pelo menos uma faceta
+        if conditions:
+            stmt = stmt.where(or_(*[all_except(name) for name in columns]))
+
+        stmt = stmt.group_by(func.grouping_sets(
+            *[tuple_(col) for col in columns.values()], tuple_()
+        ))
+
+        n = len(columns)
+        facets = FilterFacets()
+        for row in self.session.execute(stmt):
+            values, grouped, counts = row[:n], row[n:2 * n], row[2 * n:3 * n]
+            count_all, volume = row[3 * n], row[3 * n + 1]
+            if all(grouped):
+                # Grouping set vazio: totais da seleção completa
+                facets.total = count_all or 0
+                facets.volume_1_praca = float(volume or 0.0)
+                continue
+            i = grouped.index(0)
+            if values[i] and counts[i]:
+                getattr(facets, FilterFacets.FIELDS[i]).append(
+                    FacetValue(value=values[i], count=counts[i], count_filtered=count_all or 0)
+                )
+
+        for name in FilterFacets.FIELDS:
+            getattr(facets, name).sort(key=lambda f: f.value)
+        return facets
+
+    def search_auctions(self, user_id: str, query: str, scope: SearchScope = SearchScope.TODOS,
+                        filters: Optional[AuctionFilter] = None, statuses: Optional[List[str]] = None,
+                        offset: int = 0, page_size: int = 20, min_valor: Optional[float] = None,
+                        max_valor: Optional[float] = None,
+                        no_bid_reasons: Optional[List[str]] = None) -> AuctionSearchPage:
+        """
+        Busca por título ou ID em UMA query, ordenada por relevância:
+        - full-text (pt_unaccent, prefixos): "apartamento pinheiros", "apto pinhei";
+        - trigramas do título (word_similarity): erros de digitação ("pinheros");
+        - ID exato (índice btree) ou trecho do ID (trigramas).
+        O total vem na mesma query (count(*) OVER ()).
+        """
+        query = (query or "").strip()
+        tsquery = _prefix_tsquery(query)
+        if not tsquery:
+            return AuctionSearchPage(offset=offset, page_size=page_size)
+
+        leilao = LeilaoAnaliticoModel
+        ts_query = func.to_tsquery(SEARCH_TS_CONFIG, tsquery)
+        matches = [SEARCH_TSVECTOR.op("@@")(ts_query), leilao.id_leilao == query]
+        rank = func.ts_rank_cd(SEARCH_TSVECTOR, ts_query)
+        if len(query) >= SEARCH_MIN_TRIGRAM_CHARS:
+            normalized = func.public.normaliza_busca(query)
+            matches += [SEARCH_TITLE_NORMALIZED.op("%>")(normalized), leilao.id_leilao.like(_like_pattern(query))]
+            rank = rank + func.word_similarity(normalized, SEARCH_TITLE_NORMALIZED)
+        rank = rank + case((leilao.id_leilao == query, SEARCH_EXACT_ID_BOOST), else_=0.0)
+
+        extra = (func.count().over().label("total"),)
+        if scope == SearchScope.CARTEIRA:
+            stmt = self._portfolio_select(user_id, statuses, *extra).where(
+                *self._portfolio_filters(user_id, min_valor, max_valor, no_bid_reasons)
+            )
+        else:
+            stmt = select(*AUCTION_COLUMNS, *extra)
+            if scope == SearchScope.TRIAGEM:
+                fila = LeilaoFilaTriagemModel
+                stmt = stmt.join(fila, and_(
+                    fila.usuario_id == user_id, fila.id_registro_bruto == leilao.id_registro_bruto
+                ))
+
+        filters = filters or AuctionFilter()
+        for name in ("uf", "cidade", "tipo_bem", "site", "tipo_leilao", "status_imovel"):
+            if getattr(filters, name):
+                stmt = stmt.where(getattr(leilao, name).in_(getattr(filters, name)))
+
+        stmt = stmt.where(or_(*matches)).order_by(rank.desc(), leilao.id_registro_bruto.desc())
+        rows = self.session.execute(stmt.offset(offset).limit(page_size)).all()
+        if not rows:
+            # Página além do fim: o total precisa de uma contagem à parte
+            total = self.session.execute(select(func.count()).select_from(stmt.order_by(None).subquery())).scalar() if offset else 0
+            return AuctionSearchPage(total=total or 0, offset=offset, page_size=page_size)
+
+        if scope == SearchScope.CARTEIRA:
+            items = [self._row_to_portfolio_auction(row) for row in rows]
+        else:
+            items = [_row_to_auction(*row[:len(AUCTION_COLUMNS)]) for row in rows]
+        return AuctionSearchPage(items=items, total=rows[0].total, offset=offset, page_size=page_size)
+
+    def _current_statuses(self, keys: List[Tuple[str, str, str]]) -> Dict[Tuple[str, str, str], str]:
+        """
+        Status atual de cada (usuario_id, site, id_leilao) já avaliado, travando as linhas até o
+        fim da transação (sem commit): a escrita seguinte compara com o valor que vai sobrescrever.
+        """
+        if not keys:
+            return {}
+        a = LeilaoAvaliacaoModel
+        rows = self.session.execute(
+            select(a.usuario_id, a.site, a.id_leilao, a.avaliacao)
+            .where(tuple_(a.usuario_id, a.site, a.id_leilao).in_(keys))
+            .with_for_update()
+        ).all()
+        return {(row.usuario_id, row.site, row.id_leilao): row.avaliacao for row in rows}
+
+    def _record_productivity(self, decisions: List[Tuple[str, date, str]]) -> None:
+        """
+        Soma decisões (usuario_id, dia, avaliacao) ao rollup diário de produtividade.
+        O rollup conta eventos de decisão: cada mudança de status conta uma vez, no dia em que
+        aconteceu; regravar o mesmo status não conta (os chamadores filtram com _current_statuses).
+        Deve ser chamado dentro da transação da escrita (sem commit).
+        """
+        if not decisions:
+            return
+        rows = [
+            {"usuario_id": usuario_id, "dia": dia, "avaliacao": avaliacao, "total": total}
+            for (usuario_id, dia, avaliacao), total in Counter(decisions).items()
+        ]
+        stmt = insert(ProdutividadeDiariaModel).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["usuario_id", "dia", "avaliacao"],
+            set_={"total": ProdutividadeDiariaModel.total + stmt.excluded.total}
+        )
+        self.session.execute(stmt)
+
+    def get_stats(self, user_id: str, start_date: Optional[date] = None,
+                  end_date: Optional[date] = None) -> Dict[str, int]:
+        """
+        Totais de decisões do usuário no período (padrão: hoje), lidos do rollup diário.
+        Retorna uma chave por status em minúsculas (ex: 'analisar', 'descartar', 'no_bid')
+        e 'total_processado' (decisões da triagem: analisar + descartar).
+        """
+        start_date = start_date or date.today()
+        end_date = end_date or start_date
+        stats = {'analisar': 0, 'descartar': 0, 'total_processado': 0}
         try:
             results = self.session.query(
-                LeilaoAvaliacaoModel.avaliacao,
-                func.count(LeilaoAvaliacaoModel.id_leilao)
-            ).group_by(LeilaoAvaliacaoModel.avaliacao).all()
-            
-            stats = {'analisar': 0, 'descartar': 0, 'total_processado': 0}
-            for status, count in results:
-                st_norm = status.capitalize() if status else ""
-                if st_norm == 'Analisar': stats['analisar'] = count
-                elif st_norm == 'Descartar': stats['descartar'] = count
-            stats['total_processado'] = stats['analisar'] + stats['descartar']
-            return stats
+                ProdutividadeDiariaModel.avaliacao,
+                func.sum(ProdutividadeDiariaModel.total)
+            ).filter(
+                ProdutividadeDiariaModel.usuario_id == user_id,
+                ProdutividadeDiariaModel.dia.between(start_date, end_date)
+            ).group_by(ProdutividadeDiariaModel.avaliacao).all()
         except Exception:
-            return {'analisar': 0, 'descartar': 0, 'total_processado': 0}
+            self.session.rollback()
+            return stats
+
+        for status, total in results:
+            stats[status.lower()] = int(total or 0)
+        stats['total_processado'] = stats['analisar'] + stats['descartar']
+        return stats
 
     # --- MÉTODOS DA FASE 2 (CARTEIRA / ANÁLISE) ---
 
-    def get_portfolio_auctions(self, user_id: str) -> List[Auction]:
-        results = self.session.query(
-            LeilaoAnaliticoModel,
+    def _portfolio_select(self, user_id: str, statuses: Optional[List[str]] = None, *extra_columns):
+        """Select (Core) da carteira do usuário: colunas do leilão + status atual + motivo do No Bid."""
+        statuses = [st for st in statuses if st in PORTFOLIO_STATUSES] if statuses else PORTFOLIO_STATUSES
+        return select(
+            *AUCTION_COLUMNS,
             LeilaoAvaliacaoModel.avaliacao,
-            LeilaoAnaliseDetalhadaModel.no_bid_reason
+            LeilaoAnaliseDetalhadaModel.no_bid_reason,
+            *extra_columns
         ).join(
             LeilaoAvaliacaoModel,
             and_(
@@ -134,45 +663,172 @@ class PostgresAuctionRepository(AuctionRepository):
                 # Garante que estamos pegando a análise do usuário correto
                 LeilaoAvaliacaoModel.usuario_id == LeilaoAnaliseDetalhadaModel.usuario_id
             )
-        ).filter(
-            func.upper(LeilaoAvaliacaoModel.avaliacao).in_([
-                "ANALISAR", 
-                "PARTICIPAR", 
-                "NO_BID",
-                "OUTBID"
-            ])
-        ).all()
-        
-        portfolio_items = []
-        for model, status_text, no_bid_reason in results:
-            auction = Auction(
-                site=model.site,
-                id_leilao=model.id_leilao,
-                titulo=model.titulo,
-                uf=model.uf,
-                cidade=model.cidade,
-                tipo_leilao=model.tipo_leilao,
-                tipo_bem=model.tipo_bem,
-                valor_1_praca=float(model.valor_1_praca) if model.valor_1_praca else 0.0,
-                valor_2_praca=float(model.valor_2_praca) if model.valor_2_praca else 0.0,
-                link_detalhe=model.link_detalhe,
-                imagem_capa=model.imagem_capa,
-                data_1_praca=model.data_1_praca,
-                data_2_praca=model.data_2_praca,
-                status_carteira=status_text.upper() if status_text else "ANALISAR",
-                no_bid_reason=no_bid_reason
-            )
-            portfolio_items.append(auction)
-            
-        return portfolio_items
+        ).where(
+            # Status normalizados (migração 003): usa o índice parcial ix_avaliacoes_carteira
+            LeilaoAvaliacaoModel.usuario_id == user_id,
+            LeilaoAvaliacaoModel.avaliacao.in_(statuses)
+        )
 
-    def save_detailed_analysis(self, analysis: DetailedAnalysis):
+    @staticmethod
+    def _row_to_portfolio_auction(row) -> Auction:
+        return _row_to_auction(
+            *row[:len(AUCTION_COLUMNS)],
+            status_carteira=row[len(AUCTION_COLUMNS)] or EvaluationStatus.ANALISAR.value,
+            no_bid_reason=row[len(AUCTION_COLUMNS) + 1]
+        )
+
+    def _portfolio_keys(self, user_id: str, query: PortfolioQuery, *columns):
         """
-        Executa o UPSERT (Inserir ou Atualizar) dos dados da auditoria detalhada.
-        Mapeia todos os campos do objeto de domínio para as colunas do banco.
+        Select das chaves da carteira com os filtros de `query`: só avaliações + colunas do
+        índice de cobertura de leiloes_analiticos (sem ler as colunas largas do leilão).
         """
-        # 1. Construção do dicionário de dados (Mapeamento Domain -> DB)
-        data = {
+        leilao, avaliacao = LeilaoAnaliticoModel, LeilaoAvaliacaoModel
+        statuses = [st for st in query.statuses if st in PORTFOLIO_STATUSES] if query.statuses else PORTFOLIO_STATUSES
+        return select(*columns).select_from(avaliacao).join(
+            leilao, and_(leilao.site == avaliacao.site, leilao.id_leilao == avaliacao.id_leilao)
+        ).where(
+            avaliacao.usuario_id == user_id,
+            avaliacao.avaliacao.in_(statuses),
+            *self._portfolio_filters(user_id, query.min_valor, query.max_valor, query.no_bid_reasons)
+        )
+
+    @staticmethod
+    def _portfolio_filters(user_id: str, min_valor: Optional[float], max_valor: Optional[float],
+                           no_bid_reasons: Optional[List[str]]) -> list:
+        """Predicados de valor (2ª praça) e motivo do No Bid da carteira (listagem e busca)."""
+        leilao, avaliacao, analise = LeilaoAnaliticoModel, LeilaoAvaliacaoModel, LeilaoAnaliseDetalhadaModel
+        predicates = []
+        if min_valor is not None:
+            predicates.append(leilao.valor_2_praca >= min_valor)
+        if max_valor is not None:
+            predicates.append(leilao.valor_2_praca <= max_valor)
+        if no_bid_reasons:
+            # Índice parcial ix_analise_detalhada_no_bid_reason
+            predicates.append(select(literal(1)).where(
+                analise.usuario_id == user_id,
+                analise.site == avaliacao.site,
+                analise.id_leilao == avaliacao.id_leilao,
+                analise.no_bid_reason.in_(no_bid_reasons)
+            ).correlate_except(analise).exists())
+        return predicates
+
+    def get_portfolio_page(self, user_id: str, query: PortfolioQuery) -> PortfolioPage:
+        """
+        Página da carteira em duas etapas na mesma query (deferred join):
+        1. chaves (id_registro_bruto, status, chave de ordenação) filtradas, ordenadas e
+           limitadas a page_size + 1, a partir do cursor (keyset, sem OFFSET);
+        2. colunas completas e motivo do No Bid apenas para essas chaves.
+        """
+        leilao = LeilaoAnaliticoModel
+        sort_key, descending = PORTFOLIO_SORT_KEYS[PortfolioSort(query.sort)]
+
+        keys = self._portfolio_keys(
+            user_id, query, leilao.id_registro_bruto, LeilaoAvaliacaoModel.avaliacao, sort_key.label("sort_key")
+        )
+        if query.cursor is not None:
+            position = tuple_(sort_key, leilao.id_registro_bruto)
+            after = tuple_(*(literal(value) for value in query.cursor))
+            keys = keys.where(position < after if descending else position > after)
+        order = (sort_key.desc(), leilao.id_registro_bruto.desc()) if descending else (sort_key, leilao.id_registro_bruto)
+        keys = keys.order_by(*order).limit(query.page_size + 1).subquery()
+
+        analise = LeilaoAnaliseDetalhadaModel
+        stmt = select(*AUCTION_COLUMNS, keys.c.avaliacao, analise.no_bid_reason, keys.c.sort_key).join(
+            keys, keys.c.id_registro_bruto == leilao.id_registro_bruto
+        ).outerjoin(analise, and_(
+            analise.site == leilao.site,
+            analise.id_leilao == leilao.id_leilao,
+            analise.usuario_id == user_id
+        ))
+        if descending:
+            stmt = stmt.order_by(keys.c.sort_key.desc(), keys.c.id_registro_bruto.desc())
+        else:
+            stmt = stmt.order_by(keys.c.sort_key, keys.c.id_registro_bruto)
+        rows = self.session.execute(stmt).all()
+
+        page = rows[:query.page_size]
+        next_cursor = (page[-1].sort_key, page[-1].id_registro_bruto) if len(rows) > query.page_size and page else None
+        return PortfolioPage(
+            items=[self._row_to_portfolio_auction(row) for row in page],
+            next_cursor=next_cursor,
+            page_size=query.page_size
+        )
+
+    def get_portfolio_summary(self, user_id: str, query: Optional[PortfolioQuery] = None) -> PortfolioSummary:
+        """Badges das abas em um único GROUP BY avaliacao (index-only nos dois índices da junção)."""
+        stmt = self._portfolio_keys(
+            user_id, query or PortfolioQuery(),
+            LeilaoAvaliacaoModel.avaliacao, func.count(), func.max(LeilaoAnaliticoModel.valor_2_praca)
+        ).group_by(LeilaoAvaliacaoModel.avaliacao)
+        rows = self.session.execute(stmt).all()
+        return PortfolioSummary(
+            counts={status: total for status, total, _ in rows},
+            max_valor_2_praca=max((valor or 0.0 for _, _, valor in rows), default=0.0)
+        )
+
+    def get_finalizados_indicators(self, user_id: str) -> FinalizadosIndicators:
+        """
+        Indicadores da aba Finalizados em UMA query (GROUPING SETS), sem trazer os leilões:
+        - (avaliacao):                 totais por status e capital evitado;
+        - (avaliacao, no_bid_reason):  motivos do No Bid;
+        - (avaliacao, uf):             distribuição geográfica;
+        - (avaliacao, mes):            série mensal pela data da última mudança de status.
+        """
+        avaliacao, leilao, analise = LeilaoAvaliacaoModel, LeilaoAnaliticoModel, LeilaoAnaliseDetalhadaModel
+        mes = cast(func.date_trunc('month', avaliacao.updated_at), Date)
+
+        stmt = (
+            select(
+                avaliacao.avaliacao, analise.no_bid_reason, leilao.uf, mes,
+                func.grouping(analise.no_bid_reason), func.grouping(leilao.uf), func.grouping(mes),
+                func.count(),
+                func.sum(leilao.valor_2_praca)
+            )
+            .select_from(avaliacao)
+            .join(leilao, and_(leilao.site == avaliacao.site, leilao.id_leilao == avaliacao.id_leilao))
+            .outerjoin(analise, and_(
+                analise.site == avaliacao.site,
+                analise.id_leilao == avaliacao.id_leilao,
+                analise.usuario_id == avaliacao.usuario_id
+            ))
+            .where(
+                # Índice parcial ix_avaliacoes_carteira
+                avaliacao.usuario_id == user_id,
+                avaliacao.avaliacao.in_([EvaluationStatus.NO_BID.value, EvaluationStatus.OUTBID.value])
+            )
+            .group_by(func.grouping_sets(
+                tuple_(avaliacao.avaliacao),
+                tuple_(avaliacao.avaliacao, analise.no_bid_reason),
+                tuple_(avaliacao.avaliacao, leilao.uf),
+                tuple_(avaliacao.avaliacao, mes),
+            ))
+        )
+
+        indicators = FinalizadosIndicators()
+        for status, reason, uf, mes_val, g_reason, g_uf, g_mes, total, valor in self.session.execute(stmt):
+            if not g_reason:
+                if status == EvaluationStatus.NO_BID.value:
+                    indicators.by_reason.append(FinalizadosReasonCount(reason=reason, total=total, valor_2_praca=float(valor or 0.0)))
+            elif not g_uf:
+                indicators.by_uf.append(FinalizadosUfBucket(uf=uf, status=status, total=total))
+            elif not g_mes:
+                if mes_val is not None:
+                    indicators.monthly.append(FinalizadosMonthlyBucket(mes=mes_val, status=status, total=total))
+            elif status == EvaluationStatus.NO_BID.value:
+                indicators.no_bid = total
+                indicators.capital_evitado = float(valor or 0.0)
+            else:
+                indicators.outbid = total
+
+        indicators.by_reason.sort(key=lambda r: (-r.total, r.reason or ""))
+        indicators.by_uf.sort(key=lambda b: (b.uf or "", b.status))
+        indicators.monthly.sort(key=lambda b: (b.mes, b.status))
+        return indicators
+
+    @staticmethod
+    def _analysis_to_row(analysis: DetailedAnalysis) -> dict:
+        """Mapeia todos os campos do objeto de domínio para as colunas do banco."""
+        return {
             # --- Chaves Primárias ---
             "site": analysis.site,
             "id_leilao": analysis.id_leilao,
@@ -241,90 +897,137 @@ class PostgresAuctionRepository(AuctionRepository):
             "no_bid_observation": analysis.no_bid_observation
         }
 
-        stmt = insert(LeilaoAnaliseDetalhadaModel).values(**data)
-        
-        # Faz o update automático em caso de colisão de chaves
-        stmt = stmt.on_conflict_do_update(
-            index_elements=["site", "id_leilao", "usuario_id"],
-            set_={k: v for k, v in data.items() if k not in ["site", "id_leilao", "usuario_id"]}
-        )
+    def save_detailed_analysis(self, analysis: DetailedAnalysis):
+        """
+        Persiste a auditoria detalhada gravando apenas o que mudou desde o último load/save:
+        - nada alterado: nenhum round trip;
+        - análise já sincronizada: UPDATE somente das colunas alteradas;
+        - análise nova (ou linha inexistente): UPSERT completo.
+        """
+        dirty = analysis.dirty_fields()
+        if not dirty:
+            return
+
+        # 1. Construção do dicionário de dados (Mapeamento Domain -> DB)
+        data = self._analysis_to_row(analysis)
+        changed = {ANALYSIS_FIELD_TO_COLUMN.get(name, name) for name in dirty} & data.keys()
+        changed -= {"site", "id_leilao", "usuario_id", "data_atualizacao"}
 
         try:
+            if analysis.is_persisted:
+                if not changed:
+                    # Só mudaram campos que não são persistidos
+                    analysis.mark_clean()
+                    return
+                result = self.session.execute(
+                    update(LeilaoAnaliseDetalhadaModel)
+                    .where(
+                        LeilaoAnaliseDetalhadaModel.site == analysis.site,
+                        LeilaoAnaliseDetalhadaModel.id_leilao == analysis.id_leilao,
+                        LeilaoAnaliseDetalhadaModel.usuario_id == analysis.usuario_id
+                    )
+                    .values({col: data[col] for col in changed | {"data_atualizacao"}})
+                )
+                if result.rowcount:
+                    self.session.commit()
+                    analysis.mark_clean()
+                    return
+
+            # Faz o update automático em caso de colisão de chaves
+            stmt = insert(LeilaoAnaliseDetalhadaModel).values(**data)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["site", "id_leilao", "usuario_id"],
+                set_={k: v for k, v in data.items() if k not in ["site", "id_leilao", "usuario_id"]}
+            )
             self.session.execute(stmt)
             self.session.commit()
+            analysis.mark_clean()
         except Exception as e:
             self.session.rollback()
             raise e
 
-    def _map_to_domain(self, results) -> List[Auction]:
-        return [
-            Auction(
-                site=r.site,
-                id_leilao=r.id_leilao,
-                titulo=r.titulo,
-                uf=r.uf,
-                cidade=r.cidade,
-                tipo_leilao=r.tipo_leilao,
-                tipo_bem=r.tipo_bem,
-                valor_1_praca=float(r.valor_1_praca) if r.valor_1_praca else 0.0,
-                valor_2_praca=float(r.valor_2_praca) if r.valor_2_praca else 0.0,
-                link_detalhe=r.link_detalhe,
-                imagem_capa=r.imagem_capa,
-                data_1_praca=r.data_1_praca,
-                data_2_praca=r.data_2_praca,
-                status_imovel=r.status_imovel
-            )
-            for r in results
-        ]
-    
-    def update_status(self, user_id: str, site: str, id_leilao: str, new_status: EvaluationStatus) -> None:
+    def transition_statuses(self, user_id: str, transitions: List[StatusTransition]) -> BatchWriteResult:
         """
-        Atualiza o status de avaliação do leilão para um utilizador.
-        Implementa UPSERT (ON CONFLICT DO UPDATE) sincronizado com o DDL da tabela leiloes_avaliacoes.
+        Aplica o lote de transições com um único INSERT ... SELECT ... ON CONFLICT:
+        o SELECT resolve o id_registro_bruto (NOT NULL no DDL) juntando o lote com a base
+        analítica e o RETURNING informa quais pares foram gravados.
+        Pares sem correspondência em leiloes_analiticos voltam em `skipped`.
         """
-        # 1. Recuperar o id_registro_bruto obrigatório (NOT NULL no DDL)
-        analitico = self.session.query(LeilaoAnaliticoModel.id_registro_bruto).filter_by(
-            site=site, 
-            id_leilao=id_leilao
-        ).first()
-        
-        if not analitico:
-            raise RuntimeError(f"Falha de integridade: Leilão {id_leilao} no site {site} não encontrado na base analítica.")
-            
-        id_registro_bruto = analitico.id_registro_bruto
-
-        # 2. Definir os valores alinhados com as colunas reais (avaliacao, data_analise)
-        valores = {
-            "id_registro_bruto": id_registro_bruto,
-            "site": site,
-            "id_leilao": id_leilao,
-            "usuario_id": user_id,
-            "avaliacao": new_status.value, # Coluna correta conforme DDL
-            "data_analise": datetime.now(), 
-            "updated_at": datetime.now()
-        }
+        # Deduplica por leilão (a última transição vence): o ON CONFLICT não pode
+        # afetar a mesma linha duas vezes no mesmo comando.
+        lote_rows = {(t.site, t.id_leilao): t.new_status.value for t in transitions}
+        if not lote_rows:
+            return BatchWriteResult()
 
-        # 3. Criar a instrução de INSERT do SQLAlchemy (PostgreSQL Dialect)
-        stmt = insert(LeilaoAvaliacaoModel).values(**valores)
+        lote = values(
+            column("site", String), column("id_leilao", String), column("avaliacao", String), name="lote"
+        ).data([(site, id_leilao, avaliacao) for (site, id_leilao), avaliacao in lote_rows.items()])
 
-        # 4. Aplicar a regra de ON CONFLICT (UPSERT)
+        now = datetime.now()
+        origem = (
+            select(
+                literal(user_id, String), lote.c.site, lote.c.id_leilao,
+                LeilaoAnaliticoModel.id_registro_bruto, lote.c.avaliacao,
+                literal(now, DateTime), literal(now, DateTime)
+            )
+            .join_from(lote, LeilaoAnaliticoModel, and_(
+                LeilaoAnaliticoModel.site == lote.c.site,
+                LeilaoAnaliticoModel.id_leilao == lote.c.id_leilao
+            ))
+            .distinct(lote.c.site, lote.c.id_leilao)
+        )
+
+        stmt = insert(LeilaoAvaliacaoModel).from_select(
+            ["usuario_id", "site", "id_leilao", "id_registro_bruto", "avaliacao", "data_analise", "updated_at"],
+            origem
+        )
         # O DDL define a Primary Key como (usuario_id, site, id_leilao)
         stmt = stmt.on_conflict_do_update(
-            index_elements=['usuario_id', 'site', 'id_leilao'],
+            index_elements=["usuario_id", "site", "id_leilao"],
             set_={
-                'avaliacao': stmt.excluded.avaliacao,
-                'updated_at': stmt.excluded.updated_at
+                "avaliacao": stmt.excluded.avaliacao,
+                "updated_at": stmt.excluded.updated_at
                 # data_analise é mantida a da primeira inserção, apenas updated_at muda na atualização
             }
-        )
+        ).returning(LeilaoAvaliacaoModel.site, LeilaoAvaliacaoModel.id_leilao,
+                    LeilaoAvaliacaoModel.id_registro_bruto, LeilaoAvaliacaoModel.avaliacao)
 
         try:
-            self.session.execute(stmt)
+            previous = self._current_statuses([(user_id, site, id_leilao) for site, id_leilao in lote_rows])
+            saved = self.session.execute(stmt).all()
+            self._record_productivity([
+                (user_id, now.date(), row.avaliacao) for row in saved
+                if previous.get((user_id, row.site, row.id_leilao)) != row.avaliacao
+            ])
+            self._dequeue(
+                user_id,
+                [(row.site, row.id_leilao) for row in saved],
+                [row.id_registro_bruto for row in saved]
+            )
             self.session.commit()
         except Exception as e:
             self.session.rollback()
+            raise e
+
+        gravados = {(row.site, row.id_leilao) for row in saved}
+        return BatchWriteResult(
+            saved=len(saved),
+            skipped=[key for key in lote_rows if key not in gravados]
+        )
+
+    def update_status(self, user_id: str, site: str, id_leilao: str, new_status: EvaluationStatus) -> None:
+        """
+        Atualiza o status de avaliação do leilão para um utilizador.
+        Atalho para `transition_statuses` com uma única transição.
+        """
+        try:
+            result = self.transition_statuses(user_id, [StatusTransition(site, id_leilao, new_status)])
+        except Exception as e:
             raise RuntimeError(f"Falha ao atualizar o status do leilão (Upsert): {str(e)}")
-        
+
+        if result.skipped:
+            raise RuntimeError(f"Falha de integridade: Leilão {id_leilao} no site {site} não encontrado na base analítica.")
+
     def update_auction_core_data(self, site: str, id_leilao: str, data: dict):
         auction = self.session.query(LeilaoAnaliticoModel).filter_by(
             site=site, 
@@ -340,7 +1043,8 @@ class PostgresAuctionRepository(AuctionRepository):
         if "data_1_praca" in data: auction.data_1_praca = data["data_1_praca"]
         if "data_2_praca" in data: auction.data_2_praca = data["data_2_praca"]
         if "link_detalhe" in data: auction.link_detalhe = data["link_detalhe"]
-        
+
+        # A fila de triagem recebe a alteração pelo trigger de leiloes_analiticos
         try:
             self.session.commit()
         except Exception as e:
@@ -367,167 +1071,300 @@ class PostgresAuctionRepository(AuctionRepository):
                 site=site, id_leilao=id_leilao, usuario_id=user_id
             ).first()
 
-            if not row:
-                return None
-
-            # Helper interno seguro
-            def safe_enum(enum_cls, value):
-                try:
-                    return enum_cls(value) if value else None
-                except ValueError:
-                    return None
-
-            return DetailedAnalysis(
-                site=row.site,
-                id_leilao=row.id_leilao,
-                usuario_id=row.usuario_id,
-                
-                # --- Seção 1 ---
-                proc_num=row.proc_num,
-                proc_executados=row.proc_executados if isinstance(row.proc_executados, list) else [],
-                proc_adv_exec=row.proc_adv_exec,
-                proc_citacao=row.proc_citacao,
-                proc_conjuge=safe_enum(ConjugeStatus, row.proc_conjuge),
-                proc_credores=row.proc_credores,
-                proc_recursos=row.proc_recursos,
-                proc_recursos_obs=row.proc_recursos_obs,
-                proc_coproprietario_intimado=row.proc_coproprietario_intimado,
-                proc_natureza_execucao=safe_enum(NaturezaExecucao, row.proc_natureza_execucao),
-                proc_justica_gratuita=row.proc_justica_gratuita,
-                proc_especie_credito=safe_enum(EspecieCredito, row.proc_especie_credito),
-                proc_debito_atualizado=float(row.proc_debito_atualizado or 0.0),
-                proc_avaliacao_imovel=row.proc_avaliacao_imovel,
-                vlr_avaliacao=float(row.vlr_avaliacao or 0.0),
-
-                # --- Seção 2 ---
-                mat_num=row.mat_num,
-                mat_proprietario=row.mat_proprietario if isinstance(row.mat_proprietario, list) else [],
-                mat_documentos_proprietarios=row.mat_documentos_proprietarios if isinstance(row.mat_documentos_proprietarios, list) else [],
-                mat_penhoras=row.mat_penhoras if isinstance(row.mat_penhoras, list) else [],
-                mat_conjugue=str(row.mat_conjugue) if row.mat_conjugue is not None else "",
-                mat_prop_confere=row.mat_prop_confere,
-                mat_proprietario_pj=row.mat_proprietario_pj,
-                mat_penhora_averbada=row.mat_penhora_averbada,
-                mat_usufruto=row.mat_usufruto,
-                mat_indisp=row.mat_indisp,
-                mat_vagas_mat=str(row.mat_vagas_mat) if row.mat_vagas_mat is not None else "",
-
-                # --- Seção 3 ---
-                edt_objeto=row.edt_objeto,
-                edt_vlr_avaliacao=float(row.edt_vlr_avaliacao or 0.0),
-                edt_percentual_minimo=float(row.edt_percentual_minimo or 0.0),
-                edt_data_avaliacao=row.edt_data_avaliacao,
-                edt_parcelamento=row.edt_parcelamento,
-                edt_iptu_subroga=row.edt_iptu_subroga,
-                edt_condo_claro=row.edt_condo_claro,
-
-                # --- Seção 4 ---
-                edt_posse_status=safe_enum(OccupationStatus, row.edt_posse_status),
-                #edt_posse_estrategia=row.edt_posse_estrategia,
-
-                # --- Seção 5 ---
-                fin_lance=float(row.fin_lance or 0.0),
-                fin_itbi=float(row.fin_itbi or 0.0),
-                fin_dividas=float(row.fin_dividas or 0.0),
-                recomendacao_ia=row.recomendacao_ia,
-
-                # --- Legado ---
-                analise_ia=row.parecer_juridico,
-                risco_judicial=safe_enum(RiskLevel, row.risco_judicial) if row.risco_judicial else RiskLevel.BAIXO,
-                valor_venda_estimado=float(row.valor_venda_estimado or 0.0),
-                custo_reforma=float(row.custo_reforma or 0.0),
-                custo_desocupacao=float(row.custo_desocupacao or 0.0),
-                divida_condominio=float(row.divida_condominio or 0.0),
-                divida_iptu=float(row.divida_iptu or 0.0),
-                divida_subroga=row.divida_subroga if row.divida_subroga is not None else True,
-
-                no_bid_reason=safe_enum(NoBidReason, row.no_bid_reason),
-                no_bid_observation=row.no_bid_observation
-            )
+            return _row_to_analysis(row) if row else None
         except Exception as e:
             # CRÍTICO: Se der erro (ex: coluna não existe), faz rollback para não travar a próxima requisição
             self.session.rollback()
             # Opcional: printar o erro real para debug
             print(f"Erro ao buscar auditoria: {e}")
             raise e
-            
-            # Helper interno para Enums
-            def safe_enum(enum_class, value):
-                try:
-                    return enum_class(value) if value else None
-                except ValueError:
-                    return None
-
-            # Helper para Listas JSON
-            def safe_list(val):
-                if val is None: return []
-                if isinstance(val, list): return val
-                return []
+
+    def get_auditoria_snapshot(self, site: str, id_leilao: str, user_id: str) -> AuditoriaSnapshot:
+        """
+        Carrega o cabeçalho do leilão e a análise detalhada do usuário em UMA query
+        (leiloes_analiticos LEFT JOIN leiloes_analise_detalhada).
+        """
+        analise = LeilaoAnaliseDetalhadaModel
+        try:
+            row = self.session.execute(
+                select(*AUCTION_COLUMNS, analise)
+                .outerjoin(analise, and_(
+                    analise.site == LeilaoAnaliticoModel.site,
+                    analise.id_leilao == LeilaoAnaliticoModel.id_leilao,
+                    analise.usuario_id == user_id
+                ))
+                .where(
+                    LeilaoAnaliticoModel.site == site,
+                    LeilaoAnaliticoModel.id_leilao == id_leilao
+                )
+                .limit(1)
+            ).first()
+        except Exception as e:
+            self.session.rollback()
+            raise e
+
+        if row is None:
+            # Leilão fora da base analítica: a análise ainda pode existir
+            return AuditoriaSnapshot(auction=None, analysis=self.get_detailed_analysis(site, id_leilao, user_id))
+
+        n = len(AUCTION_COLUMNS)
+        return AuditoriaSnapshot(
+            auction=_row_to_auction(*row[:n]),
+            analysis=_row_to_analysis(row[n]) if row[n] is not None else None
+        )
 
     def get_auction(self, site: str, id_leilao: str) -> Optional[Auction]:
         """Busca dados básicos do leilão para o cabeçalho."""
-        result = self.session.query(LeilaoAnaliticoModel).filter_by(
-            site=site, id_leilao=id_leilao
+        row = self.session.execute(
+            select(*AUCTION_COLUMNS).where(
+                LeilaoAnaliticoModel.site == site,
+                LeilaoAnaliticoModel.id_leilao == id_leilao
+            ).limit(1)
         ).first()
-        
-        if not result:
-            return None
-            
-        return Auction(
-            site=result.site,
-            id_leilao=result.id_leilao,
-            titulo=result.titulo,
-            uf=result.uf,
-            cidade=result.cidade,
-            tipo_bem=result.tipo_bem,
-            tipo_leilao=result.tipo_leilao,
-            valor_1_praca=float(result.valor_1_praca or 0.0),
-            valor_2_praca=float(result.valor_2_praca or 0.0),
-            link_detalhe=result.link_detalhe,
-            imagem_capa=result.imagem_capa,
-            data_1_praca=result.data_1_praca,
-            data_2_praca=result.data_2_praca,
-            status_imovel=result.status_imovel
-        )
 
-    # --- MÉTODOS DA TELA DE MONITORAMENTO ---
+        return _row_to_auction(*row) if row else None
 
-    def get_scraper_runs(self, filters: ScraperRunFilter) -> List[ScraperRun]:
-        """
-        Recupera os registros de execução dos scrapers com base nos filtros fornecidos.
-        """
-        query = self.session.query(ScraperRunModel)
+    # --- MÉTODOS DA TELA DE MONITORAMENTO ---
 
+    @staticmethod
+    def _scraper_run_conditions(filters: ScraperRunFilter) -> list:
+        """Predicados dos filtros do monitoramento (compartilhados pela listagem e pelos agregados)."""
+        conditions = []
         if filters.start_date:
-            query = query.filter(ScraperRunModel.execution_start_time >= filters.start_date)
+            conditions.append(ScraperRunModel.execution_start_time >= filters.start_date)
         if filters.end_date:
-            from datetime import timedelta
             end_date_inclusive = filters.end_date + timedelta(days=1)
-            query = query.filter(ScraperRunModel.execution_start_time < end_date_inclusive)
+            conditions.append(ScraperRunModel.execution_start_time < end_date_inclusive)
         if filters.sources:
-            query = query.filter(ScraperRunModel.source_name.in_(filters.sources))
+            conditions.append(ScraperRunModel.source_name.in_(filters.sources))
         if filters.statuses:
-            query = query.filter(ScraperRunModel.run_status.in_(filters.statuses))
+            conditions.append(ScraperRunModel.run_status.in_(filters.statuses))
+        return conditions
 
-        results = query.order_by(ScraperRunModel.execution_start_time.desc()).all()
+    def _scraper_runs_select(self, filters: ScraperRunFilter, limit: Optional[int], offset: int, *columns):
+        """SELECT das execuções filtradas, da mais recente para a mais antiga, com limit/offset."""
+        r = ScraperRunModel
+        stmt = (
+            select(*columns)
+            .where(*self._scraper_run_conditions(filters))
+            .order_by(r.execution_start_time.desc(), r.id.desc())
+            .offset(offset)
+        )
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        return stmt
+
+    def get_scraper_runs(self, filters: ScraperRunFilter, limit: Optional[int] = None,
+                         offset: int = 0) -> List[ScraperRun]:
+        """
+        Recupera os registros de execução dos scrapers com base nos filtros fornecidos,
+        do mais recente para o mais antigo. `limit`/`offset` paginam a tabela de dados brutos.
+        """
+        r = ScraperRunModel
+        stmt = self._scraper_runs_select(
+            filters, limit, offset,
+            r.id, r.execution_id, r.source_name, r.run_type, r.execution_start_time,
+            r.execution_end_time, r.duration_seconds, r.run_status, r.total_requests,
+            r.successful_requests, r.failed_requests, r.raw_items_collected,
+            r.mapped_items_count, r.error_details, r.avg_latency_ms, r.p95_latency_ms,
+            r.max_pages_scraped, r.parameters_used
+        )
+        return [ScraperRun(**row._mapping) for row in self.session.execute(stmt)]
+
+    def get_scraper_runs_frame(self, filters: ScraperRunFilter, limit: Optional[int] = None,
+                               offset: int = 0) -> pd.DataFrame:
+        """Execuções como DataFrame colunar: lotes do cursor vão direto para Arrow, sem um ScraperRun por linha."""
+        columns = [getattr(ScraperRunModel, name) for name in SCRAPER_RUN_FRAME_SCHEMA.names]
+        # execution_id é uuid no banco: o driver devolve uuid.UUID, e o Arrow espera texto
+        index = SCRAPER_RUN_FRAME_SCHEMA.get_field_index("execution_id")
+        columns[index] = cast(ScraperRunModel.execution_id, String).label("execution_id")
+        stmt = self._scraper_runs_select(filters, limit, offset, *columns)
+        result = self.session.execute(stmt.execution_options(yield_per=FRAME_BATCH_SIZE))
+        return frame_from_batches(SCRAPER_RUN_FRAME_SCHEMA, result.partitions())
+
+    def get_scraper_run_stats(self, filters: ScraperRunFilter) -> ScraperRunStats:
+        """
+        Calcula os indicadores do monitoramento em UMA query (GROUPING SETS):
+        - ():                  KPIs do período;
+        - (dia, run_status):   execuções por dia e status;
+        - (source_name):       itens coletados/mapeados por fonte.
+        """
+        r = ScraperRunModel
+        dia = cast(r.execution_start_time, Date)
+        sucesso = r.run_status == 'SUCCESS'
+
+        stmt = (
+            select(
+                dia, r.run_status, r.source_name,
+                func.grouping(dia), func.grouping(r.source_name),
+                func.count(),
+                func.count().filter(sucesso),
+                func.sum(r.raw_items_collected),
+                func.sum(r.mapped_items_count),
+                func.avg(r.duration_seconds).filter(sucesso)
+            )
+            .where(*self._scraper_run_conditions(filters))
+            .group_by(func.grouping_sets(tuple_(dia, r.run_status), tuple_(r.source_name), tuple_()))
+        )
+
+        stats = ScraperRunStats()
+        for (dia_val, status, source, g_dia, g_source,
+             total, total_sucesso, coletados, mapeados, duracao) in self.session.execute(stmt):
+            if not g_dia:
+                stats.daily.append(ScraperDailyBucket(dia=dia_val, run_status=status, total=total))
+            elif not g_source:
+                stats.by_source.append(ScraperSourceTotals(
+                    source_name=source,
+                    raw_items_collected=int(coletados or 0),
+                    mapped_items_count=int(mapeados or 0)
+                ))
+            else:
+                stats.total_runs = total
+                stats.success_runs = total_sucesso
+                stats.total_collected = int(coletados or 0)
+                stats.total_mapped = int(mapeados or 0)
+                stats.avg_duration_success = float(duracao) if duracao is not None else None
+
+        stats.daily.sort(key=lambda b: (b.dia, b.run_status))
+        stats.by_source.sort(key=lambda s: s.source_name)
+        return stats
+
+    def fold_scraper_runs(self, batch_size: int = 5000) -> int:
+        """
+        Soma no rollup (buckets de hora e de dia por fonte) as execuções concluídas que
+        ainda não foram incorporadas. Roda fora das leituras (job agendado ou fim da execução
+        dos scrapers). As pendentes vêm do índice parcial ix_scraper_runs_rollup_pendentes
+        (custo proporcional às novas execuções). Cada lote é um único statement:
+        marca as execuções em scraper_runs.rollup_em (FOR UPDATE SKIP LOCKED + rollup_em IS NULL,
+        o que protege contra dois processos somando a mesma execução) e faz o UPSERT dos
+        agregados apenas das que foram marcadas. Retorna quantas execuções foram somadas.
+        """
+        r, rollup = ScraperRunModel, ScraperRunRollupModel
+
+        pendente = and_(r.rollup_em.is_(None), r.run_status != 'IN_PROGRESS')
+        pendentes = (
+            select(r.id)
+            .where(pendente)
+            .order_by(r.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        marcadas = (
+            update(r)
+            .where(r.id.in_(pendentes.scalar_subquery()), pendente)
+            .values(rollup_em=func.now())
+            .returning(r.id.label("run_id"))
+            .cte("marcadas")
+        )
+
+        granularidades = values(column("granularidade", String), name="granularidades").data([("hour",), ("day",)])
+        bucket = func.date_trunc(granularidades.c.granularidade, r.execution_start_time)
+        peso = func.coalesce(func.nullif(r.total_requests, 0), 1)
+        com_latencia = r.avg_latency_ms.isnot(None)
+        limites = ScraperLatencyBucket.P95_BOUNDS_MS
+        faixas = [r.p95_latency_ms <= limites[0]]
+        faixas += [and_(r.p95_latency_ms > baixo, r.p95_latency_ms <= alto) for baixo, alto in zip(limites, limites[1:])]
+        faixas += [r.p95_latency_ms > limites[-1]]
+
+        def soma(col):
+            return func.coalesce(func.sum(col), 0)
+
+        agregados = (
+            select(
+                granularidades.c.granularidade, r.source_name, bucket,
+                func.count(),
+                func.count().filter(r.run_status == 'SUCCESS'),
+                func.count().filter(r.run_status == 'FAILED'),
+                soma(r.total_requests), soma(r.successful_requests), soma(r.failed_requests),
+                soma(r.raw_items_collected), soma(r.mapped_items_count),
+                func.max(r.max_pages_scraped),
+                func.coalesce(func.sum(r.avg_latency_ms * peso).filter(com_latencia), 0),
+                func.coalesce(func.sum(peso).filter(com_latencia), 0),
+                func.min(r.avg_latency_ms), func.max(r.avg_latency_ms),
+                func.max(r.p95_latency_ms),
+                *[func.count().filter(faixa) for faixa in faixas]
+            )
+            .select_from(marcadas)
+            .join(r, r.id == marcadas.c.run_id)
+            .join(granularidades, true())
+            .group_by(granularidades.c.granularidade, r.source_name, bucket)
+        )
+
+        somaveis = [
+            "runs_total", "runs_success", "runs_failed", "total_requests", "successful_requests",
+            "failed_requests", "raw_items_collected", "mapped_items_count",
+            "latency_weighted_sum_ms", "latency_weight",
+            *ROLLUP_HISTOGRAM_COLUMNS
+        ]
+        upsert = insert(rollup).from_select(
+            ["granularidade", "source_name", "bucket_start", "runs_total", "runs_success", "runs_failed",
+             "total_requests", "successful_requests", "failed_requests", "raw_items_collected",
+             "mapped_items_count", "max_pages_scraped", "latency_weighted_sum_ms", "latency_weight",
+             "latency_min_ms", "latency_max_ms", "p95_max_ms", *ROLLUP_HISTOGRAM_COLUMNS],
+            agregados
+        )
+        upsert = upsert.on_conflict_do_update(
+            index_elements=["granularidade", "source_name", "bucket_start"],
+            set_={
+                **{col: getattr(rollup, col) + getattr(upsert.excluded, col) for col in somaveis},
+                "latency_min_ms": func.least(rollup.latency_min_ms, upsert.excluded.latency_min_ms),
+                "latency_max_ms": func.greatest(rollup.latency_max_ms, upsert.excluded.latency_max_ms),
+                "p95_max_ms": func.greatest(rollup.p95_max_ms, upsert.excluded.p95_max_ms),
+                "max_pages_scraped": func.greatest(rollup.max_pages_scraped, upsert.excluded.max_pages_scraped),
+            }
+        ).cte("rollup_upsert")
+
+        stmt = select(func.count()).select_from(marcadas).add_cte(upsert)
+
+        total = 0
+        try:
+            while True:
+                somadas = self.session.execute(stmt).scalar() or 0
+                self.session.commit()
+                total += somadas
+                if somadas < batch_size:
+                    return total
+        except Exception as e:
+            self.session.rollback()
+            raise e
+
+    def get_scraper_latency_history(self, sources: Optional[List[str]], start: datetime, end: datetime,
+                                    granularity: str = "day") -> List[ScraperLatencyBucket]:
+        """
+        Lê a série de buckets do rollup (sem tocar em scraper_runs) para as fontes e o intervalo
+        [start, end), em ordem cronológica. `granularity`: 'hour' ou 'day'.
+        """
+        rollup = ScraperRunRollupModel
+        stmt = select(rollup).where(
+            rollup.granularidade == granularity,
+            rollup.bucket_start >= start,
+            rollup.bucket_start < end
+        )
+        if sources:
+            stmt = stmt.where(rollup.source_name.in_(sources))
+        stmt = stmt.order_by(rollup.bucket_start, rollup.source_name)
 
         return [
-            ScraperRun(
-                id=r.id,
-                execution_id=r.execution_id,
-                source_name=r.source_name,
-                run_type=r.run_type,
-                execution_start_time=r.execution_start_time,
-                execution_end_time=r.execution_end_time,
-                duration_seconds=r.duration_seconds,
-                run_status=r.run_status,
-                total_requests=r.total_requests,
-                successful_requests=r.successful_requests,
-                failed_requests=r.failed_requests,
-                raw_items_collected=r.raw_items_collected,
-                mapped_items_count=r.mapped_items_count,
-                error_details=r.error_details
-            ) for r in results
+            ScraperLatencyBucket(
+                source_name=row.source_name,
+                bucket_start=row.bucket_start,
+                runs_total=row.runs_total,
+                runs_success=row.runs_success,
+                runs_failed=row.runs_failed,
+                total_requests=row.total_requests,
+                successful_requests=row.successful_requests,
+                failed_requests=row.failed_requests,
+                raw_items_collected=row.raw_items_collected,
+                mapped_items_count=row.mapped_items_count,
+                max_pages_scraped=row.max_pages_scraped,
+                latency_weighted_sum_ms=row.latency_weighted_sum_ms,
+                latency_weight=row.latency_weight,
+                latency_min_ms=row.latency_min_ms,
+                latency_max_ms=row.latency_max_ms,
+                p95_max_ms=row.p95_max_ms,
+                p95_histogram=[getattr(row, col) for col in ROLLUP_HISTOGRAM_COLUMNS]
+            )
+            for row in self.session.execute(stmt).scalars()
         ]
 
     def get_scraper_sources(self) -> List[str]:
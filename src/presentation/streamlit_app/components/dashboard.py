@@ -1,10 +1,13 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px  # Nova importação para gráficos bonitos
+from src.domain.models import FilterFacets
 
-def render_dashboard(df: pd.DataFrame, stats_history: dict = None):
+def render_dashboard(facets: FilterFacets, stats_history: dict = None):
     """
     Renderiza o painel de indicadores com gráficos de Pizza/Donut.
+    Lê totais e distribuições direto das facetas calculadas no banco
+    (não recontabiliza nada sobre DataFrames).
     """
     if not stats_history:
         stats_history = {'analisar': 0, 'descartar': 0}
@@ -15,12 +18,10 @@ def render_dashboard(df: pd.DataFrame, stats_history: dict = None):
     c1, c2, c3, c4 = st.columns(4)
     
     with c1:
-        total_pendente = len(df)
-        st.metric("📌 Pendentes", total_pendente, help="Fila de espera")
+        st.metric("📌 Pendentes", facets.total, help="Fila de espera")
     
     with c2:
-        vol_total = df['valor_1_praca'].sum() if not df.empty and 'valor_1_praca' in df.columns else 0
-        st.metric("💰 Volume (1ª Praça)", f"R$ {vol_total/1_000_000:.1f}M")
+        st.metric("💰 Volume (1ª Praça)", f"R$ {facets.volume_1_praca/1_000_000:.1f}M")
 
     with c3:
         st.metric("🗑️ Descartados", stats_history.get('descartar', 0))
@@ -33,16 +34,14 @@ def render_dashboard(df: pd.DataFrame, stats_history: dict = None):
     st.markdown("---")
 
     # --- LINHA 2: GRÁFICOS DE PIZZA (DONUT) ---
-    if not df.empty:
+    if facets.total:
         col_chart1, col_chart2 = st.columns(2)
         
         # --- GRÁFICO 1: TIPO DE BEM ---
         with col_chart1:
-            if 'tipo_bem' in df.columns:
-                # Prepara os dados: Conta quantos de cada tipo
-                counts_tipo = df['tipo_bem'].value_counts().reset_index()
-                counts_tipo.columns = ['Tipo', 'Qtd']
-                
+            # Prepara os dados: contagens da faceta dentro da seleção atual
+            counts_tipo = _facet_frame(facets.tipo_bem, 'Tipo')
+            if not counts_tipo.empty:
                 # Cria o gráfico Donut
                 fig_tipo = px.pie(
                     counts_tipo, 
@@ -58,11 +57,8 @@ def render_dashboard(df: pd.DataFrame, stats_history: dict = None):
 
         # --- GRÁFICO 2: TOP LEILOEIROS ---
         with col_chart2:
-            if 'site' in df.columns:
-                # Prepara os dados: Conta quantos de cada site
-                counts_site = df['site'].value_counts().reset_index()
-                counts_site.columns = ['Site', 'Qtd']
-                
+            counts_site = _facet_frame(facets.site, 'Site')
+            if not counts_site.empty:
                 # Se tiver muitos sites, pega o Top 5 e agrupa o resto em "Outros" (Opcional, mas recomendado)
                 if len(counts_site) > 6:
                     top_5 = counts_site.head(5)
@@ -82,3 +78,9 @@ def render_dashboard(df: pd.DataFrame, stats_history: dict = None):
                 st.plotly_chart(fig_site, use_container_width=True)
     
     st.markdown("---")
+
+
+def _facet_frame(values, label: str) -> pd.DataFrame:
+    """Converte uma faceta em DataFrame (maiores primeiro), ignorando valores fora da seleção."""
+    rows = sorted(((f.value, f.count_filtered) for f in values if f.count_filtered), key=lambda r: -r[1])
+    return pd.DataFrame(rows, columns=[label, 'Qtd'])
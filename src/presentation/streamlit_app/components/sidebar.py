@@ -1,44 +1,73 @@
 import streamlit as st
 
-def render_sidebar(unique_ufs, unique_cities, unique_types, unique_sites, unique_status):
+# Chaves de session_state dos filtros da triagem (permitem ler a seleção
+# atual antes de renderizar a sidebar, para calcular as facetas em cascata)
+FILTER_KEYS = {
+    "uf": "flt_uf",
+    "cidade": "flt_cidade",
+    "tipo_bem": "flt_tipo_bem",
+    "site": "flt_site",
+    "status_imovel": "flt_status_imovel",
+}
+
+def get_selected_filters():
+    """Retorna a seleção atual dos filtros (estado do rerun anterior)."""
+    return {name: st.session_state.get(key) or [] for name, key in FILTER_KEYS.items()}
+
+def _facet_options(facets, name):
+    # Mantém os valores já selecionados mesmo que tenham saído da cascata,
+    # senão o multiselect perderia a seleção do usuário.
+    selected = st.session_state.get(FILTER_KEYS[name]) or []
+    options = set(facets.options(name)) | set(selected)
+    return sorted(options)
+
+def _facet_label(facets, name):
+    counts = {f.value: f.count for f in getattr(facets, name)}
+    return lambda value: f"{value} ({counts.get(value, 0)})"
+
+def render_sidebar(facets):
     st.sidebar.header("🔍 Filtros de Busca")
-    
+
     # Filtro UF
     selected_uf = st.sidebar.multiselect(
         "Estado (UF)",
-        options=sorted(unique_ufs) if unique_ufs else [],
-        default=[]
+        options=_facet_options(facets, "uf"),
+        format_func=_facet_label(facets, "uf"),
+        key=FILTER_KEYS["uf"]
     )
-    
-    # Filtro Cidade (lógica de dependência da UF se necessário, ou simples)
-    # Aqui assumimos que unique_cities já vem filtrado ou mostra tudo
+
+    # Filtro Cidade (as opções já vêm restritas pela UF selecionada)
     selected_city = st.sidebar.multiselect(
         "Cidade",
-        options=sorted(unique_cities) if unique_cities else [],
-        default=[]
+        options=_facet_options(facets, "cidade"),
+        format_func=_facet_label(facets, "cidade"),
+        key=FILTER_KEYS["cidade"]
     )
-    
+
     # Filtro Tipo
     selected_type = st.sidebar.multiselect(
         "Tipo do Bem",
-        options=sorted(unique_types) if unique_types else [],
-        default=[]
+        options=_facet_options(facets, "tipo_bem"),
+        format_func=_facet_label(facets, "tipo_bem"),
+        key=FILTER_KEYS["tipo_bem"]
     )
-    
+
     # Filtro Site
     selected_site = st.sidebar.multiselect(
         "Leiloeiro / Site",
-        options=sorted(unique_sites) if unique_sites else [],
-        default=[]
+        options=_facet_options(facets, "site"),
+        format_func=_facet_label(facets, "site"),
+        key=FILTER_KEYS["site"]
     )
-    
+
     # Filtro Status do Imóvel
     selected_status = st.sidebar.multiselect(
         "Status do Imóvel",
-        options=sorted(unique_status) if unique_status else [],
-        default=[]
+        options=_facet_options(facets, "status_imovel"),
+        format_func=_facet_label(facets, "status_imovel"),
+        key=FILTER_KEYS["status_imovel"]
     )
-    
+
     return {
         "uf": selected_uf,
         "cidade": selected_city,
@@ -1,21 +1,25 @@
+import base64
 import streamlit as st
 import pandas as pd
 
-def render_triage_cards(df: pd.DataFrame):
+def render_triage_cards(df: pd.DataFrame, thumbnails: dict = None):
     """
     Renderiza os leilões em formato de Cards verticais com altura de imagem fixa.
+    `thumbnails` mapeia a URL de imagem_capa para a miniatura local (JPEG); sem ela,
+    o card aponta para a imagem original.
     Retorna um dicionário com as decisões tomadas.
     """
+    thumbnails = thumbnails or {}
     if df.empty:
         # Se o dataframe estiver vazio após a filtragem do main, não mostra nada.
         return {}
 
-    # Sanitização básica: Garante que tem ID, pega os primeiros 15 e reseta o índice
+    # Sanitização básica: Garante que tem ID e reseta o índice
+    # (o tamanho da página já vem limitado pelo repositório)
     df_clean = (
     df
     .dropna(subset=['id_leilao'])
     .drop_duplicates(subset=['id_leilao'])  # <- adiciona isso
-    .head(15)
     .reset_index(drop=True)
 )
     
@@ -56,7 +60,8 @@ def render_triage_cards(df: pd.DataFrame):
     st.write(f"Exibindo {len(df_clean)} oportunidades")
 
     # --- LOOP DOS CARDS ---
-    for index, row in df_clean.iterrows():
+    # Um dict por linha (to_dict) em vez de uma Series por linha (iterrows)
+    for row in df_clean.to_dict("records"):
         id_leilao = str(row['id_leilao'])
         
         # Cria um container para cada leilão
@@ -71,6 +76,9 @@ def render_triage_cards(df: pd.DataFrame):
                 # Se não tiver URL, usa um placeholder do mesmo tamanho
                 if not img_url or pd.isna(img_url):
                     img_url = "https://via.placeholder.com/300x220?text=Sem+Foto"
+                elif img_url in thumbnails:
+                    # Miniatura local embutida no HTML: não depende da CDN do leiloeiro
+                    img_url = "data:image/jpeg;base64," + base64.b64encode(thumbnails[img_url]).decode("ascii")
 
                 # CSS HACK: Usamos HTML direto para forçar a altura e o corte (object-fit)
                 # height: 220px -> Define a altura fixa
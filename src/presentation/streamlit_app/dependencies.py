@@ -1,60 +1,111 @@
-import streamlit as st
-from src.infra.database.config import SessionLocal
+from contextlib import contextmanager
+from src.infra.database.config import engine, session_scope
+from src.infra.database.instrumentation import QueryMonitor
+from src.infra.media.thumbnails import ThumbnailCache
 from src.infra.repositories.postgres_repo import PostgresAuctionRepository
+from src.infra.repositories.caching_repo import CachingAuctionRepository, RepositoryCache
 
 # Importa TODOS os Use Cases (Triagem + Carteira + Auditoria)
 from src.application.use_cases import (
     # --- Fase 1: Triagem ---
-    GetPendingAuctionsUseCase, 
+    PrepareTriageQueueUseCase,
+    GetPendingAuctionsUseCase,
+    GetPendingAuctionsFrameUseCase,
     SubmitBatchEvaluationUseCase, 
     GetFilterOptionsUseCase,  # <--- O erro estava aqui (faltava injetar este)
     GetUserStatsUseCase,      # <--- Necessário para a sidebar do main.py
+    SearchAuctionsUseCase,    # Busca textual (triagem e carteira)
 
     # --- Fase 2: Carteira ---
-    GetPortfolioAuctionsUseCase, 
+    GetPortfolioPageUseCase,      # Abas paginadas (filtros/ordenação no banco)
+    GetPortfolioSummaryUseCase,   # Badges das abas (contagem por status)
+    GetFinalizadosIndicatorsUseCase,  # Painel de desempenho dos Finalizados
+    TransitionStatusesUseCase,
     
     # --- Fase 3: Auditoria V2 ---
+    GetAuditoriaSnapshotUseCase,
     SaveAuditoriaRascunhoUseCase,
     FinalizarAuditoriaUseCase,
     DescartarAuditoriaUseCase,
 
     # --- Monitoramento ---
     GetScraperRunsUseCase,
+    GetScraperRunsFrameUseCase,
+    GetScraperRunStatsUseCase,
+    GetScraperLatencyHistoryUseCase,
     GetScraperSourcesUseCase
 )
 
-@st.cache_resource
-def get_services():
+# Cache de leitura do repositório: um por processo, compartilhado por todas as sessões
+# (as entradas por usuário levam o usuario_id na chave). None se REPO_CACHE_ENABLED=false.
+repository_cache = RepositoryCache.from_env()
+
+# Consultas SQL por caso de uso (painel de diagnóstico). None se QUERY_MONITOR_ENABLED=false.
+query_monitor = QueryMonitor.from_env()
+if query_monitor is not None:
+    query_monitor.install(engine)
+
+# Miniaturas locais das imagens de capa (cards da triagem e da carteira), em disco e
+# compartilhadas por todas as sessões. None se THUMBNAIL_CACHE_ENABLED=false.
+thumbnail_cache = ThumbnailCache.from_env()
+
+def build_services(db_session):
     """
     Factory de Serviços Unificada:
-    Inicializa o Banco e injeta dependências para TODAS as telas do sistema.
+    Injeta dependências para TODAS as telas do sistema sobre uma sessão de banco.
     """
-    # 1. Cria a sessão do banco
-    db_session = SessionLocal()
-    
-    # 2. Inicializa o repositório com a sessão
+    # 1. Inicializa o repositório com a sessão recebida
     repo = PostgresAuctionRepository(db_session)
+    if repository_cache is not None:
+        repo = CachingAuctionRepository(repo, repository_cache)
     
-    # 3. Retorna o dicionário de serviços
-    return {
+    # 2. Monta o dicionário de serviços
+    services = {
         # --- INFRAESTRUTURA (Acesso Direto) ---
         "repository": repo, 
 
         # --- FASE 1: TRIAGEM (Usado no main.py) ---
         "get_filters": GetFilterOptionsUseCase(repo),       # Resolve o KeyError: 'get_filters'
         "get_stats": GetUserStatsUseCase(repo),             # Resolve a sidebar
-        "get_auctions": GetPendingAuctionsUseCase(repo),    # Busca leilões pendentes
+        "prepare_triage_queue": PrepareTriageQueueUseCase(repo), # Inscrição na fila (1x por usuário)
+        "get_auctions": GetPendingAuctionsUseCase(repo),    # Busca leilões pendentes (paginado)
+        "get_auctions_frame": GetPendingAuctionsFrameUseCase(repo), # Mesma página, já em DataFrame
         "submit_eval": SubmitBatchEvaluationUseCase(repo),  # Salva decisões da triagem
+        "search_auctions": SearchAuctionsUseCase(repo),     # Busca por título/ID (triagem e carteira)
         
         # --- FASE 2: CARTEIRA (Usado no carteira.py) ---
-        "get_portfolio_auctions": GetPortfolioAuctionsUseCase(repo),
+        "get_portfolio_page": GetPortfolioPageUseCase(repo),
+        "get_portfolio_summary": GetPortfolioSummaryUseCase(repo),
+        "get_finalizados_indicators": GetFinalizadosIndicatorsUseCase(repo),
+        "transition_statuses": TransitionStatusesUseCase(repo), # Mudança de status em lote
         
         # --- FASE 3: AUDITORIA V2 (Usado no auditoria_v2.py) ---
+        "get_auditoria_snapshot": GetAuditoriaSnapshotUseCase(repo),
         "save_rascunho": SaveAuditoriaRascunhoUseCase(repo),
         "finalizar_auditoria": FinalizarAuditoriaUseCase(repo),
         'descartar_auditoria': DescartarAuditoriaUseCase(repo),
 
         # --- MONITORAMENTO (Usado no monitoramento.py) ---
         "get_scraper_runs": GetScraperRunsUseCase(repo),
+        "get_scraper_runs_frame": GetScraperRunsFrameUseCase(repo),
+        "get_scraper_run_stats": GetScraperRunStatsUseCase(repo),
+        "get_scraper_latency_history": GetScraperLatencyHistoryUseCase(repo),
         "get_scraper_sources": GetScraperSourcesUseCase(repo)
-    }
\ No newline at end of file
+    }
+
+    # 3. Cada execute() passa a atribuir as consultas SQL ao seu caso de uso
+    if query_monitor is not None:
+        services.update({
+            name: query_monitor.instrument(service) for name, service in services.items() if name != "repository"
+        })
+    return services
+
+@contextmanager
+def request_services():
+    """
+    Serviços com escopo de um rerun do Streamlit.
+    Cada rerun (de cada aba/usuário) recebe sua própria sessão do pool e a devolve
+    ao final; nada de sessão global compartilhada entre threads.
+    """
+    with session_scope() as db_session:
+        yield build_services(db_session)
@@ -0,0 +1,151 @@
+import streamlit as st
+import pandas as pd
+
+# Trecho do SQL exibido nas tabelas (o texto completo fica no detalhe da execução)
+SQL_PREVIEW_CHARS = 160
+
+def _preview(sql):
+    return sql if len(sql) <= SQL_PREVIEW_CHARS else sql[:SQL_PREVIEW_CHARS] + "…"
+
+def render_diagnostico(query_monitor, repository_cache=None, thumbnail_cache=None):
+    """
+    Renderiza o painel de diagnóstico: consultas SQL por caso de uso (contagem, linhas,
+    duração), statements lentos, padrões N+1 e os contadores do cache de leitura e das miniaturas.
+    Os dados vêm do buffer em memória deste processo (não consulta o banco).
+    """
+    st.title("🩺 Diagnóstico")
+    st.caption("Consultas SQL emitidas por caso de uso nas execuções recentes deste servidor.")
+
+    if query_monitor is None:
+        st.info("Instrumentação desligada (QUERY_MONITOR_ENABLED=false).")
+        return
+
+    c1, c2 = st.columns([4, 1])
+    c1.caption(
+        f"Lento: statement ≥ {query_monitor.slow_ms:.0f} ms · "
+        f"N+1: mesmo SQL ≥ {query_monitor.n_plus_one_threshold}x numa execução"
+    )
+    if c2.button("Limpar buffer", use_container_width=True):
+        query_monitor.clear()
+
+    traces = query_monitor.recent()
+    aggregates = query_monitor.aggregates()
+    unattributed_queries, unattributed_ms = query_monitor.unattributed()
+
+    # --- 1. KPIs ---
+    k1, k2, k3, k4 = st.columns(4)
+    k1.metric("Execuções no buffer", len(traces))
+    k2.metric("Statements", sum(t.query_count for t in traces))
+    k3.metric("Com N+1", sum(a.n_plus_one_calls for a in aggregates))
+    k4.metric("Fora de caso de uso", unattributed_queries, help=f"{unattributed_ms:,.0f} ms no total")
+
+    if not traces:
+        st.info("Nenhuma execução registrada ainda. Navegue pelas telas e volte aqui.")
+        return
+
+    # --- 2. CONSOLIDADO POR CASO DE USO ---
+    st.markdown("##### Por caso de uso")
+    st.dataframe(
+        pd.DataFrame([{
+            "Caso de uso": a.use_case,
+            "Execuções": a.calls,
+            "Consultas (média)": round(a.avg_queries, 1),
+            "Consultas (máx)": a.max_queries,
+            "SQL ms (média)": round(a.avg_sql_ms, 1),
+            "Duração p95 (ms)": round(a.p95_ms, 1),
+            "Linhas": a.rows,
+            "Lentos": a.slow_statements,
+            "Falhas": a.failed_statements,
+            "Execuções com N+1": a.n_plus_one_calls,
+        } for a in aggregates]),
+        use_container_width=True, hide_index=True
+    )
+
+    # --- 3. ALERTAS ---
+    n_plus_one, slow, failed = {}, {}, {}
+    for trace in traces:
+        for sql, count in trace.repeated_statements(query_monitor.n_plus_one_threshold):
+            entry = n_plus_one.setdefault((trace.use_case, sql), {"execucoes": 0, "max": 0})
+            entry["execucoes"] += 1
+            entry["max"] = max(entry["max"], count)
+        for statement in trace.slow_statements(query_monitor.slow_ms):
+            entry = slow.setdefault((trace.use_case, statement.sql), {"vezes": 0, "max_ms": 0.0})
+            entry["vezes"] += 1
+            entry["max_ms"] = max(entry["max_ms"], statement.duration_ms)
+        for statement in trace.failed_statements():
+            entry = failed.setdefault((trace.use_case, statement.sql), {"vezes": 0, "max_ms": 0.0})
+            entry["vezes"] += 1
+            entry["max_ms"] = max(entry["max_ms"], statement.duration_ms)
+
+    st.markdown("##### Alertas")
+    if not n_plus_one and not slow and not failed:
+        st.success("Nenhum statement lento, com erro ou padrão N+1 nas execuções recentes.")
+    if failed:
+        st.error(f"{len(failed)} statement(s) terminaram em erro (ex: statement_timeout).")
+        st.dataframe(
+            pd.DataFrame([{
+                "Caso de uso": use_case, "SQL": _preview(sql), "Ocorrências": v["vezes"], "Máx (ms)": round(v["max_ms"], 1),
+            } for (use_case, sql), v in sorted(failed.items(), key=lambda i: i[1]["max_ms"], reverse=True)]),
+            use_container_width=True, hide_index=True
+        )
+    if n_plus_one:
+        st.warning(f"{len(n_plus_one)} padrão(ões) N+1: o mesmo SQL repetido dentro de uma execução.")
+        st.dataframe(
+            pd.DataFrame([{
+                "Caso de uso": use_case, "SQL": _preview(sql),
+                "Execuções afetadas": v["execucoes"], "Repetições (máx)": v["max"],
+            } for (use_case, sql), v in n_plus_one.items()]),
+            use_container_width=True, hide_index=True
+        )
+    if slow:
+        st.warning(f"{len(slow)} statement(s) lento(s).")
+        st.dataframe(
+            pd.DataFrame([{
+                "Caso de uso": use_case, "SQL": _preview(sql), "Ocorrências": v["vezes"], "Máx (ms)": round(v["max_ms"], 1),
+            } for (use_case, sql), v in sorted(slow.items(), key=lambda i: i[1]["max_ms"], reverse=True)]),
+            use_container_width=True, hide_index=True
+        )
+
+    # --- 4. EXECUÇÕES RECENTES ---
+    with st.expander("Execuções recentes"):
+        st.dataframe(
+            pd.DataFrame([{
+                "Início": t.started_at.strftime("%H:%M:%S"), "Caso de uso": t.use_case,
+                "Consultas": t.query_count, "Linhas": t.rows,
+                "SQL (ms)": round(t.sql_ms, 1), "Total (ms)": round(t.duration_ms, 1),
+            } for t in traces]),
+            use_container_width=True, hide_index=True
+        )
+        options = {f"{t.started_at:%H:%M:%S} · {t.use_case} ({t.query_count} consultas)": t for t in traces[:50]}
+        selected = st.selectbox("Detalhar execução", options=list(options))
+        if selected:
+            st.dataframe(
+                pd.DataFrame([{
+                    "SQL": s.sql, "ms": round(s.duration_ms, 2), "Linhas": s.rows, "executemany": s.executemany,
+                    "Erro": s.failed,
+                } for s in options[selected].statements]),
+                use_container_width=True, hide_index=True
+            )
+
+    # --- 5. CACHE DE LEITURA ---
+    if repository_cache is not None:
+        st.markdown("##### Cache de leitura do repositório")
+        st.dataframe(
+            pd.DataFrame([{
+                "Método": method, "Acertos": c.hits, "Faltas": c.misses, "Taxa de acerto": f"{c.hit_ratio:.0%}",
+                "Expirações": c.expirations, "Descartes (LRU)": c.evictions,
+                "Invalidações": c.invalidations, "Entradas": c.size,
+            } for method, c in repository_cache.stats().items()]),
+            use_container_width=True, hide_index=True
+        )
+
+    # --- 6. MINIATURAS DAS IMAGENS DE CAPA ---
+    if thumbnail_cache is not None:
+        t = thumbnail_cache.stats()
+        st.markdown("##### Miniaturas das imagens de capa")
+        m1, m2, m3, m4 = st.columns(4)
+        m1.metric("Taxa de acerto", f"{t.hit_ratio:.0%}", help=f"{t.hits} acertos · {t.misses} downloads")
+        m2.metric("Em disco", f"{t.bytes / 1024 / 1024:,.1f} MB",
+                  help=f"{t.files} arquivos · limite {thumbnail_cache.max_bytes / 1024 / 1024:,.0f} MB")
+        m3.metric("Descartes (LRU)", t.evictions)
+        m4.metric("Falhas de download", t.failures)
@@ -2,7 +2,6 @@ import sys
 import os
 import streamlit as st
 import time
-import pandas as pd
 
 # --- CONFIGURAÇÃO DA PÁGINA ---
 st.set_page_config(
@@ -20,34 +19,52 @@ if project_root not in sys.path:
 
 # --- IMPORTS ---
 try:
-    from src.domain.models import EvaluationStatus
-    from src.presentation.streamlit_app.dependencies import get_services
+    from src.domain.models import AuctionFramePage, EvaluationStatus, SearchScope
+    from src.infra.repositories.columnar import auctions_frame
+    from src.presentation.streamlit_app.dependencies import query_monitor, repository_cache, request_services, thumbnail_cache
+    from src.presentation.streamlit_app.page_loader import load_page_data, load_thumbnails, prefetch_thumbnails, submit_task
     # Importa os componentes da Triagem (Antigo)
     from src.presentation.streamlit_app.components import (
         render_sidebar, 
+        get_selected_filters,
         render_dashboard, 
         render_triage_cards
     )
     # Importa a Nova Página
     from src.presentation.streamlit_app.views.carteira import render_carteira
     from src.presentation.streamlit_app.monitoramento import render_monitoramento
+    from src.presentation.streamlit_app.diagnostico import render_diagnostico
     from src.presentation.streamlit_app.styles import load_global_css
 except ImportError as e:
     st.error(f"Erro de Importação: {e}")
     st.stop()
 
+# Tamanho da página da fila de triagem (cards por página)
+TRIAGE_PAGE_SIZE = 15
+
 def main():
     # 0. Carrega Estilos Globais
     load_global_css()
 
-    # 1. Inicializa Serviços
-    services = get_services()
-    
+    # 1. Inicializa Serviços (sessão própria deste rerun, devolvida ao pool ao final)
+    with request_services() as services:
+        _render_app(services)
+
+def _render_app(services):
     # Mock User ID (Em prod viria do Auth)
     if "user_id" not in st.session_state:
         st.session_state["user_id"] = "Julio"
     user_id = st.session_state["user_id"]
 
+    # Inscrição na fila de triagem uma vez por sessão (a carga inicial só acontece no primeiro
+    # acesso do usuário; depois a fila é mantida pelo lado da escrita e as leituras só leem)
+    if st.session_state.get("triage_queue_user") != user_id:
+        services["prepare_triage_queue"].execute(user_id)
+        st.session_state["triage_queue_user"] = user_id
+
+    # Stats da sidebar em paralelo com as leituras da página
+    stats_future = submit_task(lambda s: s["get_stats"].execute(user_id))
+
     # 2. Navegação Lateral (Sidebar Menu)
     with st.sidebar:
         # st.image("https://cdn-icons-png.flaticon.com/512/1055/1055644.png", width=50) # Placeholder Logo
@@ -56,20 +73,13 @@ def main():
         # Menu de Opções
         page = st.radio(
             "Navegação", 
-            ["🔍 Triagem Rápida", "📁 Minha Carteira", "📊 Monitoramento"],
+            ["🔍 Triagem Rápida", "📁 Minha Carteira", "📊 Monitoramento", "🩺 Diagnóstico"],
             index=0
         )
         
         st.divider()
-        # Stats Rápidos na Sidebar
-        # Nota: get_stats pode falhar se a tabela não estiver populada ainda, então usamos try/except silencioso ou mock se preferir
-        try:
-            stats = services["get_stats"].execute(user_id)
-            st.caption("📊 Produtividade Hoje")
-            st.write(f"Analisados: **{stats.get('total_processado', 0)}**")
-            st.write(f"Salvos: **{stats.get('analisar', 0)}**")
-        except:
-            st.caption("Carregando stats...")
+        # Stats Rápidos na Sidebar (preenchidos quando a página terminar de carregar)
+        stats_box = st.container()
 
     # 3. Roteamento de Páginas
     
@@ -85,47 +95,102 @@ def main():
     elif page == "📊 Monitoramento":
         render_monitoramento(services)
 
+    # --- ROTA: DIAGNÓSTICO ---
+    elif page == "🩺 Diagnóstico":
+        render_diagnostico(query_monitor, repository_cache, thumbnail_cache)
+
+    # Nota: get_stats pode falhar se a tabela não estiver populada ainda, então usamos try/except silencioso ou mock se preferir
+    with stats_box:
+        try:
+            stats = stats_future.result()
+            st.caption("📊 Produtividade Hoje")
+            st.write(f"Analisados: **{stats.get('total_processado', 0)}**")
+            st.write(f"Salvos: **{stats.get('analisar', 0)}**")
+        except:
+            st.caption("Carregando stats...")
+
 # =========================================
 # LÓGICA DA PÁGINA DE TRIAGEM (Refatorada)
 # =========================================
 def run_triage_page(services, user_id):
     st.title("🔍 Triagem de Oportunidades")
     
-    # 1. Busca as opções disponíveis no banco primeiro
-    filter_options = services["get_filters"].execute()
-    
-    # 2. Passa as listas explícitas para o render_sidebar
-    # CORREÇÃO AQUI: Passamos os argumentos nomeados corretos
-    filters = render_sidebar(
-        unique_ufs=filter_options.get("ufs", []),
-        unique_cities=filter_options.get("cidades", []),
-        unique_types=filter_options.get("tipos", []),
-        unique_sites=filter_options.get("sites", []),
-        unique_status=filter_options.get("status_imovel", [])
-    )
-    
-    # 3. Busca Leilões com os filtros aplicados
-    # Nota: Lembre-se que agora filters['uf'] retorna uma lista, e o repo já espera lista
-    auctions_data = services["get_auctions"].execute(
-        user_id=user_id,
-        uf=filters.get('uf'),
-        cidade=filters.get('cidade'),
-        tipo_bem=filters.get('tipo_bem'),
-        site=filters.get('site'),
-        status_imovel=filters.get('status_imovel')
-    )
-    
-    # Converte para DataFrame para visualização
-    df_auctions = pd.DataFrame([vars(a) for a in auctions_data]) if auctions_data else pd.DataFrame()
+    # 1. Seleção atual dos filtros (estado do rerun anterior, antes de renderizar a sidebar)
+    filter_kwargs = get_selected_filters()
+    search_query = st.text_input(
+        "🔎 Buscar por título ou ID", key="triage_search", placeholder="ex: apartamento Pinheiros"
+    ).strip()
+
+    # 2. Paginação por cursor: reinicia na primeira página sempre que os filtros ou a busca mudam
+    # (na busca, ordenada por relevância, o "cursor" é o offset da página)
+    filter_signature = repr((search_query, sorted((k, v) for k, v in filter_kwargs.items())))
+    if st.session_state.get("triage_filter_signature") != filter_signature:
+        st.session_state["triage_filter_signature"] = filter_signature
+        st.session_state["triage_cursors"] = [None]  # Pilha de cursores (1ª página = None)
+    cursors = st.session_state["triage_cursors"]
+
+    # 3. Facetas (opções + contagens + total) e página atual em paralelo
+    def page_task(cursor):
+        if search_query:
+            return lambda s: s["search_auctions"].execute(
+                user_id, search_query,
+                scope=SearchScope.TRIAGEM,
+                offset=cursor or 0,
+                page_size=TRIAGE_PAGE_SIZE,
+                **filter_kwargs
+            )
+        return lambda s: s["get_auctions_frame"].execute(
+            user_id=user_id,
+            cursor=cursor,
+            page_size=TRIAGE_PAGE_SIZE,
+            **filter_kwargs
+        )
+    data = load_page_data({
+        "facets": lambda s: s["get_filters"].execute(user_id=user_id, **filter_kwargs),
+        "page": page_task(cursors[-1]),
+    })
+    facets, page = data["facets"], data["page"]
+
+    # 4. Renderiza a sidebar com as opções em cascata (ex: cidades da UF escolhida)
+    render_sidebar(facets)
+
+    # A fila já chega como DataFrame (leitura colunar); a busca devolve Auctions, convertidos aqui
+    df_auctions = auctions_frame(page.items) if search_query else page.frame
+
+    if df_auctions.empty and len(cursors) > 1:
+        # A página atual esvaziou (itens já triados): volta para a anterior
+        cursors.pop()
+        st.rerun()
+    total_pendente = facets.total
 
     # Dashboard Topo
-    render_dashboard(df_auctions)
+    render_dashboard(facets)
     
     st.divider()
 
     # Cards de Triagem
     if not df_auctions.empty:
-        decisions = render_triage_cards(df_auctions)
+        # Capas servidas como miniaturas locais; as da próxima página já são geradas em segundo plano
+        thumbnails = load_thumbnails(df_auctions["imagem_capa"].dropna())
+        if page.has_next:
+            next_page = page_task(page.next_cursor)
+            prefetch_thumbnails(lambda s: _image_urls(next_page(s)))
+        decisions = render_triage_cards(df_auctions, thumbnails)
+
+        # Navegação entre páginas
+        if search_query:
+            st.caption(f"Página {len(cursors)} · {page.total} resultado(s) para \"{search_query}\" · {total_pendente} leilões pendentes")
+        else:
+            st.caption(f"Página {len(cursors)} · {total_pendente} leilões pendentes")
+        col_prev, _, col_next = st.columns([1, 3, 1])
+        with col_prev:
+            if st.button("⬅️ Anterior", disabled=len(cursors) == 1, use_container_width=True):
+                cursors.pop()
+                st.rerun()
+        with col_next:
+            if st.button("Próxima ➡️", disabled=not page.has_next, use_container_width=True):
+                cursors.append(page.next_cursor)
+                st.rerun()
 
         # Botão Flutuante/Fixo de Ação
         if decisions:
@@ -138,6 +203,12 @@ def run_triage_page(services, user_id):
     else:
         st.info("Nenhum leilão encontrado com estes filtros.")
 
+def _image_urls(page):
+    """URLs das imagens de capa de uma página da triagem (fila em DataFrame ou resultados da busca)."""
+    if isinstance(page, AuctionFramePage):
+        return page.frame["imagem_capa"].dropna().tolist()
+    return [auction.imagem_capa for auction in page.items if auction.imagem_capa]
+
 def _process_batch(services, decisions_dict):
     try:
         to_analyze = []
@@ -153,13 +224,17 @@ def _process_batch(services, decisions_dict):
 
         user_id = st.session_state["user_id"]
 
+        skipped = []
         if to_discard:
-            services["submit_eval"].execute(user_id, to_discard, EvaluationStatus.DESCARTAR)
+            skipped += services["submit_eval"].execute(user_id, to_discard, EvaluationStatus.DESCARTAR).skipped
         
         if to_analyze:
-            services["submit_eval"].execute(user_id, to_analyze, EvaluationStatus.ANALISAR)
+            skipped += services["submit_eval"].execute(user_id, to_analyze, EvaluationStatus.ANALISAR).skipped
 
         st.toast("🚀 Decisões salvas com sucesso!", icon="✅")
+        if skipped:
+            ids = ", ".join(id_leilao for _, id_leilao in skipped)
+            st.toast(f"{len(skipped)} item(ns) ignorado(s) por não existirem na base: {ids}", icon="⚠️")
         
         # Limpa o session state das decisões antigas
         for key in list(st.session_state.keys()):
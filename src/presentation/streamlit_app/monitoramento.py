@@ -1,7 +1,12 @@
+import math
 import streamlit as st
 import pandas as pd
 import plotly.express as px
 from datetime import datetime, timedelta
+from src.presentation.streamlit_app.page_loader import load_page_data
+
+# Linhas por página da tabela de dados brutos
+RAW_RUNS_PAGE_SIZE = 100
 
 def render_monitoramento(services):
     """
@@ -26,44 +31,45 @@ def render_monitoramento(services):
         selected_sources = c3.multiselect("Fontes (Scrapers)", options=all_sources, default=all_sources)
         selected_statuses = c4.multiselect("Status", options=all_statuses, default=all_statuses)
 
-    # --- 2. BUSCA DE DADOS ---
+    # --- 2. BUSCA DE DADOS (agregados calculados no banco) ---
+    filters = dict(
+        start_date=start_date,
+        end_date=end_date,
+        sources=selected_sources,
+        statuses=selected_statuses
+    )
+    # Controles do histórico de latência têm key: o valor atual já está no session_state
+    latency_params = dict(
+        granularity=st.session_state.get("mon_lat_gran", "day"),
+        combine_sources=st.session_state.get("mon_lat_combine", False)
+    )
     try:
-        runs_data = services['get_scraper_runs'].execute(
-            start_date=start_date,
-            end_date=end_date,
-            sources=selected_sources,
-            statuses=selected_statuses
-        )
-        df = pd.DataFrame([vars(r) for r in runs_data])
+        # KPIs/gráficos e histórico de latência são independentes: carregados em paralelo
+        data = load_page_data({
+            "stats": lambda s: s['get_scraper_run_stats'].execute(**filters),
+            "latency": lambda s: s['get_scraper_latency_history'].execute(
+                start_date=start_date, end_date=end_date, sources=selected_sources, **latency_params
+            ),
+        })
     except Exception as e:
         st.error(f"Erro ao buscar dados das execuções: {e}")
         return
+    stats = data["stats"]
 
-    if df.empty:
+    if stats.total_runs == 0:
         st.info("Nenhuma execução encontrada para os filtros selecionados.")
         return
 
-    # Conversão de tipos para análise
-    df['execution_start_time'] = pd.to_datetime(df['execution_start_time'])
-    df['date'] = df['execution_start_time'].dt.date
-
     # --- 3. KPIs ---
     st.markdown("---")
     st.markdown("#### Indicadores do Período")
-    
-    total_runs = len(df)
-    success_runs = df[df['run_status'] == 'SUCCESS'].shape[0]
-    success_rate = (success_runs / total_runs * 100) if total_runs > 0 else 0
-    total_collected = df['raw_items_collected'].sum()
-    total_mapped = df['mapped_items_count'].sum()
-    avg_duration = df[df['run_status'] == 'SUCCESS']['duration_seconds'].mean()
 
     kpi_cols = st.columns(5)
-    kpi_cols[0].metric("Total de Execuções", f"{total_runs}")
-    kpi_cols[1].metric("Taxa de Sucesso", f"{success_rate:.1f}%")
-    kpi_cols[2].metric("Itens Coletados", f"{int(total_collected)}")
-    kpi_cols[3].metric("Itens Mapeados", f"{int(total_mapped)}")
-    kpi_cols[4].metric("Duração Média (s)", f"{avg_duration:.2f}" if not pd.isna(avg_duration) else "N/A")
+    kpi_cols[0].metric("Total de Execuções", f"{stats.total_runs}")
+    kpi_cols[1].metric("Taxa de Sucesso", f"{stats.success_rate:.1f}%")
+    kpi_cols[2].metric("Itens Coletados", f"{stats.total_collected}")
+    kpi_cols[3].metric("Itens Mapeados", f"{stats.total_mapped}")
+    kpi_cols[4].metric("Duração Média (s)", f"{stats.avg_duration_success:.2f}" if stats.avg_duration_success is not None else "N/A")
 
     # --- 4. GRÁFICOS ---
     st.markdown("---")
@@ -73,7 +79,10 @@ def render_monitoramento(services):
 
     with chart_cols[0]:
         st.markdown("##### Execuções por Dia e Status")
-        runs_by_day = df.groupby(['date', 'run_status']).size().reset_index(name='count')
+        runs_by_day = pd.DataFrame(
+            [(b.dia, b.run_status, b.total) for b in stats.daily],
+            columns=['date', 'run_status', 'count']
+        )
         fig_runs = px.bar(runs_by_day, x='date', y='count', color='run_status',
                           title="Volume de Execuções Diárias",
                           labels={'date': 'Data', 'count': 'Nº de Execuções'},
@@ -82,7 +91,7 @@ def render_monitoramento(services):
 
     with chart_cols[1]:
         st.markdown("##### Itens Coletados vs. Mapeados por Fonte")
-        items_by_source = df.groupby('source_name')[['raw_items_collected', 'mapped_items_count']].sum().reset_index()
+        items_by_source = pd.DataFrame([vars(s) for s in stats.by_source])
         items_by_source = items_by_source.melt(id_vars='source_name', var_name='tipo', value_name='quantidade')
         
         fig_items = px.bar(items_by_source, x='source_name', y='quantidade', color='tipo', barmode='group',
@@ -91,17 +100,75 @@ def render_monitoramento(services):
                            color_discrete_map={'raw_items_collected': '#1f77b4', 'mapped_items_count': '#ff7f0e'})
         st.plotly_chart(fig_items, use_container_width=True)
 
-    # --- 5. TABELA DE DADOS ---
+    # --- 5. LATÊNCIA (rollup por hora/dia, não lê scraper_runs) ---
+    st.markdown("---")
+    st.markdown("#### Latência e Falhas por Fonte")
+    _render_latency_history(data["latency"])
+
+    # --- 6. TABELA DE DADOS ---
     st.markdown("---")
     st.markdown("#### Detalhes das Execuções")
-    
-    with st.expander("Clique para ver a tabela de dados brutos"):
-        st.dataframe(df[[
-            'execution_start_time',
-            'source_name',
-            'run_status',
-            'duration_seconds',
-            'raw_items_collected',
-            'mapped_items_count',
-            'error_details'
-        ]].sort_values(by='execution_start_time', ascending=False), use_container_width=True)
\ No newline at end of file
+
+    # As linhas brutas só são buscadas quando o usuário pede, e uma página por vez
+    if st.toggle("Exibir tabela de dados brutos", key="mon_show_raw"):
+        _render_raw_runs(services, filters, stats.total_runs)
+
+def _render_latency_history(buckets):
+    """Séries de latência média, p95 estimado e taxa de falha a partir do rollup."""
+    c1, c2 = st.columns([1, 3])
+    c1.radio("Agrupar por", options=["day", "hour"], horizontal=True,
+             format_func=lambda g: "Dia" if g == "day" else "Hora", key="mon_lat_gran")
+    c2.checkbox("Somar todas as fontes em uma série", value=False, key="mon_lat_combine")
+
+    if not buckets:
+        st.info("Sem execuções concluídas no período para montar o histórico "
+                "(o rollup é atualizado pelo job fold-scraper-runs).")
+        return
+
+    df_lat = pd.DataFrame([
+        {
+            "bucket": b.bucket_start,
+            "source_name": b.source_name,
+            "latencia_media_ms": b.avg_latency_ms,
+            "p95_estimado_ms": b.p95_percentile_ms(),
+            "taxa_falha_pct": b.failure_ratio * 100,
+        }
+        for b in buckets
+    ])
+
+    chart_cols = st.columns(2)
+    with chart_cols[0]:
+        df_ms = df_lat.melt(id_vars=["bucket", "source_name"], value_vars=["latencia_media_ms", "p95_estimado_ms"],
+                            var_name="metrica", value_name="ms")
+        fig_lat = px.line(df_ms, x="bucket", y="ms", color="source_name", line_dash="metrica", markers=True,
+                          title="Latência Média (ponderada) e p95 Estimado",
+                          labels={"bucket": "Período", "source_name": "Fonte", "metrica": "Métrica"})
+        st.plotly_chart(fig_lat, use_container_width=True)
+    with chart_cols[1]:
+        fig_fail = px.line(df_lat, x="bucket", y="taxa_falha_pct", color="source_name", markers=True,
+                           title="Taxa de Falha das Requisições (%)",
+                           labels={"bucket": "Período", "taxa_falha_pct": "%", "source_name": "Fonte"})
+        st.plotly_chart(fig_fail, use_container_width=True)
+
+def _render_raw_runs(services, filters, total_runs):
+    """Tabela paginada das execuções (mais recentes primeiro)."""
+    total_pages = max(1, math.ceil(total_runs / RAW_RUNS_PAGE_SIZE))
+    page = st.number_input(
+        f"Página (de {total_pages})", min_value=1, max_value=total_pages, value=1, step=1, key="mon_raw_page"
+    )
+    df = services['get_scraper_runs_frame'].execute(
+        **filters, limit=RAW_RUNS_PAGE_SIZE, offset=(page - 1) * RAW_RUNS_PAGE_SIZE
+    )
+    if df.empty:
+        st.info("Nenhuma execução nesta página.")
+        return
+
+    st.dataframe(df[[
+        'execution_start_time',
+        'source_name',
+        'run_status',
+        'duration_seconds',
+        'raw_items_collected',
+        'mapped_items_count',
+        'error_details'
+    ]], use_container_width=True)
@@ -0,0 +1,79 @@
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable
+
+from src.infra.database.config import pool_capacity
+from src.presentation.streamlit_app.dependencies import request_services, thumbnail_cache
+
+# Uma tarefa recebe o dicionário de serviços (com sessão própria) e devolve o dado da página
+PageTask = Callable[[dict], Any]
+
+
+# Espera máxima (s) pelas miniaturas que faltam numa página: as demais continuam sendo
+# geradas em segundo plano e aparecem no próximo rerun (até lá, o card usa a URL original)
+THUMBNAIL_WAIT_SECONDS = 1.5
+
+
+def _max_workers(env=None) -> int:
+    """
+    Threads do pool de leituras, derivadas do pool do banco: cada tarefa ocupa uma conexão,
+    e metade da capacidade (DB_POOL_SIZE + DB_MAX_OVERFLOW) fica reservada para as sessões
+    do script de cada rerun. PAGE_LOADER_MAX_WORKERS ajusta o valor, sem passar desse limite.
+    """
+    env = os.environ if env is None else env
+    limit = max(1, pool_capacity(env) // 2)
+    value = env.get("PAGE_LOADER_MAX_WORKERS")
+    return min(int(value), limit) if value else limit
+
+
+# Pool compartilhado por todas as sessões do Streamlit, dimensionado pelo pool do banco:
+# as leituras paralelas das páginas nunca esgotam as conexões das sessões do script.
+# As tarefas só leem (a fila de triagem é mantida na escrita), então facetas, página e
+# prefetch da próxima página de várias sessões podem rodar juntas sem disputar locks.
+_executor = ThreadPoolExecutor(max_workers=_max_workers(), thread_name_prefix="page-loader")
+
+
+def _run(task: PageTask) -> Any:
+    # Sessões do SQLAlchemy não são thread-safe: cada tarefa pega a sua do pool
+    with request_services() as services:
+        return task(services)
+
+
+def submit_task(task: PageTask) -> Future:
+    """
+    Agenda uma leitura independente e devolve o Future.
+    As tarefas não devem chamar `st.*` (rodam fora da thread do script).
+    """
+    return _executor.submit(_run, task)
+
+
+def load_page_data(tasks: Dict[str, PageTask]) -> Dict[str, Any]:
+    """
+    Executa as leituras independentes de uma página em paralelo e aguarda todas.
+    A latência passa a ser a da leitura mais lenta, não a soma delas.
+    Exceções de uma tarefa são relançadas aqui, na thread do script.
+    """
+    futures = {name: submit_task(task) for name, task in tasks.items()}
+    return {name: future.result() for name, future in futures.items()}
+
+
+def load_thumbnails(urls: Iterable[str]) -> Dict[str, bytes]:
+    """Miniaturas (JPEG) das imagens de capa de uma página, por URL; vazio se o cache estiver desligado."""
+    if thumbnail_cache is None:
+        return {}
+    return thumbnail_cache.get_many(urls, timeout=THUMBNAIL_WAIT_SECONDS)
+
+
+def prefetch_thumbnails(task: PageTask) -> None:
+    """
+    Gera em segundo plano as miniaturas de uma página que ainda não foi exibida (ex: a próxima
+    da triagem), para que a navegação já as encontre prontas. `task` devolve as URLs das imagens.
+    """
+    if thumbnail_cache is None:
+        return
+
+    def _prefetch(future: Future) -> None:
+        if future.exception() is None:
+            thumbnail_cache.prefetch(future.result())
+
+    submit_task(task).add_done_callback(_prefetch)
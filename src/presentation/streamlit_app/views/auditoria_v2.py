@@ -9,6 +9,9 @@ from src.domain.isj_calculator import IsjCalculator
 from src.presentation.streamlit_app.components.alertas_engine import AlertasEngine
 from src.presentation.streamlit_app.components.isj_gauge import render_isj_gauge
 
+# Chave do snapshot da auditoria aberta (cabeçalho do leilão + análise do usuário)
+SNAPSHOT_KEY = "auditoria_snapshot"
+
 
 def render_auditoria_v2(services, user_id: str, site: str, id_leilao: str):
     """
@@ -16,21 +19,14 @@ def render_auditoria_v2(services, user_id: str, site: str, id_leilao: str):
     Integração completa com regras de domínio, validação de nulidades e persistência.
     """
     
-    # 1. Carregamento Inicial (Singleton no Session State)
-    if "current_analysis" not in st.session_state or \
-       st.session_state.current_analysis.id_leilao != id_leilao or \
-       st.session_state.current_analysis.site != site:
-        
-        analysis = services['repository'].get_detailed_analysis(site, id_leilao, user_id)
-        if not analysis:
-            analysis = DetailedAnalysis(site=site, id_leilao=id_leilao, usuario_id=user_id)
-        st.session_state.current_analysis = analysis
+    # 1. Carregamento Inicial (Snapshot no Session State: reruns do formulário não leem o banco)
+    snapshot = _load_snapshot(services, user_id, site, id_leilao)
     if "show_nobid_dialog" not in st.session_state:
         st.session_state.show_nobid_dialog = False
 
     # Referência local para facilitar leitura
-    analysis = st.session_state.current_analysis
-    auction_data = services['repository'].get_auction(site, id_leilao)
+    analysis = snapshot.analysis
+    auction_data = snapshot.auction
     
     # Helpers de UI (Definidos localmente para manter contexto)
     def map_na_option(choice):
@@ -406,11 +402,13 @@ def render_auditoria_v2(services, user_id: str, site: str, id_leilao: str):
         with col_btn1:
             if st.button("💾 Salvar", use_container_width=True, key="k_btn_save"):
                  services['save_rascunho'].execute(analysis)
+                 invalidate_auditoria_snapshot()
                  st.toast("Rascunho salvo com sucesso!", icon="💾")
 
         with col_btn2:
             if st.button("🚀 Finalizar", type="primary", disabled=bloqueado, use_container_width=True, key="k_btn_fin"):
                 services['finalizar_auditoria'].execute(analysis,user_id)
+                invalidate_auditoria_snapshot()
                 st.balloons()
                 st.success("Auditoria finalizada!")
                 # Idealmente redirecionar ou limpar estado aqui
@@ -433,6 +431,20 @@ def render_auditoria_v2(services, user_id: str, site: str, id_leilao: str):
         pass # Falhas silenciosas no autosave não devem travar a UI
 
 
+def _load_snapshot(services, user_id: str, site: str, id_leilao: str):
+    """Retorna o snapshot (cabeçalho + análise) da sessão, lendo do banco só ao trocar de leilão."""
+    cached = st.session_state.get(SNAPSHOT_KEY)
+    key = (user_id, site, id_leilao)
+    if cached is None or cached["key"] != key:
+        cached = {"key": key, "snapshot": services['get_auditoria_snapshot'].execute(user_id, site, id_leilao)}
+        st.session_state[SNAPSHOT_KEY] = cached
+    return cached["snapshot"]
+
+def invalidate_auditoria_snapshot():
+    """Força a releitura do snapshot no próximo rerun (após salvar ou corrigir dados do leilão)."""
+    st.session_state.pop(SNAPSHOT_KEY, None)
+
+
 @st.dialog("✏️ Editar Dados do Leilão")
 def _render_edit_auction_modal(services, auction_data):
     """Modal para edição rápida dos dados básicos do leilão durante a auditoria."""
@@ -496,6 +508,7 @@ def _render_edit_auction_modal(services, auction_data):
                 auction_data.id_leilao, 
                 updates
             )
+            invalidate_auditoria_snapshot()
             
             st.success("✅ Dados corrigidos com sucesso!")
             st.session_state.show_edit_modal = False
@@ -539,8 +552,7 @@ def _render_nobid_dialog(services, analysis: DetailedAnalysis, user_id: str):
             services['descartar_auditoria'].execute(analysis, user_id)
             st.warning("Auditoria descartada e leilão rejeitado.", icon="🗑️")
 
-            if "current_analysis" in st.session_state:
-                del st.session_state.current_analysis
+            invalidate_auditoria_snapshot()
             st.session_state.show_nobid_dialog = False
 
             import time
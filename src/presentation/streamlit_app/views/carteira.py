@@ -2,9 +2,25 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 
+from dataclasses import replace
 from datetime import datetime, time
-from src.presentation.streamlit_app.views.auditoria_v2 import render_auditoria_v2
-from src.domain.models import EvaluationStatus, NoBidReason
+from src.presentation.streamlit_app.views.auditoria_v2 import render_auditoria_v2, invalidate_auditoria_snapshot
+from src.domain.models import EvaluationStatus, NoBidReason, PortfolioQuery, PortfolioSort, SearchScope
+from src.presentation.streamlit_app.page_loader import load_page_data, load_thumbnails
+
+# Leilões por página em cada aba
+PORTFOLIO_PAGE_SIZE = 20
+
+# Status de cada aba
+ANALISAR_STATUSES = [EvaluationStatus.ANALISAR.value]
+PARTICIPAR_STATUSES = [EvaluationStatus.PARTICIPAR.value]
+FINALIZADOS_STATUSES = [EvaluationStatus.NO_BID.value, EvaluationStatus.OUTBID.value]
+
+SORT_LABELS = {
+    PortfolioSort.DATA_2_PRACA: "Data da 2ª praça",
+    PortfolioSort.DATA_ORDENACAO: "Data do leilão (última praça)",
+    PortfolioSort.MAIOR_VALOR: "Maior valor (2ª praça)",
+}
 
 def render_carteira(services, user_id):
     """
@@ -45,141 +61,143 @@ def render_carteira(services, user_id):
 
 def _render_portfolio_list(services, user_id):
     """Renderiza a listagem segmentada por abas."""
-    # Garante que temos o caso de uso correto
-    all_items = services["get_portfolio_auctions"].execute(user_id)
-
-    # Calcula o valor máximo para o slider de forma dinâmica
-    all_values = [i.valor_2_praca for i in all_items if i.valor_2_praca and i.valor_2_praca > 0]
-    max_slider_value = int(max(all_values)) if all_values else 1000000
+    # Badges, escala do filtro de valor e indicadores dos Finalizados: agregados no banco, sem
+    # carregar os leilões. Roda no page loader, em paralelo com as demais leituras do rerun (stats da sidebar)
+    data = load_page_data({
+        "summary": lambda s: s["get_portfolio_summary"].execute(user_id),
+        "indicadores": lambda s: s["get_finalizados_indicators"].execute(user_id),
+    })
+    summary = data["summary"]
 
-    # Categorização baseada no EvaluationStatus
-    items_analisar = [i for i in all_items if i.status_carteira == 'ANALISAR']
-    items_participar = [i for i in all_items if i.status_carteira == 'PARTICIPAR']
-    items_finalizados = [i for i in all_items if i.status_carteira in ('NO_BID', 'OUTBID')]
+    # Valor máximo do slider de forma dinâmica
+    max_slider_value = int(summary.max_valor_2_praca) or 1000000
 
     tabs = st.tabs([
-        f"📥 A Analisar ({len(items_analisar)})",
-        f"🚀 Participar ({len(items_participar)})",
-        f"🏁 Finalizados ({len(items_finalizados)})"
+        f"📥 A Analisar ({summary.count(ANALISAR_STATUSES)})",
+        f"🚀 Participar ({summary.count(PARTICIPAR_STATUSES)})",
+        f"🏁 Finalizados ({summary.count(FINALIZADOS_STATUSES)})"
     ])
 
     with tabs[0]:
-        if not items_analisar:
+        if not summary.count(ANALISAR_STATUSES):
             st.info("Sua esteira de análise está vazia.")
         else:
             with st.container(border=True):
                 filters = _render_filters("analisar", max_slider_value, allow_sorting=True)
 
-            filtered_items = _apply_filters(items_analisar, filters, max_slider_value)
-            st.caption(f"Exibindo {len(filtered_items)} de {len(items_analisar)} leilões.")
-
-            for auction in filtered_items:
-                _render_card(auction, suffix="analisar")
+            items = _load_tab_items(services, user_id, "analisar", ANALISAR_STATUSES, filters, summary, max_slider_value)
+            thumbnails = _load_thumbnails(items)
+            for auction in items:
+                _render_card(auction, suffix="analisar", thumbnail=thumbnails.get(auction.imagem_capa))
 
     with tabs[1]:
-        if not items_participar:
+        if not summary.count(PARTICIPAR_STATUSES):
             st.info("Nenhum leilão na fase de participação.")
         else:
             with st.container(border=True):
                 filters = _render_filters("participar", max_slider_value, allow_sorting=True)
 
-            filtered_items = _apply_filters(items_participar, filters, max_slider_value)
-            st.caption(f"Exibindo {len(filtered_items)} de {len(items_participar)} leilões.")
+            items = _load_tab_items(services, user_id, "participar", PARTICIPAR_STATUSES, filters, summary, max_slider_value)
+            _render_bulk_outbid(items, services, user_id)
 
-            for auction in filtered_items:
-                _render_card(auction, suffix="participar", is_participating=True, services=services, user_id=user_id)
+            thumbnails = _load_thumbnails(items)
+            for auction in items:
+                _render_card(auction, suffix="participar", is_participating=True, services=services, user_id=user_id,
+                             thumbnail=thumbnails.get(auction.imagem_capa))
 
     with tabs[2]:
-        if not items_finalizados:
+        if not summary.count(FINALIZADOS_STATUSES):
             st.info("Nenhum leilão finalizado (descartado ou com disputa perdida).")
         else:
-            # --- INÍCIO DA SEÇÃO DE INDICADORES ---
-            df_finalizados = pd.DataFrame([vars(a) for a in items_finalizados])
-
-            with st.container(border=True):
-                st.markdown("#### 📊 Painel de Análise de Desempenho")
-                
-                # 1. KPIs
-                total_finalizados = len(df_finalizados)
-                no_bid_count = df_finalizados[df_finalizados['status_carteira'] == 'NO_BID'].shape[0]
-                outbid_count = df_finalizados[df_finalizados['status_carteira'] == 'OUTBID'].shape[0]
-                
-                taxa_no_bid = (no_bid_count / total_finalizados * 100) if total_finalizados > 0 else 0
-                taxa_outbid = (outbid_count / total_finalizados * 100) if total_finalizados > 0 else 0
-                
-                capital_evitado_series = df_finalizados.loc[df_finalizados['status_carteira'] == 'NO_BID', 'valor_2_praca']
-                capital_evitado = pd.to_numeric(capital_evitado_series, errors='coerce').sum()
-
-                kpi_cols = st.columns(4)
-                kpi_cols[0].metric("Total Finalizados", f"{total_finalizados}")
-                kpi_cols[1].metric("Taxa de 'NO BID'", f"{taxa_no_bid:.1f}%")
-                kpi_cols[2].metric("Taxa de 'OUTBID'", f"{taxa_outbid:.1f}%")
-                kpi_cols[3].metric("Capital Evitado", f"R$ {capital_evitado/1_000_000:.2f}M")
-
-                st.divider()
-
-                # 2. Gráficos
-                chart_cols = st.columns(2)
-                with chart_cols[0]:
-                    st.markdown("##### Motivos de Descarte ('NO BID')")
-                    
-                    def get_reason_display_name(reason):
-                        if hasattr(reason, 'value'): return reason.value
-                        elif isinstance(reason, str) and reason: return reason
-                        return "Não especificado"
-
-                    df_nobid = df_finalizados[df_finalizados['status_carteira'] == 'NO_BID'].copy()
-                    if not df_nobid.empty:
-                        df_nobid['no_bid_reason_str'] = df_nobid['no_bid_reason'].apply(get_reason_display_name)
-                        reason_counts = df_nobid['no_bid_reason_str'].value_counts().reset_index()
-                        reason_counts.columns = ['Motivo', 'Quantidade']
-
-                        # Filtra a categoria "Não especificado" para um gráfico mais limpo
-                        reason_counts = reason_counts[reason_counts['Motivo'] != 'Não especificado']
-
-                        if not reason_counts.empty:
-                            fig_reasons = px.pie(
-                                reason_counts,
-                                names='Motivo',
-                                values='Quantidade',
-                                hole=0.4,
-                                color_discrete_sequence=px.colors.qualitative.Pastel
-                            )
-                            fig_reasons.update_layout(height=350, margin=dict(l=20, r=20, t=5, b=20), showlegend=True)
-                            st.plotly_chart(fig_reasons, use_container_width=True)
-                        else:
-                            st.caption("Nenhum motivo de descarte foi especificado.")
-                    else:
-                        st.caption("Nenhum leilão 'NO BID' registrado.")
-
-                with chart_cols[1]:
-                    st.markdown("##### Status dos Finalizados")
-                    if not df_finalizados.empty:
-                        status_counts = df_finalizados['status_carteira'].value_counts().reset_index()
-                        status_counts.columns = ['Status', 'Quantidade']
-                        fig_status = px.pie(status_counts, names='Status', values='Quantidade', hole=0.4, color_discrete_map={'NO_BID': '#EF553B', 'OUTBID': '#636EFA'})
-                        fig_status.update_layout(height=350, margin=dict(l=20, r=20, t=5, b=20))
-                        st.plotly_chart(fig_status, use_container_width=True)
-            
+            _render_finalizados_indicators(data["indicadores"])
             st.divider()
-            # --- FIM DA SEÇÃO DE INDICADORES ---
 
             with st.container(border=True):
                 reason_options = [reason.value for reason in NoBidReason]
-                status_options = ['NO_BID', 'OUTBID']
                 filters = _render_filters(
                     "descartados", 
                     max_slider_value, 
                     allow_sorting=False, 
                     no_bid_reason_options=reason_options,
-                    status_options=status_options
+                    status_options=FINALIZADOS_STATUSES
                 )
 
-            filtered_items = _apply_filters(items_finalizados, filters, max_slider_value)
-            st.caption(f"Exibindo {len(filtered_items)} de {len(items_finalizados)} leilões.")
+            items = _load_tab_items(services, user_id, "descartados", FINALIZADOS_STATUSES, filters, summary, max_slider_value)
+            thumbnails = _load_thumbnails(items)
+            for auction in items:
+                _render_card(auction, suffix="finalizado", is_readonly=True, thumbnail=thumbnails.get(auction.imagem_capa))
 
-            for auction in filtered_items:
-                _render_card(auction, suffix="finalizado", is_readonly=True)
+
+def _render_finalizados_indicators(indicators):
+    """Painel de Análise de Desempenho da aba Finalizados (KPIs e gráficos)."""
+    status_colors = {'NO_BID': '#EF553B', 'OUTBID': '#636EFA'}
+
+    with st.container(border=True):
+        st.markdown("#### 📊 Painel de Análise de Desempenho")
+
+        # 1. KPIs
+        kpi_cols = st.columns(4)
+        kpi_cols[0].metric("Total Finalizados", f"{indicators.total}")
+        kpi_cols[1].metric("Taxa de 'NO BID'", f"{indicators.taxa_no_bid:.1f}%")
+        kpi_cols[2].metric("Taxa de 'OUTBID'", f"{indicators.taxa_outbid:.1f}%")
+        kpi_cols[3].metric("Capital Evitado", f"R$ {indicators.capital_evitado/1_000_000:.2f}M")
+
+        st.divider()
+
+        # 2. Gráficos
+        chart_cols = st.columns(2)
+        with chart_cols[0]:
+            st.markdown("##### Motivos de Descarte ('NO BID')")
+            # Motivo não informado fica fora do gráfico
+            reason_counts = pd.DataFrame(
+                [(r.reason, r.total) for r in indicators.by_reason if r.reason],
+                columns=['Motivo', 'Quantidade']
+            )
+            if not indicators.no_bid:
+                st.caption("Nenhum leilão 'NO BID' registrado.")
+            elif reason_counts.empty:
+                st.caption("Nenhum motivo de descarte foi especificado.")
+            else:
+                fig_reasons = px.pie(
+                    reason_counts,
+                    names='Motivo',
+                    values='Quantidade',
+                    hole=0.4,
+                    color_discrete_sequence=px.colors.qualitative.Pastel
+                )
+                fig_reasons.update_layout(height=350, margin=dict(l=20, r=20, t=5, b=20), showlegend=True)
+                st.plotly_chart(fig_reasons, use_container_width=True)
+
+        with chart_cols[1]:
+            st.markdown("##### Status dos Finalizados")
+            status_counts = pd.DataFrame(
+                [(status, total) for status, total in (('NO_BID', indicators.no_bid), ('OUTBID', indicators.outbid)) if total],
+                columns=['Status', 'Quantidade']
+            )
+            fig_status = px.pie(status_counts, names='Status', values='Quantidade', hole=0.4, color='Status', color_discrete_map=status_colors)
+            fig_status.update_layout(height=350, margin=dict(l=20, r=20, t=5, b=20))
+            st.plotly_chart(fig_status, use_container_width=True)
+
+        chart_cols = st.columns(2)
+        with chart_cols[0]:
+            st.markdown("##### Finalizados por Estado (UF)")
+            by_uf = pd.DataFrame(
+                [(b.uf or "N/D", b.status, b.total) for b in indicators.by_uf],
+                columns=['UF', 'Status', 'Quantidade']
+            )
+            fig_uf = px.bar(by_uf, x='UF', y='Quantidade', color='Status', color_discrete_map=status_colors)
+            fig_uf.update_layout(height=350, margin=dict(l=20, r=20, t=5, b=20))
+            st.plotly_chart(fig_uf, use_container_width=True)
+
+        with chart_cols[1]:
+            st.markdown("##### Finalizados por Mês")
+            monthly = pd.DataFrame(
+                [(b.mes, b.status, b.total) for b in indicators.monthly],
+                columns=['Mês', 'Status', 'Quantidade']
+            )
+            fig_monthly = px.bar(monthly, x='Mês', y='Quantidade', color='Status', color_discrete_map=status_colors)
+            fig_monthly.update_layout(height=350, margin=dict(l=20, r=20, t=5, b=20))
+            st.plotly_chart(fig_monthly, use_container_width=True)
 
 
 def _render_filters(prefix: str, max_value: int, allow_sorting: bool = True, no_bid_reason_options: list = None, status_options: list = None):
@@ -206,7 +224,13 @@ def _render_filters(prefix: str, max_value: int, allow_sorting: bool = True, no_
 
     with c2:
         if allow_sorting:
-            filters['sort_date'] = st.checkbox("Ordenar por data do leilão", value=True, key=f"sort_{prefix}")
+            filters['sort'] = st.selectbox(
+                "Ordenar por",
+                options=list(SORT_LABELS),
+                index=list(SORT_LABELS).index(PortfolioSort.DATA_2_PRACA),
+                format_func=SORT_LABELS.get,
+                key=f"sort_{prefix}"
+            )
     
     # Slider fora das colunas para ocupar a largura total
         min_val, max_val = st.slider(
@@ -224,53 +248,118 @@ def _render_filters(prefix: str, max_value: int, allow_sorting: bool = True, no_
     return filters
 
 
-def _apply_filters(items, filters, max_slider_value):
-    """Aplica os filtros a uma lista de leilões."""
-    filtered = items
+def _portfolio_query(filters, tab_statuses, max_slider_value):
+    """Converte os filtros da aba em PortfolioQuery (slider no limite = sem filtro de valor)."""
+    return PortfolioQuery(
+        statuses=filters.get('statuses') or list(tab_statuses),
+        min_valor=filters['min_val'] if filters['min_val'] > 0 else None,
+        max_valor=filters['max_val'] if filters['max_val'] < max_slider_value else None,
+        no_bid_reasons=filters.get('no_bid_reasons') or None,
+        sort=filters.get('sort', PortfolioSort.DATA_ORDENACAO),
+        page_size=PORTFOLIO_PAGE_SIZE
+    )
 
-    search_term = filters.get('search', '').lower()
+
+def _load_tab_items(services, user_id, prefix, tab_statuses, filters, summary, max_slider_value):
+    """
+    Itens a exibir na aba: a página atual dos resultados da busca textual (por relevância) ou
+    da listagem, com filtros, ordenação e paginação executados no banco.
+    """
+    query = _portfolio_query(filters, tab_statuses, max_slider_value)
+    search_term = (filters.get('search') or "").strip()
     if search_term:
-        filtered = [i for i in filtered if
-                    (i.titulo and search_term in i.titulo.lower()) or
-                    (i.id_leilao and search_term in i.id_leilao.lower())]
+        return _load_search_page(services, user_id, prefix, search_term, query)
+
+    # Paginação por cursor: reinicia na primeira página sempre que os filtros da aba mudam
+    signature = repr(query)
+    if st.session_state.get(f"portfolio_signature_{prefix}") != signature:
+        st.session_state[f"portfolio_signature_{prefix}"] = signature
+        st.session_state[f"portfolio_cursors_{prefix}"] = [None]  # Pilha de cursores (1ª página = None)
+    cursors = st.session_state[f"portfolio_cursors_{prefix}"]
+
+    page_query = replace(query, cursor=cursors[-1])
+    tasks = {"page": lambda s: s["get_portfolio_page"].execute(user_id, page_query)}
+    filtered = (set(query.statuses) != set(tab_statuses) or query.min_valor is not None
+                or query.max_valor is not None or query.no_bid_reasons)
+    if filtered:
+        # Total com os filtros da aba (sem filtros, é o badge da aba)
+        tasks["summary"] = lambda s: s["get_portfolio_summary"].execute(user_id, query)
+    data = load_page_data(tasks)
+    page = data["page"]
+    total = data["summary"].total if filtered else summary.count(tab_statuses)
+
+    if not page.items and len(cursors) > 1:
+        # A página atual esvaziou (itens mudaram de aba): volta para a anterior
+        cursors.pop()
+        st.rerun()
 
-    selected_reasons = filters.get('no_bid_reasons')
-    if selected_reasons:
-        def get_reason_value(reason):
-            if isinstance(reason, NoBidReason):
-                return reason.value
-            return reason
+    st.caption(f"Página {len(cursors)} · Exibindo {len(page.items)} de {total} leilões.")
+    if len(cursors) > 1 or page.has_next:
+        col_prev, _, col_next = st.columns([1, 3, 1])
+        with col_prev:
+            if st.button("⬅️ Anterior", disabled=len(cursors) == 1, use_container_width=True, key=f"prev_{prefix}"):
+                cursors.pop()
+                st.rerun()
+        with col_next:
+            if st.button("Próxima ➡️", disabled=not page.has_next, use_container_width=True, key=f"next_{prefix}"):
+                cursors.append(page.next_cursor)
+                st.rerun()
+    return page.items
 
-        filtered = [
-            i for i in filtered if
-            i.no_bid_reason and get_reason_value(i.no_bid_reason) in selected_reasons
-        ]
 
-    selected_statuses = filters.get('statuses')
-    if selected_statuses:
-        filtered = [i for i in filtered if i.status_carteira in selected_statuses]
+def _load_search_page(services, user_id, prefix, search_term, query):
+    """
+    Página da busca textual (no banco, com índices) nos itens da carteira, por relevância,
+    com os mesmos filtros da listagem da aba (status, valor e motivo do No Bid).
+    """
+    # Paginação por offset: reinicia na primeira página sempre que o termo ou os filtros mudam
+    signature = repr((search_term, query))
+    if st.session_state.get(f"portfolio_search_signature_{prefix}") != signature:
+        st.session_state[f"portfolio_search_signature_{prefix}"] = signature
+        st.session_state[f"portfolio_search_offset_{prefix}"] = 0
+    offset = st.session_state[f"portfolio_search_offset_{prefix}"]
+
+    page = services["search_auctions"].execute(
+        user_id, search_term, scope=SearchScope.CARTEIRA, statuses=list(query.statuses),
+        min_valor=query.min_valor, max_valor=query.max_valor, no_bid_reasons=query.no_bid_reasons,
+        offset=offset, page_size=PORTFOLIO_PAGE_SIZE
+    )
+    if not page.items and offset:
+        # A página atual esvaziou (itens mudaram de aba): volta para a anterior
+        st.session_state[f"portfolio_search_offset_{prefix}"] = max(0, offset - PORTFOLIO_PAGE_SIZE)
+        st.rerun()
 
-    min_val = filters.get('min_val', 0)
-    max_val = filters.get('max_val', float('inf'))
-    if min_val > 0 or max_val < max_slider_value:
-        filtered = [i for i in filtered if i.valor_2_praca and min_val <= i.valor_2_praca <= max_val]
+    page_number = offset // PORTFOLIO_PAGE_SIZE + 1
+    st.caption(f"Página {page_number} · {page.total} resultado(s) para \"{search_term}\".")
+    if offset or page.has_next:
+        col_prev, _, col_next = st.columns([1, 3, 1])
+        with col_prev:
+            if st.button("⬅️ Anterior", disabled=not offset, use_container_width=True, key=f"search_prev_{prefix}"):
+                st.session_state[f"portfolio_search_offset_{prefix}"] = max(0, offset - PORTFOLIO_PAGE_SIZE)
+                st.rerun()
+        with col_next:
+            if st.button("Próxima ➡️", disabled=not page.has_next, use_container_width=True, key=f"search_next_{prefix}"):
+                st.session_state[f"portfolio_search_offset_{prefix}"] = offset + PORTFOLIO_PAGE_SIZE
+                st.rerun()
+    return page.items
 
-    if filters.get('sort_date', False):
-        # Usa sorted() para retornar uma nova lista ordenada, sem modificar a original
-        filtered = sorted(filtered, key=lambda x: x.data_2_praca if x.data_2_praca else datetime(9999, 1, 1))
 
-    return filtered
+def _load_thumbnails(items):
+    """Miniaturas locais das capas da página (geradas em paralelo na primeira exibição)."""
+    return load_thumbnails(auction.imagem_capa for auction in items if auction.imagem_capa)
 
 
-def _render_card(auction, suffix, is_participating=False, is_readonly=False, services=None, user_id=None):
-    """Card de visualização do leilão com botões de ação únicos."""
+def _render_card(auction, suffix, is_participating=False, is_readonly=False, services=None, user_id=None,
+                 thumbnail=None):
+    """Card de visualização do leilão com botões de ação únicos (`thumbnail`: miniatura local da capa)."""
     with st.container(border=True):
         c1, c2, c3 = st.columns([1, 3, 1])
         
         with c1:
             if auction.imagem_capa:
                 # CORREÇÃO DO ERRO DE WIDTH
-                st.image(auction.imagem_capa, use_container_width=True)
+                # Miniatura local quando disponível; senão, a imagem original do leiloeiro
+                st.image(thumbnail or auction.imagem_capa, use_container_width=True)
             else:
                 st.markdown("📷 *Sem Foto*")
         
@@ -315,10 +404,28 @@ def _render_card(auction, suffix, is_participating=False, is_readonly=False, ser
             # Botão para marcar como disputa perdida
             if is_participating:
                 if st.button("Marcar como Perdido 🥊", key=f"btn_lost_{auction.id_leilao}_{suffix}", use_container_width=True):
-                    services["repository"].update_status(user_id, auction.site, auction.id_leilao, EvaluationStatus.OUTBID)
+                    services["transition_statuses"].execute(user_id, [(auction.site, auction.id_leilao)], EvaluationStatus.OUTBID)
                     st.toast("Leilão movido para 'Finalizados' como Disputa Perdida.")
                     st.rerun()
 
+def _render_bulk_outbid(items, services, user_id):
+    """Seleção múltipla para mover vários leilões para 'Disputa Perdida' em uma única gravação."""
+    labels = {(a.site, a.id_leilao): f"{a.titulo} ({a.site} #{a.id_leilao})" for a in items}
+    with st.expander("🥊 Marcar vários como Perdidos"):
+        selected = st.multiselect(
+            "Leilões com disputa perdida",
+            options=list(labels),
+            format_func=labels.get,
+            key="bulk_outbid_sel"
+        )
+        if st.button("Marcar selecionados como Perdidos", disabled=not selected, key="btn_bulk_outbid"):
+            result = services["transition_statuses"].execute(user_id, selected, EvaluationStatus.OUTBID)
+            st.toast(f"{result.saved} leilão(ões) movido(s) para 'Finalizados' como Disputa Perdida.")
+            if result.skipped:
+                st.toast(f"{len(result.skipped)} leilão(ões) não encontrado(s) na base analítica.", icon="⚠️")
+            st.session_state.pop("bulk_outbid_sel", None)
+            st.rerun()
+
 def _render_edit_source_data(services):
     """Formulário para correção de dados de scraping."""
     auction_data = st.session_state.selected_auction["obj"]
@@ -371,6 +478,7 @@ def _render_edit_source_data(services):
             
             # Chama o repositório (Agora funcionará pois corrigimos o dependencies.py)
             services["repository"].update_auction_core_data(auction_data.site, auction_data.id_leilao, updates)
+            invalidate_auditoria_snapshot()
             
             st.success("Dados corrigidos com sucesso!")
             st.session_state.page = "listagem"
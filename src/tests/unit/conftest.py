@@ -0,0 +1,13 @@
+import pytest
+from src.domain.models import Auction
+
+@pytest.fixture
+def make_auction():
+    """Fábrica de leilões de teste: id_leilao = 1000 + raw_id e valor_1_praca = 1000 * raw_id."""
+    def _auction(raw_id, site="zuk", uf="SP", cidade="São Paulo"):
+        return Auction(
+            site=site, id_leilao=str(1000 + raw_id), titulo=f"Imóvel {raw_id}", uf=uf, cidade=cidade,
+            tipo_leilao="Judicial", tipo_bem="Apartamento", valor_1_praca=1000.0 * raw_id, valor_2_praca=0.0,
+            link_detalhe="http://x", imagem_capa=None, id_registro_bruto=raw_id
+        )
+    return _auction
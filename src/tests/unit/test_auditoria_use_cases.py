@@ -1,7 +1,7 @@
 from unittest.mock import Mock
 import pytest
-from src.application.use_cases import FinalizarAuditoriaUseCase
-from src.domain.models import DetailedAnalysis, EvaluationStatus
+from src.application.use_cases import DescartarAuditoriaUseCase, FinalizarAuditoriaUseCase
+from src.domain.models import BatchWriteResult, DetailedAnalysis, EvaluationStatus
 
 def test_finalizar_auditoria_bloqueia_nulidade():
     repo = Mock()
@@ -13,6 +13,7 @@ def test_finalizar_auditoria_bloqueia_nulidade():
 
 def test_finalizar_auditoria_status_participar_isj_alto():
     repo = Mock()
+    repo.transition_statuses.return_value = BatchWriteResult(saved=1)
     use_case = FinalizarAuditoriaUseCase(repo)
     # Análise limpa (Score 100)
     analysis = DetailedAnalysis(site="x", id_leilao="1", usuario_id="u", proc_citacao=True, mat_prop_confere=True)
@@ -20,4 +21,15 @@ def test_finalizar_auditoria_status_participar_isj_alto():
     status = use_case.execute(analysis, "user123")
     
     assert status == EvaluationStatus.PARTICIPAR.value
-    repo.update_status.assert_called_once()
\ No newline at end of file
+    repo.transition_statuses.assert_called_once()
+    (user_id, transitions), _ = repo.transition_statuses.call_args
+    assert user_id == "user123"
+    assert [(t.site, t.id_leilao, t.new_status) for t in transitions] == [("x", "1", EvaluationStatus.PARTICIPAR)]
+
+def test_descartar_auditoria_falha_se_leilao_nao_existe():
+    repo = Mock()
+    repo.transition_statuses.return_value = BatchWriteResult(saved=0, skipped=[("x", "1")])
+    analysis = DetailedAnalysis(site="x", id_leilao="1", usuario_id="u")
+
+    with pytest.raises(RuntimeError, match="não encontrado"):
+        DescartarAuditoriaUseCase(repo).execute(analysis, "user123")
\ No newline at end of file
@@ -0,0 +1,91 @@
+from unittest.mock import Mock
+from src.domain.models import AuctionFilter, Evaluation, EvaluationStatus, PortfolioQuery, StatusTransition
+from src.infra.repositories.caching_repo import CachePolicy, CachingAuctionRepository, RepositoryCache
+from src.infra.repositories.memory_repo import InMemoryAuctionRepository
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def _build(make_auction, policies=None):
+    inner = InMemoryAuctionRepository(auctions=[make_auction(i) for i in range(1, 6)])
+    spy = Mock(wraps=inner)
+    clock = FakeClock()
+    cache = RepositoryCache(policies, clock=clock)
+    return CachingAuctionRepository(spy, cache), spy, cache, clock
+
+def test_leituras_repetidas_sao_servidas_do_cache_ate_o_ttl(make_auction):
+    repo, spy, cache, clock = _build(make_auction)
+
+    for _ in range(3):
+        assert repo.get_filter_facets("u", AuctionFilter(uf=["SP"])).total == 5
+    assert spy.get_filter_facets.call_count == 1
+
+    # Filtro diferente é outra chave
+    repo.get_filter_facets("u", AuctionFilter(uf=["RJ"]))
+    assert spy.get_filter_facets.call_count == 2
+
+    clock.now += 61
+    repo.get_filter_facets("u", AuctionFilter(uf=["SP"]))
+    assert spy.get_filter_facets.call_count == 3
+
+    counters = cache.stats()["get_filter_facets"]
+    assert (counters.hits, counters.misses, counters.expirations) == (2, 3, 1)
+
+def test_escrita_invalida_somente_o_usuario_afetado(make_auction):
+    repo, spy, cache, _ = _build(make_auction)
+    for user in ("u", "outro"):
+        repo.get_filter_facets(user, AuctionFilter())
+        repo.get_stats(user)
+
+    repo.save_evaluations([Evaluation("u", "zuk", "1001", EvaluationStatus.DESCARTAR)])
+
+    assert repo.get_filter_facets("u", AuctionFilter()).total == 4
+    assert repo.get_stats("u")["descartar"] == 1
+    assert repo.get_filter_facets("outro", AuctionFilter()).total == 5
+    assert spy.get_filter_facets.call_count == 3
+    assert spy.get_stats.call_count == 3
+
+    repo.transition_statuses("outro", [StatusTransition("zuk", "1002", EvaluationStatus.ANALISAR)])
+    assert [a.id_leilao for a in repo.get_portfolio_page("outro", PortfolioQuery()).items] == ["1002"]
+
+def test_edicao_do_leilao_invalida_cabecalho_e_listagens(make_auction):
+    repo, spy, _, _ = _build(make_auction)
+    repo.get_auction("zuk", "1003")
+    repo.get_portfolio_page("u", PortfolioQuery())
+
+    repo.update_auction_core_data("zuk", "1003", {"titulo": "Corrigido"})
+
+    assert repo.get_auction("zuk", "1003").titulo == "Corrigido"
+    repo.get_portfolio_page("u", PortfolioQuery())
+    assert spy.get_auction.call_count == 2
+    assert spy.get_portfolio_page.call_count == 2
+
+def test_lru_descarta_a_entrada_menos_usada(make_auction):
+    repo, spy, cache, _ = _build(make_auction, {"get_auction": CachePolicy(ttl_seconds=60, max_entries=2)})
+    repo.get_auction("zuk", "1001")
+    repo.get_auction("zuk", "1002")
+    repo.get_auction("zuk", "1001")
+    repo.get_auction("zuk", "1003")  # descarta o "1002"
+
+    repo.get_auction("zuk", "1001")
+    repo.get_auction("zuk", "1002")
+    assert spy.get_auction.call_count == 4
+    assert cache.stats()["get_auction"].evictions == 2
+
+def test_leitor_recebe_copia_e_nao_altera_o_valor_cacheado(make_auction):
+    repo, spy, _, _ = _build(make_auction)
+    page = repo.get_pending_auctions_frame("u", AuctionFilter())
+    original = list(page.frame["valor_1_praca"])
+    page.frame["valor_1_praca"] = 0.0
+    page.frame.sort_values("id_leilao", ascending=False, inplace=True)
+    facets = repo.get_filter_facets("u", AuctionFilter())
+    facets.uf.clear()
+
+    again = repo.get_pending_auctions_frame("u", AuctionFilter())
+    assert list(again.frame["valor_1_praca"]) == original and 0.0 not in original
+    assert [f.value for f in repo.get_filter_facets("u", AuctionFilter()).uf] == ["SP"]
+    assert spy.get_pending_auctions_frame.call_count == spy.get_filter_facets.call_count == 1
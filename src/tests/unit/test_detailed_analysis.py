@@ -0,0 +1,23 @@
+from datetime import datetime
+from src.domain.models import DetailedAnalysis
+
+def test_analise_nova_tem_todos_os_campos_sujos():
+    analysis = DetailedAnalysis(site="x", id_leilao="1", usuario_id="u")
+
+    assert not analysis.is_persisted
+    assert "fin_lance" in analysis.dirty_fields()
+
+def test_analise_sincronizada_so_reporta_campos_alterados():
+    analysis = DetailedAnalysis(site="x", id_leilao="1", usuario_id="u")
+    analysis.mark_clean()
+    assert analysis.is_persisted
+    assert analysis.dirty_fields() == set()
+
+    analysis.fin_lance = 150000.0
+    analysis.proc_executados.append("Fulano")
+    analysis.data_atualizacao = datetime.now()
+
+    assert analysis.dirty_fields() == {"fin_lance", "proc_executados"}
+
+    analysis.mark_clean()
+    assert analysis.dirty_fields() == set()
@@ -0,0 +1,227 @@
+from dataclasses import replace
+from datetime import date, datetime, timedelta
+import pytest
+from src.domain.models import (
+    Auction, AuctionFilter, DetailedAnalysis, Evaluation, EvaluationStatus, NoBidReason, PortfolioQuery, PortfolioSort,
+    ScraperRun, ScraperRunFilter, SearchScope, StatusTransition
+)
+from src.infra.repositories.memory_repo import InMemoryAuctionRepository
+
+def _run(run_id, source="zuk", status="SUCCESS", start=datetime(2026, 3, 1, 10, 30), latency=200, p95=600):
+    return ScraperRun(
+        id=run_id, execution_id=f"exec-{run_id}", source_name=source, run_type="FULL",
+        execution_start_time=start, execution_end_time=None, duration_seconds=60, run_status=status,
+        total_requests=10, successful_requests=9, failed_requests=1, raw_items_collected=5,
+        mapped_items_count=4, error_details=None, avg_latency_ms=latency, p95_latency_ms=p95
+    )
+
+@pytest.fixture
+def repo(make_auction):
+    auctions = [make_auction(i, uf="SP" if i % 2 else "RJ", cidade="São Paulo" if i % 2 else "Rio") for i in range(1, 11)]
+    return InMemoryAuctionRepository(auctions=auctions)
+
+def test_fila_pagina_por_cursor_e_exclui_avaliados(repo):
+    repo.save_evaluations([Evaluation("u", "zuk", "1010", EvaluationStatus.DESCARTAR)])
+
+    first = repo.get_pending_auctions("u", AuctionFilter(), page_size=4)
+    assert [a.id_registro_bruto for a in first.items] == [9, 8, 7, 6]
+    second = repo.get_pending_auctions("u", AuctionFilter(), cursor=first.next_cursor, page_size=4)
+    assert [a.id_registro_bruto for a in second.items] == [5, 4, 3, 2]
+    last = repo.get_pending_auctions("u", AuctionFilter(), cursor=second.next_cursor, page_size=4)
+    assert [a.id_registro_bruto for a in last.items] == [1] and not last.has_next
+
+    assert repo.count_pending_auctions("u", AuctionFilter(uf=["SP"])) == 5
+    assert repo.count_pending_auctions("outro", AuctionFilter()) == 10
+
+def test_facetas_contam_com_os_filtros_das_demais(repo):
+    facets = repo.get_filter_facets("u", AuctionFilter(uf=["SP"]))
+
+    # A faceta de UF ignora o próprio filtro; a de cidade acompanha a UF escolhida
+    assert [(f.value, f.count, f.count_filtered) for f in facets.uf] == [("RJ", 5, 0), ("SP", 5, 5)]
+    assert [f.value for f in facets.cidade] == ["São Paulo"]
+    assert facets.total == 5
+    assert facets.volume_1_praca == 25000.0
+
+def test_contadores_da_fila_acompanham_avaliacoes_e_carga(repo, make_auction):
+    repo.save_evaluations([Evaluation("u", "zuk", "1001", EvaluationStatus.DESCARTAR)])
+    # Registro avaliado muda de UF; chega um registro novo já avaliado por (site, id_leilao)
+    repo.add_auctions([make_auction(1, uf="RJ", cidade="Rio"), make_auction(11, uf="SP"), replace(make_auction(12), id_leilao="1001")])
+
+    facets = repo.get_filter_facets("u", AuctionFilter())
+    assert (facets.total, facets.volume_1_praca) == (10, 65000.0)
+    assert [(f.value, f.count) for f in facets.uf] == [("RJ", 5), ("SP", 5)]
+    assert repo.count_pending_auctions("u", AuctionFilter(uf=["RJ"])) == 5
+    assert repo.get_filter_facets("u", AuctionFilter(uf=["SP"])).total == 5
+
+def test_transicoes_movem_para_carteira_e_reportam_inexistentes(repo):
+    result = repo.transition_statuses("u", [
+        StatusTransition("zuk", "1001", EvaluationStatus.ANALISAR),
+        StatusTransition("zuk", "1002", EvaluationStatus.ANALISAR),
+        StatusTransition("zuk", "1002", EvaluationStatus.PARTICIPAR),
+        StatusTransition("zuk", "9999", EvaluationStatus.ANALISAR),
+    ])
+
+    assert result.saved == 2 and result.skipped == [("zuk", "9999")]
+    portfolio = {a.id_leilao: a.status_carteira for a in repo.get_portfolio_page("u", PortfolioQuery()).items}
+    assert portfolio == {"1001": "ANALISAR", "1002": "PARTICIPAR"}
+    assert repo.count_pending_auctions("u", AuctionFilter()) == 8
+    assert repo.get_stats("u") == {"analisar": 1, "descartar": 0, "participar": 1, "total_processado": 1}
+
+    with pytest.raises(RuntimeError, match="não encontrado"):
+        repo.update_status("u", "zuk", "9999", EvaluationStatus.NO_BID)
+
+def test_produtividade_conta_eventos_de_decisao(repo):
+    repo.save_evaluations([Evaluation("u", "zuk", "1001", EvaluationStatus.ANALISAR)])
+    repo.save_evaluations([Evaluation("u", "zuk", "1001", EvaluationStatus.ANALISAR)])  # regravação
+    repo.transition_statuses("u", [StatusTransition("zuk", "1001", EvaluationStatus.PARTICIPAR)])
+    repo.transition_statuses("u", [StatusTransition("zuk", "1001", EvaluationStatus.PARTICIPAR)])
+
+    assert repo.get_stats("u") == {"analisar": 1, "descartar": 0, "participar": 1, "total_processado": 1}
+
+def test_analise_detalhada_grava_apenas_campos_alterados(repo):
+    analysis = DetailedAnalysis(site="zuk", id_leilao="1001", usuario_id="u", fin_lance=100.0)
+    repo.save_detailed_analysis(analysis)
+    assert not analysis.dirty_fields()
+
+    # Outra sessão altera um campo; o autosave desta só grava o que ela mudou
+    other = repo.get_detailed_analysis("zuk", "1001", "u")
+    other.fin_itbi = 5.0
+    repo.save_detailed_analysis(other)
+    analysis.fin_lance = 200.0
+    repo.save_detailed_analysis(analysis)
+
+    snapshot = repo.get_auditoria_snapshot("zuk", "1001", "u")
+    assert snapshot.auction.titulo == "Imóvel 1"
+    assert (snapshot.analysis.fin_lance, snapshot.analysis.fin_itbi) == (200.0, 5.0)
+    assert snapshot.analysis.is_persisted and not snapshot.analysis.dirty_fields()
+
+def test_update_auction_core_data(repo):
+    repo.update_auction_core_data("zuk", "1003", {"titulo": "Novo título", "valor_1_praca": 1.0})
+    assert repo.get_auction("zuk", "1003").titulo == "Novo título"
+
+    with pytest.raises(ValueError):
+        repo.update_auction_core_data("zuk", "9999", {"titulo": "x"})
+
+def test_monitoramento_filtra_agrega_e_soma_rollup():
+    start = datetime(2026, 3, 1, 10, 30)
+    repo = InMemoryAuctionRepository(scraper_runs=[
+        _run(1, start=start),
+        _run(2, source="mega", status="FAILED", start=start + timedelta(minutes=10), latency=400, p95=6000),
+        _run(3, status="IN_PROGRESS", start=start + timedelta(days=1)),
+    ])
+
+    runs = repo.get_scraper_runs(ScraperRunFilter(end_date=date(2026, 3, 1)))
+    assert [r.id for r in runs] == [2, 1]
+    stats = repo.get_scraper_run_stats(ScraperRunFilter(sources=["zuk"]))
+    assert (stats.total_runs, stats.success_runs, stats.total_collected) == (2, 1, 10)
+
+    assert repo.fold_scraper_runs(batch_size=1) == 2
+    assert repo.fold_scraper_runs() == 0
+    history = repo.get_scraper_latency_history(None, datetime(2026, 3, 1), datetime(2026, 3, 2), "hour")
+    assert [(b.source_name, b.bucket_start.hour) for b in history] == [("mega", 10), ("zuk", 10)]
+    assert history[0].p95_histogram == [0, 0, 0, 0, 0, 1]
+    assert history[1].avg_latency_ms == 200
+    assert repo.get_scraper_sources() == ["mega", "zuk"]
+
+def test_busca_textual_por_titulo_e_id_nos_escopos(make_auction):
+    repo = InMemoryAuctionRepository(auctions=[
+        make_auction(1), make_auction(2), make_auction(3), make_auction(13),
+    ])
+    repo.update_auction_core_data("zuk", "1002", {"titulo": "Apartamento em Pinheiros"})
+    repo.update_auction_core_data("zuk", "1003", {"titulo": "Casa no Jardim Paulistano"})
+
+    # Sem acentos e por prefixo; o ID exato vem antes dos títulos
+    assert [a.id_leilao for a in repo.search_auctions("u", "IMOVEL").items] == ["1013", "1001"]
+    assert [a.id_leilao for a in repo.search_auctions("u", "apart pinheiros").items] == ["1002"]
+    assert [a.id_leilao for a in repo.search_auctions("u", "1013").items] == ["1013"]
+    page = repo.search_auctions("u", "101", page_size=1)
+    assert (page.total, page.has_next, page.next_cursor) == (1, False, None)
+    assert repo.search_auctions("u", "013").total == 0  # ID por prefixo, não por trecho
+    assert repo.search_auctions("u", "  ").total == 0
+
+    repo.save_evaluations([Evaluation("u", "zuk", "1002", EvaluationStatus.PARTICIPAR)])
+    assert repo.search_auctions("u", "pinheiros", scope=SearchScope.TRIAGEM).total == 0
+    [hit] = repo.search_auctions("u", "pinheiros", scope=SearchScope.CARTEIRA).items
+    assert hit.status_carteira == "PARTICIPAR"
+    assert repo.search_auctions("u", "pinheiros", scope=SearchScope.CARTEIRA, statuses=["ANALISAR"]).total == 0
+    assert repo.search_auctions("outro", "pinheiros", scope=SearchScope.TRIAGEM).total == 1
+
+def test_carteira_paginada_filtra_ordena_e_conta_por_status(repo):
+    for raw_id in range(1, 8):
+        repo.update_auction_core_data("zuk", str(1000 + raw_id), {
+            "valor_2_praca": 1000.0 * raw_id, "data_2_praca": datetime(2026, 5, 10 - raw_id)
+        })
+    repo.transition_statuses("u", [StatusTransition("zuk", str(1000 + i), EvaluationStatus.ANALISAR) for i in range(1, 6)] + [
+        StatusTransition("zuk", "1006", EvaluationStatus.NO_BID),
+        StatusTransition("zuk", "1007", EvaluationStatus.OUTBID),
+    ])
+    repo.save_detailed_analysis(DetailedAnalysis(
+        site="zuk", id_leilao="1006", usuario_id="u", no_bid_reason=NoBidReason.RISCO_JURIDICO
+    ))
+
+    # Keyset na ordenação escolhida: a segunda página continua do cursor da primeira
+    query = PortfolioQuery(statuses=["ANALISAR"], sort=PortfolioSort.DATA_2_PRACA, page_size=2)
+    first = repo.get_portfolio_page("u", query)
+    assert [a.id_leilao for a in first.items] == ["1005", "1004"]
+    second = repo.get_portfolio_page("u", PortfolioQuery(**{**vars(query), "cursor": first.next_cursor}))
+    assert [a.id_leilao for a in second.items] == ["1003", "1002"]
+
+    by_value = repo.get_portfolio_page("u", PortfolioQuery(sort=PortfolioSort.MAIOR_VALOR, min_valor=2000.0, max_valor=6000.0))
+    assert [a.id_leilao for a in by_value.items] == ["1006", "1005", "1004", "1003", "1002"] and not by_value.has_next
+    [reason] = repo.get_portfolio_page("u", PortfolioQuery(no_bid_reasons=[NoBidReason.RISCO_JURIDICO.value])).items
+    assert (reason.id_leilao, reason.status_carteira) == ("1006", "NO_BID")
+
+    summary = repo.get_portfolio_summary("u")
+    assert summary.counts == {"ANALISAR": 5, "NO_BID": 1, "OUTBID": 1}
+    assert (summary.count(["NO_BID", "OUTBID"]), summary.max_valor_2_praca) == (2, 7000.0)
+    assert repo.get_portfolio_summary("u", PortfolioQuery(max_valor=2000.0)).total == 2
+
+    # A busca da carteira aplica os mesmos filtros e pagina o resultado
+    search = repo.search_auctions("u", "imovel", scope=SearchScope.CARTEIRA, min_valor=2000.0, max_valor=6000.0, page_size=3)
+    assert (search.total, len(search.items), search.next_cursor) == (5, 3, 3)
+    assert repo.search_auctions("u", "imovel", scope=SearchScope.CARTEIRA, min_valor=2000.0, max_valor=6000.0,
+                                offset=3, page_size=3).total == 5
+    [hit] = repo.search_auctions("u", "imovel", scope=SearchScope.CARTEIRA,
+                                 no_bid_reasons=[NoBidReason.RISCO_JURIDICO.value]).items
+    assert hit.id_leilao == "1006"
+
+def test_indicadores_dos_finalizados_sem_carregar_leiloes(repo):
+    repo.transition_statuses("u", [
+        StatusTransition("zuk", "1001", EvaluationStatus.NO_BID),
+        StatusTransition("zuk", "1002", EvaluationStatus.NO_BID),
+        StatusTransition("zuk", "1003", EvaluationStatus.NO_BID),
+        StatusTransition("zuk", "1004", EvaluationStatus.OUTBID),
+        StatusTransition("zuk", "1005", EvaluationStatus.ANALISAR),
+    ])
+    for id_leilao in ("1001", "1003"):
+        repo.update_auction_core_data("zuk", id_leilao, {"valor_2_praca": 500.0})
+        repo.save_detailed_analysis(DetailedAnalysis(
+            site="zuk", id_leilao=id_leilao, usuario_id="u", no_bid_reason=NoBidReason.PROBLEMA_MATRICULA
+        ))
+
+    indicators = repo.get_finalizados_indicators("u")
+    assert (indicators.total, indicators.no_bid, indicators.outbid) == (4, 3, 1)
+    assert (indicators.taxa_no_bid, indicators.capital_evitado) == (75.0, 1000.0)
+    assert [(r.reason, r.total) for r in indicators.by_reason] == [(NoBidReason.PROBLEMA_MATRICULA.value, 2), (None, 1)]
+    assert [(b.uf, b.status, b.total) for b in indicators.by_uf] == [("RJ", "NO_BID", 1), ("RJ", "OUTBID", 1), ("SP", "NO_BID", 2)]
+    mes = date.today().replace(day=1)
+    assert [(b.mes, b.status, b.total) for b in indicators.monthly] == [(mes, "NO_BID", 3), (mes, "OUTBID", 1)]
+    assert repo.get_finalizados_indicators("outro").total == 0
+
+def test_leitura_colunar_da_fila_e_das_execucoes(repo):
+    first = repo.get_pending_auctions_frame("u", AuctionFilter(uf=["SP"]), page_size=3)
+    frame = first.frame
+    assert list(frame["id_registro_bruto"]) == [9, 7, 5] and first.next_cursor == 5
+    assert str(frame["uf"].dtype) == "category" and str(frame["cidade"].dtype) == "category"
+    assert str(frame["valor_2_praca"].dtype) == "float64" and frame["data_1_praca"].dtype.kind == "M"
+    assert frame["imagem_capa"].isna().all()
+    last = repo.get_pending_auctions_frame("u", AuctionFilter(uf=["SP"]), cursor=first.next_cursor, page_size=3)
+    assert list(last.frame["id_registro_bruto"]) == [3, 1] and not last.has_next
+
+    empty = repo.get_pending_auctions_frame("u", AuctionFilter(uf=["MG"]))
+    assert empty.frame.empty and list(empty.frame.columns) == list(frame.columns)
+
+    runs = InMemoryAuctionRepository(scraper_runs=[_run(1), _run(2, source="mega")])
+    df = runs.get_scraper_runs_frame(ScraperRunFilter(), limit=1)
+    assert list(df["id"]) == [2] and str(df["source_name"].dtype) == "category"
+    assert str(df["execution_end_time"].dtype) == "datetime64[us, UTC]" and "parameters_used" not in df
@@ -0,0 +1,73 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from src.infra.database.instrumentation import QueryMonitor, normalize_sql
+
+class LookupUseCase:
+    """Caso de uso de teste: uma consulta por chave (o padrão N+1)."""
+    def __init__(self, engine):
+        self.engine = engine
+
+    def execute(self, keys):
+        with self.engine.connect() as conn:
+            return [conn.execute(text("SELECT :k + 1"), {"k": k}).scalar() for k in keys]
+
+def _monitor(**kwargs):
+    engine = create_engine("sqlite://")
+    monitor = QueryMonitor(**kwargs)
+    monitor.install(engine)
+    monitor.install(engine)  # idempotente
+    return engine, monitor
+
+def test_consultas_sao_atribuidas_ao_caso_de_uso_e_n_mais_1_e_sinalizado():
+    engine, monitor = _monitor(n_plus_one_threshold=3)
+    use_case = monitor.instrument(LookupUseCase(engine))
+
+    assert use_case.execute([1, 2, 3, 4]) == [2, 3, 4, 5]
+    use_case.execute([1])
+
+    single, batch = monitor.recent()
+    assert (batch.use_case, batch.query_count, single.query_count) == ("LookupUseCase", 4, 1)
+    assert batch.repeated_statements(3) == [("SELECT ? + 1", 4)]
+    assert single.repeated_statements(3) == []
+
+    [aggregate] = monitor.aggregates()
+    assert (aggregate.calls, aggregate.max_queries, aggregate.n_plus_one_calls) == (2, 4, 1)
+
+def test_escopo_aninhado_conta_para_o_externo_e_fora_de_escopo_nao_e_atribuido():
+    engine, monitor = _monitor(capacity=2)
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        with monitor.scope("Externo"):
+            conn.execute(text("SELECT 2"))
+            with monitor.scope("Interno"):
+                conn.execute(text("SELECT 3"))
+        [externo] = monitor.recent()
+        assert (externo.use_case, externo.query_count) == ("Externo", 2)
+        for name in ("A", "B"):
+            with monitor.scope(name):
+                pass
+
+    assert [t.use_case for t in monitor.recent()] == ["B", "A"]  # buffer circular descartou "Externo"
+    assert monitor.unattributed()[0] == 1
+
+def test_statement_com_erro_e_registrado_como_falha_e_libera_o_cronometro():
+    engine, monitor = _monitor()
+    with engine.connect() as conn:
+        with monitor.scope("ComErro"):
+            with pytest.raises(OperationalError):
+                conn.execute(text("SELECT * FROM tabela_inexistente WHERE id = :id"), {"id": 1})
+            conn.execute(text("SELECT 1"))
+        assert conn.info["query_monitor_started"] == []
+
+    [trace] = monitor.recent()
+    assert [(s.sql, s.failed) for s in trace.statements] == [
+        ("SELECT * FROM tabela_inexistente WHERE id = ?", True), ("SELECT 1", False)
+    ]
+    assert monitor.aggregates()[0].failed_statements == 1
+
+def test_normalizacao_colapsa_parametros_e_listas():
+    assert normalize_sql("SELECT * FROM t WHERE a IN (%(a_1_1)s, %(a_1_2)s)\n  AND b = %(b_1)s") == \
+        "SELECT * FROM t WHERE a IN (?) AND b = ?"
+    assert normalize_sql("INSERT INTO t (a, b) VALUES (%(a_m0)s, %(b_m0)s), (%(a_m1)s, %(b_m1)s)") == \
+        "INSERT INTO t (a, b) VALUES (?)"
@@ -0,0 +1,36 @@
+from datetime import datetime
+from src.domain.models import EvaluationStatus
+from src.infra.database.synthetic import (
+    ANALYSIS_COLUMNS, AUCTION_COLUMNS, PORTFOLIO_DECISIONS, SyntheticConfig,
+    analysis_rows, auction_rows, evaluation_rows
+)
+
+def _config(**overrides):
+    params = dict(auctions=500, users=4, evaluated_ratio=0.3, seed=7, start=datetime(2025, 6, 1))
+    params.update(overrides)
+    return SyntheticConfig(**params)
+
+def test_mesma_semente_gera_a_mesma_base():
+    assert list(auction_rows(_config())) == list(auction_rows(_config()))
+    assert list(evaluation_rows(_config())) == list(evaluation_rows(_config()))
+    assert list(auction_rows(_config())) != list(auction_rows(_config(seed=8)))
+
+def test_avaliacoes_e_analises_referenciam_leiloes_existentes():
+    cfg = _config()
+    auctions = {(row[1], row[2]): row[0] for row in auction_rows(cfg)}
+    assert all(len(row) == len(AUCTION_COLUMNS) for row in auction_rows(cfg))
+
+    evaluations = list(evaluation_rows(cfg))
+    assert evaluations
+    decisions = {}
+    for usuario, site, id_leilao, raw_id, avaliacao, _, _ in evaluations:
+        assert auctions[(site, id_leilao)] == raw_id
+        decisions[(usuario, site, id_leilao)] = EvaluationStatus(avaliacao)
+    assert len(decisions) == len(evaluations)
+
+    analyses = list(analysis_rows(cfg))
+    assert analyses
+    for row in analyses:
+        assert len(row) == len(ANALYSIS_COLUMNS)
+        site, id_leilao, usuario = row[:3]
+        assert decisions[(usuario, site, id_leilao)] in PORTFOLIO_DECISIONS
@@ -0,0 +1,104 @@
+import io
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from PIL import Image
+
+from src.infra.media import thumbnails
+from src.infra.media.thumbnails import CARD_SIZE, ThumbnailCache, http_fetcher, make_thumbnail
+
+LOCAL = ["127.0.0.1/32"]
+
+def _png(width, height, color):
+    out = io.BytesIO()
+    Image.new("RGB", (width, height), color).save(out, "PNG")
+    return out.getvalue()
+
+@pytest.fixture
+def server():
+    """Servidor HTTP local no lugar da CDN dos leiloeiros (conta os downloads por caminho)."""
+    images = {f"/foto{i}.png": _png(1200, 900, (40 * i, 80, 120)) for i in range(1, 6)}
+    hits = {}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            hits[self.path] = hits.get(self.path, 0) + 1
+            if self.path.startswith("/redireciona"):
+                # Redireciona para outro endereço de loopback (fora da rede liberada nos testes)
+                self.send_response(302)
+                self.send_header("Location", f"http://127.0.0.2:{self.server.server_port}/foto1.png")
+                self.end_headers()
+                return
+            body = images.get(self.path)
+            self.send_response(200 if body else 404)
+            self.end_headers()
+            self.wfile.write(body or b"nao encontrado")
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_port}", hits
+    httpd.shutdown()
+
+def test_miniatura_baixada_uma_vez_e_servida_do_disco(tmp_path, server):
+    base, hits = server
+    cache = ThumbnailCache(str(tmp_path), fetch=http_fetcher(timeout=2, allowed_networks=LOCAL))
+
+    first = cache.get(f"{base}/foto1.png", timeout=5)
+    assert Image.open(io.BytesIO(first)).size == CARD_SIZE
+    assert cache.get(f"{base}/foto1.png") == first
+    assert hits == {"/foto1.png": 1}
+
+    # Outra instância (ex: reinício do servidor) reaproveita os arquivos
+    again = ThumbnailCache(str(tmp_path), fetch=http_fetcher(timeout=2, allowed_networks=LOCAL))
+    assert again.get(f"{base}/foto1.png") == first and hits["/foto1.png"] == 1
+    assert (again.stats().files, again.stats().hits) == (1, 1)
+
+def test_falha_fica_em_quarentena_e_prefetch_gera_em_segundo_plano(tmp_path, server):
+    base, hits = server
+    now = [0.0]
+    cache = ThumbnailCache(str(tmp_path), fetch=http_fetcher(timeout=2, allowed_networks=LOCAL), failure_ttl=60, clock=lambda: now[0])
+
+    assert cache.get(f"{base}/nao-existe.png", timeout=5) is None
+    assert cache.get(f"{base}/nao-existe.png", timeout=5) is None
+    assert hits["/nao-existe.png"] == 1 and cache.stats().failures == 1
+    now[0] = 61
+    assert cache.get(f"{base}/nao-existe.png", timeout=5) is None and hits["/nao-existe.png"] == 2
+
+    urls = [f"{base}/foto{i}.png" for i in (2, 3)]
+    cache.prefetch(urls)
+    assert set(cache.get_many(urls, timeout=5)) == set(urls)
+    assert hits["/foto2.png"] == hits["/foto3.png"] == 1
+
+def test_lru_em_disco_limitado_por_bytes(tmp_path, server):
+    base, _ = server
+    cache = ThumbnailCache(str(tmp_path), fetch=http_fetcher(timeout=2, allowed_networks=LOCAL))
+    size = len(cache.get(f"{base}/foto1.png", timeout=5))
+    cache.max_bytes = int(size * 2.5)
+
+    cache.get(f"{base}/foto2.png", timeout=5)
+    cache.get(f"{base}/foto1.png")  # foto1 passa a ser a mais recente
+    cache.get(f"{base}/foto3.png", timeout=5)
+
+    stats = cache.stats()
+    assert stats.files == 2 and stats.evictions == 1 and stats.bytes <= cache.max_bytes
+    assert cache.get_many([f"{base}/foto1.png", f"{base}/foto3.png"], timeout=0).keys() == {
+        f"{base}/foto1.png", f"{base}/foto3.png"
+    }
+    assert not list(tmp_path.glob(f"*/{cache._key(f'{base}/foto2.png')}.jpg"))
+
+def test_download_recusa_rede_interna_e_imagem_gigante(tmp_path, server, monkeypatch):
+    base, hits = server
+    with pytest.raises(ValueError, match="não público"):
+        http_fetcher(timeout=2)(f"{base}/foto1.png")
+    with pytest.raises(ValueError, match="não público"):
+        http_fetcher(timeout=2, allowed_networks=LOCAL)(f"{base}/redireciona")
+    assert hits == {"/redireciona": 1}
+
+    data = http_fetcher(timeout=2, allowed_networks=LOCAL)(f"{base}/foto1.png")
+    monkeypatch.setattr(thumbnails, "MAX_SOURCE_PIXELS", 1200 * 900 - 1)
+    with pytest.raises(ValueError, match="excede"):
+        make_thumbnail(data)
@@ -1,14 +1,18 @@
 import pytest
 from unittest.mock import Mock
-from datetime import datetime
+from datetime import datetime, date
 
 # IMPORTANTE: Estas são as classes que estavam faltando (causando o NameError)
-from src.domain.models import Auction, Evaluation, EvaluationStatus, AuctionFilter
+from src.domain.models import Auction, AuditoriaSnapshot, ScraperLatencyBucket, Evaluation, EvaluationStatus, AuctionFilter
 # Importação dos Casos de Uso
 from src.application.use_cases import (
     GetPendingAuctionsUseCase, 
+    GetFilterOptionsUseCase,
+    GetUserStatsUseCase,
     SubmitBatchEvaluationUseCase, 
-    GetPortfolioAuctionsUseCase
+    GetAuditoriaSnapshotUseCase,
+    GetScraperRunStatsUseCase,
+    GetScraperLatencyHistoryUseCase
 )
 
 class TestAuctionsUseCases:
@@ -37,6 +41,42 @@ class TestAuctionsUseCases:
         # Aqui não dará mais NameError, pois AuctionFilter foi importado no topo
         assert isinstance(called_filter, AuctionFilter)
 
+    def test_get_pending_auctions_should_forward_cursor_and_page_size(self):
+        """
+        Garante que a paginação por cursor chega ao repositório sem alterações.
+        """
+        use_case = GetPendingAuctionsUseCase(self.mock_repo)
+
+        # Act
+        use_case.execute(user_id="user_123", cursor=5000, page_size=10)
+
+        # Assert
+        _, kwargs = self.mock_repo.get_pending_auctions.call_args
+        assert kwargs["cursor"] == 5000
+        assert kwargs["page_size"] == 10
+
+    def test_get_filter_options_should_scope_facets_by_selected_filters(self):
+        """
+        As facetas são calculadas a partir da seleção atual (cascata UF -> Cidade).
+        """
+        use_case = GetFilterOptionsUseCase(self.mock_repo)
+
+        use_case.execute(user_id="user_123", uf=["SP"], cidade=["Campinas"])
+
+        called_user_id, called_filter = self.mock_repo.get_filter_facets.call_args[0]
+        assert called_user_id == "user_123"
+        assert called_filter.uf == ["SP"]
+        assert called_filter.cidade == ["Campinas"]
+
+    def test_get_user_stats_should_forward_user_and_date_range(self):
+        use_case = GetUserStatsUseCase(self.mock_repo)
+
+        use_case.execute("user_123", start_date=date(2026, 5, 1), end_date=date(2026, 5, 31))
+
+        self.mock_repo.get_stats.assert_called_once_with(
+            "user_123", start_date=date(2026, 5, 1), end_date=date(2026, 5, 31)
+        )
+
     def test_submit_batch_evaluation_should_create_evaluations_correctly(self):
         """
         Verifica se o processamento de lote converte dicts em entidades de Evaluation.
@@ -59,24 +99,45 @@ class TestAuctionsUseCases:
         assert isinstance(called_evaluations[0], Evaluation)
         assert called_evaluations[0].avaliacao == EvaluationStatus.ANALISAR
 
-    def test_get_portfolio_should_isolate_domain_from_infrastructure(self):
-        """
-        Verifica se o Use Case retorna os dados do domínio corretamente.
-        """
-        use_case = GetPortfolioAuctionsUseCase(self.mock_repo)
-        
-        # Criamos uma instância real da entidade Auction para o mock retornar
-        mock_auction = Auction(
-            site="site1", id_leilao="1", titulo="Casa", uf="RJ", cidade="Rio",
-            tipo_leilao="Judicial", tipo_bem="Imóvel", valor_1_praca=100.0,
-            valor_2_praca=50.0, link_detalhe="...", imagem_capa="..."
-        )
-        self.mock_repo.get_portfolio_auctions.return_value = [mock_auction]
-        
-        # Act
-        result = use_case.execute("user_1")
-        
-        # Assert
+    def test_auditoria_snapshot_cria_analise_em_branco(self):
+        """Sem análise salva, o snapshot devolve uma análise nova para o formulário."""
+        use_case = GetAuditoriaSnapshotUseCase(self.mock_repo)
+        self.mock_repo.get_auditoria_snapshot.return_value = AuditoriaSnapshot(auction=None, analysis=None)
+
+        snapshot = use_case.execute("user_1", "site1", "1")
+
+        self.mock_repo.get_auditoria_snapshot.assert_called_once_with("site1", "1", "user_1")
+        assert snapshot.analysis.usuario_id == "user_1"
+        assert not snapshot.analysis.is_persisted
+
+    def test_scraper_run_stats_repassa_filtros(self):
+        """Os agregados do monitoramento são pedidos ao repositório com os filtros da tela."""
+        use_case = GetScraperRunStatsUseCase(self.mock_repo)
+
+        use_case.execute(start_date=date(2026, 1, 1), end_date=date(2026, 1, 31), sources=["zuk"], statuses=None)
+
+        (filters,), _ = self.mock_repo.get_scraper_run_stats.call_args
+        assert filters.start_date == date(2026, 1, 1)
+        assert filters.end_date == date(2026, 1, 31)
+        assert filters.sources == ["zuk"]
+
+    def test_latency_history_soma_fontes_com_media_ponderada(self):
+        """Ao somar fontes, a latência média é ponderada pelas requisições de cada bucket."""
+        use_case = GetScraperLatencyHistoryUseCase(self.mock_repo)
+        inicio = datetime(2026, 1, 1)
+        self.mock_repo.get_scraper_latency_history.return_value = [
+            ScraperLatencyBucket("zuk", inicio, runs_total=1, total_requests=100, failed_requests=10,
+                                 latency_weighted_sum_ms=100 * 200, latency_weight=100, p95_max_ms=900),
+            ScraperLatencyBucket("mega", inicio, runs_total=1, total_requests=300, failed_requests=0,
+                                 latency_weighted_sum_ms=300 * 600, latency_weight=300, p95_max_ms=1500),
+        ]
+
+        result = use_case.execute(date(2026, 1, 1), date(2026, 1, 1), combine_sources=True)
+
+        self.mock_repo.fold_scraper_runs.assert_not_called()
         assert len(result) == 1
-        assert result[0].titulo == "Casa"
-        assert isinstance(result[0], Auction)
\ No newline at end of file
+        assert result[0].source_name == "Todas"
+        assert result[0].runs_total == 2
+        assert result[0].avg_latency_ms == 500
+        assert result[0].failure_ratio == 0.025
+        assert result[0].p95_max_ms == 1500